@@ -0,0 +1,87 @@
+'''
+    This file is part of Prolothar-Common (More Info: https://github.com/shs-it/prolothar-common).
+
+    Prolothar-Common is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Prolothar-Common is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
+'''
+
+"""
+This experiment benchmarks edge lookup, insertion and removal and the
+sampling of traces on dense directly-follows graphs with many activities
+"""
+
+from random import Random
+
+from prolothar_common.experiments.stopwatch import Stopwatch
+from prolothar_common.models.directly_follows_graph import DirectlyFollowsGraph
+
+NR_OF_ACTIVITIES = 1000
+NR_OF_EDGES_PER_ACTIVITY = 100
+
+stopwatch = Stopwatch()
+random = Random(42)
+activities = ['a%d' % i for i in range(NR_OF_ACTIVITIES)]
+edges = [
+    (start, end) for start in activities
+    for end in random.sample(activities, NR_OF_EDGES_PER_ACTIVITY)
+]
+
+def benchmark(name, method):
+    dfg = DirectlyFollowsGraph()
+    for start, end in edges:
+        dfg.add_count(start, end)
+    stopwatch.start()
+    method(dfg)
+    print('%s: %r' % (name, stopwatch.get_elapsed_time()))
+
+def add_counts(dfg: DirectlyFollowsGraph):
+    for start, end in edges:
+        dfg.add_count(start, end)
+
+def remove_edges(dfg: DirectlyFollowsGraph):
+    for edge in edges:
+        dfg.remove_edge(edge)
+
+def remove_nodes(dfg: DirectlyFollowsGraph):
+    for activity in activities:
+        dfg.remove_node(activity)
+
+def select_nodes(dfg: DirectlyFollowsGraph):
+    dfg.select_nodes(activities[:NR_OF_ACTIVITIES // 2])
+
+def is_followed_by(dfg: DirectlyFollowsGraph):
+    for start, end in edges:
+        dfg.nodes[start].is_followed_by(end)
+        dfg.nodes[end].is_followed_by(start)
+
+def remove_not_allowed_start_activities(dfg: DirectlyFollowsGraph):
+    #a chain of source nodes that is removed one node per iteration
+    for i in range(NR_OF_ACTIVITIES):
+        dfg.add_count('chain%d' % i, 'chain%d' % (i + 1))
+    dfg.add_count('chain%d' % NR_OF_ACTIVITIES, activities[0])
+    dfg.add_count('start', activities[0])
+    dfg.remove_not_allowed_start_activities({'start'})
+
+benchmark('add_count', add_counts)
+benchmark('remove_edge', remove_edges)
+benchmark('remove_node', remove_nodes)
+benchmark('select_nodes', select_nodes)
+benchmark('is_followed_by', is_followed_by)
+benchmark('remove_not_allowed_start_activities', remove_not_allowed_start_activities)
+
+def generate_log(dfg: DirectlyFollowsGraph):
+    dfg.generate_log(100_000, start_activities=activities[:10],
+                     end_activities=activities[-10:], random_seed=42,
+                     max_trace_length=100)
+
+benchmark('generate_log', generate_log)
@@ -15,6 +15,11 @@
     along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
 '''
 
+from random import Random
+
+from lru import LRU
+from scipy.special import gammaln as lgamma
+
 from prolothar_common.experiments.stopwatch import Stopwatch
 from prolothar_common import mdl_utils
 
@@ -23,4 +28,37 @@ stopwatch = Stopwatch()
 stopwatch.start()
 for n in range(1, 10_000_000):
     mdl_utils.L_N(n)
-print(f'L_N: {stopwatch.get_elapsed_time()}')
\ No newline at end of file
+print(f'L_N: {stopwatch.get_elapsed_time()}')
+
+#lgamma at half-integer points as used by prequential_coding_length
+random = Random(42)
+points = [random.randint(0, 100_000) + 0.5 for _ in range(1_000_000)]
+
+#the former implementation of cached_lgamma
+lgamma_cache = LRU(1000)
+def lru_cached_lgamma(x: float) -> float:
+    try:
+        return lgamma_cache[x]
+    except KeyError:
+        y = lgamma(x)
+        lgamma_cache[x] = y
+        return y
+
+stopwatch.start()
+for x in points:
+    lru_cached_lgamma(x)
+lru_time = stopwatch.get_elapsed_time()
+print(f'lgamma with LRU cache: {lru_time} ({len(points) / lru_time.total_seconds():.0f} calls/s)')
+
+mdl_utils.precompute_lgamma(100_001)
+stopwatch.start()
+for x in points:
+    mdl_utils.cached_lgamma(x)
+table_time = stopwatch.get_elapsed_time()
+print(f'lgamma with lookup table: {table_time} ({len(points) / table_time.total_seconds():.0f} calls/s)')
+
+counts = {i: random.randint(0, 1000) for i in range(1000)}
+stopwatch.start()
+for _ in range(1000):
+    mdl_utils.prequential_coding_length(counts)
+print(f'prequential_coding_length: {stopwatch.get_elapsed_time()}')
@@ -0,0 +1,59 @@
+'''
+    This file is part of Prolothar-Common (More Info: https://github.com/shs-it/prolothar-common).
+
+    Prolothar-Common is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Prolothar-Common is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
+'''
+
+import numpy as np
+import psutil
+
+from prolothar_common.experiments.stopwatch import Stopwatch
+from prolothar_common.parallel.multiprocess.multiprocess import MultiprocessComputationEngine
+
+nr_of_elements = 1_000_000
+nr_of_workers = 4
+parameter_size = 20_000_000
+
+def add(parameter: int, element: int) -> int:
+    return parameter + element
+
+def get_sum(parameter: np.ndarray, element: int) -> int:
+    return int(parameter.sum())
+
+def get_unique_memory_of_workers() -> int:
+    return sum(child.memory_full_info().uss
+               for child in psutil.Process().children(recursive=True))
+
+if __name__ == '__main__':
+    stopwatch = Stopwatch()
+    l = list(range(nr_of_elements))
+    for chunk_size in [1, 100, None]:
+        with MultiprocessComputationEngine(
+                nr_of_workers=nr_of_workers, chunk_size=chunk_size) as engine:
+            partitionable_list = engine.create_partitionable_list(l)
+            stopwatch.start()
+            partitionable_list.map(1, add)
+            print(f'chunk size {chunk_size or "adaptive"}: {stopwatch.get_elapsed_time()}')
+
+    parameter = np.arange(parameter_size, dtype=np.int64)
+    print(f'parameter size: {parameter.nbytes // 2**20} MiB')
+    for min_shared_buffer_size, name in [(None, 'copy per worker'), (1 << 16, 'shared memory')]:
+        with MultiprocessComputationEngine(
+                nr_of_workers=nr_of_workers,
+                min_shared_buffer_size=min_shared_buffer_size) as engine:
+            partitionable_list = engine.create_partitionable_list(list(range(nr_of_workers)))
+            stopwatch.start()
+            partitionable_list.map(parameter, get_sum)
+            print(f'{name}: {stopwatch.get_elapsed_time()}, '
+                  f'unique memory of workers: {get_unique_memory_of_workers() // 2**20} MiB')
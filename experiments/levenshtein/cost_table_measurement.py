@@ -0,0 +1,56 @@
+'''
+    This file is part of Prolothar-Common (More Info: https://github.com/shs-it/prolothar-common).
+
+    Prolothar-Common is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Prolothar-Common is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
+'''
+"""
+This experiment benchmarks the time for the cost matrix and for the backtrace
+of levenshtein_with_cost_table versus the length of the sequences
+"""
+
+from random import Random
+
+from prolothar_common.experiments.stopwatch import Stopwatch
+from prolothar_common.levenshtein import levenshtein_with_backtrace
+from prolothar_common.levenshtein import compute_cost_matrix_of_codes
+from prolothar_common.levenshtein import backtrace_codes
+from prolothar_common.levenshtein import EditCostTable
+
+stopwatch = Stopwatch()
+random = Random(42)
+activities = ['activity %d' % i for i in range(20)]
+cost_table = EditCostTable(
+    insertion_costs={activity: random.randint(1, 3) for activity in activities},
+    deletion_costs={activity: random.randint(1, 3) for activity in activities},
+    substitution_costs={
+        (a, b): random.randint(1, 5) for a in activities for b in activities
+    })
+
+#levenshtein_with_backtrace switches to linear memory for the longest sequences
+for length in [500, 1000, 2000, 4000, 8000]:
+    s1 = random.choices(activities, k=length)
+    s2 = random.choices(activities, k=length)
+    codes1, codes2 = cost_table.encode(s1, s2)
+    stopwatch.start()
+    cost_matrix = compute_cost_matrix_of_codes(codes1, codes2, cost_table)
+    matrix_time = stopwatch.get_elapsed_time()
+    stopwatch.start()
+    backtrace_codes(codes1, codes2, cost_table, cost_matrix)
+    backtrace_time = stopwatch.get_elapsed_time()
+    stopwatch.start()
+    levenshtein_with_backtrace(s1, s2)
+    unit_cost_time = stopwatch.get_elapsed_time()
+    print('length %d: matrix %r, backtrace %r, levenshtein_with_backtrace %r' % (
+        length, matrix_time.total_seconds(), backtrace_time.total_seconds(),
+        unit_cost_time.total_seconds()))
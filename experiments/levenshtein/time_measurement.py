@@ -24,6 +24,7 @@ import string
 
 from prolothar_common.experiments.stopwatch import Stopwatch
 from prolothar_common.levenshtein import levenshtein_with_backtrace
+from prolothar_common.levenshtein import levenshtein_distance
 
 stopwatch = Stopwatch()
 
@@ -43,3 +44,8 @@ def benchmark(method, name):
     print('%s: %r' % (name, stopwatch.get_elapsed_time()))
 
 benchmark(levenshtein_with_backtrace, 'levenshtein_with_backtrace')
+
+stopwatch.start()
+for x,y in candidate_pairs:
+    levenshtein_distance(x,y)
+print('%s: %r' % ('levenshtein_distance', stopwatch.get_elapsed_time()))
@@ -18,6 +18,7 @@
 from typing import List, Callable, Any
 from random import Random
 import numpy as np
+from scipy.spatial.distance import squareform
 from math import exp
 
 DissimilarityFunction = Callable[[Any,Any], float]
@@ -34,7 +35,10 @@ class FuzzyKMedoid():
         Args:
             dissimilarity_function:
                 a function computing a dissimilarity value between for
-                any two objects given to the "cluster"-method
+                any two objects given to the "cluster"-method. can be None
+                if a precomputed dissimilarity matrix is given to "cluster",
+                e.g. computed by
+                prolothar_common.clustering.traces.distance_matrix
             coefficient:
                 the lambda coefficient in the paper
             random_seed:
@@ -46,12 +50,28 @@ class FuzzyKMedoid():
         self.__random_generator = Random(random_seed)
 
     def cluster(self, objects: List[Any],
-                number_of_clusters: int = None):
+                number_of_clusters: int = None,
+                dissimilarity_matrix: np.ndarray = None):
         """returns the membership matrix U (nxc) and the indices of the cluster
-        medoids (list of size c)"""
+        medoids (list of size c).
+
+        Args:
+            objects:
+                the n objects to cluster
+            number_of_clusters:
+                default is None, i.e. n. the number of clusters c
+            dissimilarity_matrix:
+                default is None, i.e. the matrix is computed with the
+                dissimilarity function. a precomputed nxn matrix or a
+                condensed matrix (upper triangle as in scipy's pdist).
+        """
         cluster_center_indices = self.__randomly_select_cluster_centers(
                 objects, number_of_clusters)
-        dissimilarity_matrix = self.__compute_dissimilarity_matrix(objects)
+        if dissimilarity_matrix is None:
+            dissimilarity_matrix = self.__compute_dissimilarity_matrix(objects)
+        else:
+            dissimilarity_matrix = self.__check_dissimilarity_matrix(
+                dissimilarity_matrix, objects)
         P = None
         while True:
             membership_matrix = self.__compute_degree_of_membership_matrix(
@@ -97,9 +117,24 @@ class FuzzyKMedoid():
                ])
 
     def __compute_dissimilarity_matrix(self, objects: List[Any]):
+        if self.__dissimilarity_function is None:
+            raise ValueError(
+                    'dissimilarity_matrix must be given if there is no '
+                    'dissimilarity_function')
         return np.array([[self.__dissimilarity_function(x1,x2) for x1 in objects]
                          for x2 in objects])
 
+    def __check_dissimilarity_matrix(self, dissimilarity_matrix: np.ndarray,
+                                     objects: List[Any]) -> np.ndarray:
+        dissimilarity_matrix = np.asarray(dissimilarity_matrix)
+        if dissimilarity_matrix.ndim == 1:
+            dissimilarity_matrix = squareform(dissimilarity_matrix, checks=False)
+        if dissimilarity_matrix.shape != (len(objects), len(objects)):
+            raise ValueError(
+                    'dissimilarity_matrix must have shape (%d,%d) but was %r'
+                    % (len(objects), len(objects), dissimilarity_matrix.shape))
+        return dissimilarity_matrix
+
     def __recompute_cluster_centers(
             self, cluster_center_indices, objects, membership_matrix,
             dissimilarity_matrix) -> List[int]:
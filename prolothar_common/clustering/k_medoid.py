@@ -18,6 +18,7 @@
 from typing import List, Callable, Any
 from random import Random
 import numpy as np
+from scipy.spatial.distance import squareform
 
 DissimilarityFunction = Callable[[Any,Any], float]
 
@@ -33,7 +34,10 @@ class KMedoid():
         Args:
             dissimilarity_function:
                 a function computing a dissimilarity value between for
-                any two objects given to the "cluster"-method
+                any two objects given to the "cluster"-method. can be None
+                if a precomputed dissimilarity matrix is given to "cluster",
+                e.g. computed by
+                prolothar_common.clustering.traces.distance_matrix
             random_seed:
                 seed to initialize the random generator used in this class.
                 can be set to an integer value to get reproducible results
@@ -47,12 +51,30 @@ class KMedoid():
         self.__dissimilarity_mode = dissimilarity_mode
 
     def cluster(self, objects: List[Any],
-                number_of_clusters: int = None):
+                number_of_clusters: int = None,
+                dissimilarity_matrix: np.ndarray = None):
         """returns a list of labels of length n and the indices of the cluster
-        medoids (list of size c)"""
+        medoids (list of size c).
+
+        Args:
+            objects:
+                the n objects to cluster
+            number_of_clusters:
+                default is None, i.e. n. the number of clusters c
+            dissimilarity_matrix:
+                default is None, i.e. the matrix is computed with the
+                dissimilarity function. a precomputed nxn matrix or a
+                condensed matrix (upper triangle as in scipy's pdist). the
+                diagonal of a condensed matrix is 0, i.e. in similarity mode
+                a square matrix must be given.
+        """
         cluster_center_indices = self.__randomly_select_cluster_centers(
                 objects, number_of_clusters)
-        dissimilarity_matrix = self.__compute_dissimilarity_matrix(objects)
+        if dissimilarity_matrix is None:
+            dissimilarity_matrix = self.__compute_dissimilarity_matrix(objects)
+        else:
+            dissimilarity_matrix = self.__check_dissimilarity_matrix(
+                dissimilarity_matrix, objects)
         while True:
             if self.__dissimilarity_mode:
                 #select medoids minimizing distance
@@ -88,9 +110,26 @@ class KMedoid():
         return cluster_center_indices[:number_of_clusters]
 
     def __compute_dissimilarity_matrix(self, objects: List[Any]):
+        if self.__dissimilarity_function is None:
+            raise ValueError(
+                    'dissimilarity_matrix must be given if there is no '
+                    'dissimilarity_function')
         return np.array([[self.__dissimilarity_function(x1,x2) for x1 in objects]
                          for x2 in objects])
 
+    def __check_dissimilarity_matrix(self, dissimilarity_matrix: np.ndarray,
+                                     objects: List[Any]) -> np.ndarray:
+        dissimilarity_matrix = np.asarray(dissimilarity_matrix)
+        if dissimilarity_matrix.ndim == 1 and not self.__dissimilarity_mode:
+            raise ValueError('condensed matrices are not supported in similarity mode')
+        if dissimilarity_matrix.ndim == 1:
+            dissimilarity_matrix = squareform(dissimilarity_matrix, checks=False)
+        if dissimilarity_matrix.shape != (len(objects), len(objects)):
+            raise ValueError(
+                    'dissimilarity_matrix must have shape (%d,%d) but was %r'
+                    % (len(objects), len(objects), dissimilarity_matrix.shape))
+        return dissimilarity_matrix
+
     def __recompute_cluster_centers(
             self, cluster_center_indices, objects, memberships,
             dissimilarity_matrix) -> List[int]:
@@ -0,0 +1,61 @@
+'''
+    This file is part of Prolothar-Common (More Info: https://github.com/shs-it/prolothar-common).
+
+    Prolothar-Common is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Prolothar-Common is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
+'''
+
+from typing import List, Union
+
+import numpy as np
+
+from prolothar_common.models.eventlog import EventLog
+
+METRICS = ('levenshtein', 'lcs_length', 'jaccard')
+
+def compute_distance_matrix(
+        log: Union[EventLog, List[List[str]]], metric: str = 'levenshtein',
+        condensed: bool = True, nr_of_workers: int = 1) -> np.ndarray:
+    """
+    computes the metric for all pairs of traces
+
+    Parameters
+    ----------
+    log : Union[EventLog, List[List[str]]]
+        an EventLog or a list of activity sequences
+    metric : str, optional
+        one of 'levenshtein' (unit cost edit distance), 'lcs_length' (length
+        of the longest common subsequence) or 'jaccard' (size of the
+        intersection divided by the size of the union of the activity sets).
+        by default 'levenshtein'
+    condensed : bool, optional
+        if True, the upper triangle of the matrix is returned as a 1-D array
+        in the same order as scipy.spatial.distance.pdist, i.e. the value for
+        traces i < j is at n*i - i*(i+1)/2 + j - i - 1. otherwise, the square
+        matrix is returned. its diagonal contains the value of a trace with
+        itself. by default True
+    nr_of_workers : int, optional
+        number of processes that compute blocks of rows in parallel,
+        by default 1, i.e. no additional processes are started
+
+    Returns
+    -------
+    np.ndarray
+        int64 values for levenshtein and lcs_length, float64 for jaccard
+
+    Raises
+    ------
+    ValueError
+        if the metric is unknown or nr_of_workers is smaller than 1
+    """
+    ...
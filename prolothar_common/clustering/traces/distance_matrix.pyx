@@ -0,0 +1,264 @@
+'''
+    This file is part of Prolothar-Common (More Info: https://github.com/shs-it/prolothar-common).
+
+    Prolothar-Common is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Prolothar-Common is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
+'''
+
+"""
+computes pairwise distance (or similarity) matrices of all traces of an event
+log. the traces are integer-encoded and deduplicated into variants first, i.e.
+each pair of distinct variants is compared only once. the result is a numpy
+array that can be passed to KMedoid and FuzzyKMedoid.
+"""
+
+from typing import List, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from prolothar_common.models.eventlog import EventLog, ColumnarEventLog, Trace
+
+cimport cython
+from prolothar_common.levenshtein cimport compute_distance_of_codes
+from prolothar_common.longest_common_subsequence cimport compute_lcs_length_of_codes
+
+#supported metrics. levenshtein is a distance, lcs_length (length of the
+#longest common subsequence) and jaccard (of the activity sets) are similarities
+METRICS = ('levenshtein', 'lcs_length', 'jaccard')
+
+def compute_distance_matrix(
+        log: Union[EventLog, List[List[str]]], metric: str = 'levenshtein',
+        condensed: bool = True, nr_of_workers: int = 1) -> np.ndarray:
+    """
+    computes the metric for all pairs of traces
+
+    Parameters
+    ----------
+    log : Union[EventLog, List[List[str]]]
+        an EventLog or a list of activity sequences
+    metric : str, optional
+        one of 'levenshtein' (unit cost edit distance), 'lcs_length' (length
+        of the longest common subsequence) or 'jaccard' (size of the
+        intersection divided by the size of the union of the activity sets).
+        by default 'levenshtein'
+    condensed : bool, optional
+        if True, the upper triangle of the matrix is returned as a 1-D array
+        in the same order as scipy.spatial.distance.pdist, i.e. the value for
+        traces i < j is at n*i - i*(i+1)/2 + j - i - 1. otherwise, the square
+        matrix is returned. its diagonal contains the value of a trace with
+        itself. by default True
+    nr_of_workers : int, optional
+        number of processes that compute blocks of rows in parallel,
+        by default 1, i.e. no additional processes are started
+
+    Returns
+    -------
+    np.ndarray
+        int64 values for levenshtein and lcs_length, float64 for jaccard
+
+    Raises
+    ------
+    ValueError
+        if the metric is unknown or nr_of_workers is smaller than 1
+    """
+    if metric not in METRICS:
+        raise ValueError('metric must be one of %r but was %r' % (METRICS, metric))
+    if nr_of_workers < 1:
+        raise ValueError('nr_of_workers must be at least 1')
+    codes, offsets, variant_of_trace = _encode_variants(log)
+    nr_of_variants = len(offsets) - 1
+    if metric == 'jaccard':
+        row_codes, row_offsets = _sort_unique_codes(codes, offsets)
+    else:
+        row_codes, row_offsets = codes, offsets
+    row_blocks = _split_rows(nr_of_variants, nr_of_workers)
+    if nr_of_workers == 1 or len(row_blocks) <= 1:
+        blocks = [_compute_row_block(row_codes, row_offsets, metric, start, end)
+                  for start, end in row_blocks]
+    else:
+        #the codes are sent once per worker instead of once per block
+        with ProcessPoolExecutor(
+                max_workers=nr_of_workers, initializer=_init_worker,
+                initargs=(row_codes, row_offsets, metric)) as executor:
+            blocks = list(executor.map(
+                _compute_row_block_of_worker,
+                [start for start, _ in row_blocks],
+                [end for _, end in row_blocks]))
+    variant_matrix = np.concatenate(blocks) if blocks else np.empty(
+        0, dtype=np.float64 if metric == 'jaccard' else np.int64)
+    nr_of_traces = len(variant_of_trace)
+    if condensed and nr_of_variants == nr_of_traces:
+        #variants are ordered by their first trace, i.e. there are no duplicates
+        return variant_matrix
+    variant_matrix = _to_square_matrix(variant_matrix, nr_of_variants,
+                                       _compute_diagonal(offsets, metric))
+    if not condensed:
+        return variant_matrix[np.ix_(variant_of_trace, variant_of_trace)]
+    matrix = np.empty(nr_of_traces * (nr_of_traces - 1) // 2,
+                      dtype=variant_matrix.dtype)
+    start = 0
+    for i in range(nr_of_traces - 1):
+        matrix[start:start + nr_of_traces - i - 1] = variant_matrix[
+            variant_of_trace[i], variant_of_trace[i+1:]]
+        start += nr_of_traces - i - 1
+    return matrix
+
+def _encode_variants(log) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """returns the concatenated activity codes and offsets of all variants
+    and the variant index of each trace"""
+    if isinstance(log, ColumnarEventLog) and not log.is_materialized():
+        trace_codes = log.activity_codes
+        trace_offsets = log.trace_offsets
+    else:
+        activity_dictionary = {}
+        trace_codes = []
+        trace_offsets = [0]
+        for trace in log:
+            trace_codes.extend(
+                activity_dictionary.setdefault(activity, len(activity_dictionary))
+                for activity in (trace.to_activity_list()
+                                 if isinstance(trace, Trace) else trace))
+            trace_offsets.append(len(trace_codes))
+        trace_codes = np.array(trace_codes, dtype=np.intc)
+        trace_offsets = np.array(trace_offsets, dtype=np.int64)
+    trace_codes = trace_codes.astype(np.intc, copy=False)
+    variant_index = {}
+    variant_of_trace = np.empty(len(trace_offsets) - 1, dtype=np.int64)
+    variant_slices = []
+    for i in range(len(trace_offsets) - 1):
+        trace = trace_codes[trace_offsets[i]:trace_offsets[i+1]]
+        variant = variant_index.setdefault(trace.tobytes(), len(variant_index))
+        if variant == len(variant_slices):
+            variant_slices.append(trace)
+        variant_of_trace[i] = variant
+    offsets = np.zeros(len(variant_slices) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in variant_slices], out=offsets[1:])
+    codes = np.concatenate(variant_slices) if variant_slices else np.empty(
+        0, dtype=np.intc)
+    return codes.astype(np.intc, copy=False), offsets, variant_of_trace
+
+def _split_rows(nr_of_variants: int, nr_of_blocks: int) -> List[Tuple[int,int]]:
+    """splits the rows of the condensed matrix into blocks with roughly the
+    same number of pairs. row i has nr_of_variants - i - 1 pairs"""
+    nr_of_pairs = nr_of_variants * (nr_of_variants - 1) // 2
+    row_blocks = []
+    start = 0
+    nr_of_pairs_in_block = 0
+    for i in range(nr_of_variants - 1):
+        nr_of_pairs_in_block += nr_of_variants - i - 1
+        if nr_of_pairs_in_block * nr_of_blocks >= nr_of_pairs or \
+        i == nr_of_variants - 2:
+            row_blocks.append((start, i + 1))
+            start = i + 1
+            nr_of_pairs_in_block = 0
+    return row_blocks
+
+#arguments of _compute_row_block that are the same for all blocks of a worker
+_worker_codes = None
+_worker_offsets = None
+_worker_metric = None
+
+def _init_worker(codes: np.ndarray, offsets: np.ndarray, metric: str):
+    global _worker_codes, _worker_offsets, _worker_metric
+    _worker_codes = codes
+    _worker_offsets = offsets
+    _worker_metric = metric
+
+def _compute_row_block_of_worker(Py_ssize_t start, Py_ssize_t end) -> np.ndarray:
+    return _compute_row_block(_worker_codes, _worker_offsets, _worker_metric, start, end)
+
+def _compute_row_block(codes: np.ndarray, offsets: np.ndarray, metric: str,
+                       Py_ssize_t start, Py_ssize_t end) -> np.ndarray:
+    """computes the condensed matrix entries of rows [start, end). for
+    jaccard, codes and offsets are the sorted activity sets of the variants"""
+    cdef Py_ssize_t n = len(offsets) - 1
+    cdef Py_ssize_t size = (end - start) * n - (end * (end + 1) - start * (start + 1)) // 2
+    if metric == 'jaccard':
+        similarities = np.empty(size, dtype=np.float64)
+        _compute_jaccard_rows(codes, offsets, start, end, similarities)
+        return similarities
+    distances = np.empty(size, dtype=np.int64)
+    _compute_edit_distance_rows(codes, offsets, start, end,
+                                metric == 'lcs_length', distances)
+    return distances
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _compute_edit_distance_rows(
+        const int[:] codes, const long long[:] offsets, Py_ssize_t start,
+        Py_ssize_t end, bint lcs_length, long long[:] result) noexcept nogil:
+    cdef Py_ssize_t n = offsets.shape[0] - 1
+    cdef Py_ssize_t i, j, k = 0
+    for i in range(start, end):
+        for j in range(i + 1, n):
+            if lcs_length:
+                result[k] = compute_lcs_length_of_codes(
+                    codes[offsets[i]:offsets[i+1]], codes[offsets[j]:offsets[j+1]])
+            else:
+                result[k] = compute_distance_of_codes(
+                    codes[offsets[i]:offsets[i+1]], codes[offsets[j]:offsets[j+1]],
+                    1, 1, 1, -1)
+            k += 1
+
+def _sort_unique_codes(codes: np.ndarray, offsets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """returns the sorted activity sets of all variants as codes and offsets"""
+    sets = [np.unique(codes[offsets[i]:offsets[i+1]]) for i in range(len(offsets) - 1)]
+    set_offsets = np.zeros(len(sets) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in sets], out=set_offsets[1:])
+    set_codes = np.concatenate(sets) if sets else np.empty(0, dtype=np.intc)
+    return set_codes.astype(np.intc, copy=False), set_offsets
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _compute_jaccard_rows(
+        const int[:] codes, const long long[:] offsets, Py_ssize_t start,
+        Py_ssize_t end, double[:] result) noexcept nogil:
+    cdef Py_ssize_t n = offsets.shape[0] - 1
+    cdef Py_ssize_t i, j, x, y, x_end, y_end, intersection, union, k = 0
+    for i in range(start, end):
+        for j in range(i + 1, n):
+            x = offsets[i]
+            x_end = offsets[i+1]
+            y = offsets[j]
+            y_end = offsets[j+1]
+            intersection = 0
+            while x < x_end and y < y_end:
+                if codes[x] == codes[y]:
+                    intersection += 1
+                    x += 1
+                    y += 1
+                elif codes[x] < codes[y]:
+                    x += 1
+                else:
+                    y += 1
+            union = x_end - offsets[i] + y_end - offsets[j] - intersection
+            #two empty traces have equal activity sets
+            result[k] = <double>intersection / union if union > 0 else 1.0
+            k += 1
+
+def _compute_diagonal(offsets: np.ndarray, metric: str) -> np.ndarray:
+    if metric == 'levenshtein':
+        return np.zeros(len(offsets) - 1, dtype=np.int64)
+    if metric == 'lcs_length':
+        return np.diff(offsets)
+    return np.ones(len(offsets) - 1, dtype=np.float64)
+
+def _to_square_matrix(condensed_matrix: np.ndarray, Py_ssize_t n,
+                      diagonal: np.ndarray) -> np.ndarray:
+    matrix = np.empty((n, n), dtype=condensed_matrix.dtype)
+    rows, columns = np.triu_indices(n, 1)
+    matrix[rows, columns] = condensed_matrix
+    matrix[columns, rows] = condensed_matrix
+    matrix[np.arange(n), np.arange(n)] = diagonal
+    return matrix
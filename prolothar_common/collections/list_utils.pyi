@@ -15,9 +15,11 @@
     along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
 '''
 
-from typing import Generator
+from typing import Generator, Iterable
 from random import Random
 
+MAX_NR_OF_CELLS_FOR_DYNAMIC_PROGRAMMING: int
+
 def search_sublist_all_occurences(l: list, sublist: list) -> list[int]:
     """
     returns a list of start indices of all occurences of sublist in list.
@@ -35,6 +37,82 @@ def is_sublist_bm(list: list, sublist: list, char_table=None, offset_table=None)
     """
     ...
 
+def longest_common_sublists(list_a: list, list_b: list) -> tuple[int, list[tuple[int,int]]]:
+    """
+    computes the longest common sublist (longest common substring) between two
+    lists.
+    See https://en.wikipedia.org/wiki/Longest_common_substring_problem
+
+    for small inputs, the quadratic dynamic programming algorithm is used. if
+    len(list_a) * len(list_b) > MAX_NR_OF_CELLS_FOR_DYNAMIC_PROGRAMMING and the
+    elements are hashable, a suffix automaton of list_a is built and list_b is
+    matched against it, i.e. runtime and memory are linear in the length of
+    the lists (plus the number of returned index pairs).
+
+    Returns
+    -------
+    a 2-tuple consisting of the length of longest common list and a list with
+    a 2-tuple for each common sublists (there can be more than one longest).
+    each of these 2-tuples consists of the start index in list_a and the start index
+    in list_b. the 2-tuples are sorted in ascending order.
+    """
+    ...
+
+def search_sublist_bm(l: list, sublist: list, char_table=None, offset_table=None,
+                      start: int = 0) -> int:
+    """
+    http://www.martinbroadhurst.com/boyer-moore-search-of-a-list-for-a-sub-list-in-python.html
+
+    returns the index of the first occurence of sublist in l that starts at
+    or after "start" (-1 if there is no such occurence). l is never copied,
+    i.e. repeated searches with increasing start indices run in linear time.
+    """
+    ...
+
+class MultiSublistSearcher:
+    """
+    Aho-Corasick automaton over a fixed set of sublists with hashable
+    elements. finds all occurences of all sublists in a list in a single
+    pass, i.e. in O(len(l) + number of occurences) instead of one search per
+    sublist. see https://en.wikipedia.org/wiki/Aho%E2%80%93Corasick_algorithm
+    """
+
+    def __init__(self, sublists: Iterable[list]):
+        """
+        builds the automaton
+
+        Parameters
+        ----------
+        sublists : Iterable
+            the sublists to search for. the index of a sublist in this
+            iterable identifies the sublist in the search results.
+        """
+        ...
+
+    def get_nr_of_sublists(self) -> int:
+        ...
+
+    def iter_occurences(self, l: list) -> Generator[tuple[int,int], None, None]:
+        """
+        yields a 2-tuple (sublist index, start index in l) for each occurence
+        of a sublist in l. the occurences are ordered by their end index,
+        occurences with the same end index by their start index (i.e. longer
+        sublists first) and then by the sublist index.
+        empty sublists occur at every index from 0 to len(l).
+        """
+        ...
+
+    def search_all_occurences(self, l: list) -> list[list[int]]:
+        """
+        returns for each sublist a list of the start indices of all its
+        occurences in l in ascending order
+        """
+        ...
+
+    def contains_any(self, l: list) -> bool:
+        """returns True iff at least one of the sublists occurs in l"""
+        ...
+
 def shuffle_together(*list_of_lists, random: Random|None = None) -> list:
     """
     shuffles all given lists such that all lists keep their relative order
@@ -20,6 +20,12 @@ from random import Random
 import numpy as np
 
 cimport cython
+from libcpp.vector cimport vector
+from libcpp.unordered_map cimport unordered_map
+
+#if len(list_a) * len(list_b) is larger, longest_common_sublists uses a
+#suffix automaton instead of the quadratic dynamic programming matrix
+MAX_NR_OF_CELLS_FOR_DYNAMIC_PROGRAMMING = 10_000
 
 def search_sublist_all_occurences(l, sublist):
     """
@@ -30,17 +36,12 @@ def search_sublist_all_occurences(l, sublist):
     char_table = make_boyer_moore_char_table(sublist)
     offset_table = make_boyer_moore_offset_table(sublist)
 
-    index = 0
-    subindex = search_sublist_bm(l, sublist, char_table=char_table,
-                                 offset_table=offset_table)
-
-    while subindex >= 0 and index <= len(l):
-        index = index + subindex
+    index = search_sublist_bm(l, sublist, char_table=char_table,
+                              offset_table=offset_table)
+    while index >= 0:
         occurences.append(index)
-        index = index + 1
-        subindex = search_sublist_bm(l[index:], sublist,
-                                     char_table=char_table,
-                                     offset_table=offset_table)
+        index = search_sublist_bm(l, sublist, char_table=char_table,
+                                  offset_table=offset_table, start=index + 1)
 
     return occurences
 
@@ -56,28 +57,157 @@ def is_sublist_bm(l, sublist, char_table=None, offset_table=None):
                              char_table=char_table,
                              offset_table=offset_table) >= 0
 
-def search_sublist_bm(l, sublist, char_table=None, offset_table=None):
+def search_sublist_bm(l, sublist, char_table=None, offset_table=None,
+                      Py_ssize_t start = 0):
     """
     http://www.martinbroadhurst.com/boyer-moore-search-of-a-list-for-a-sub-list-in-python.html
+
+    returns the index of the first occurence of sublist in l that starts at
+    or after "start" (-1 if there is no such occurence). l is never copied,
+    i.e. repeated searches with increasing start indices run in linear time.
     """
-    if len(sublist) == 0:
-        return 0
+    cdef Py_ssize_t length = len(l)
+    cdef Py_ssize_t sublist_length = len(sublist)
+    cdef Py_ssize_t i, j
+    if sublist_length == 0:
+        return start if start <= length else -1
     if char_table is None:
         char_table = make_boyer_moore_char_table(sublist)
     if offset_table is None:
         offset_table = make_boyer_moore_offset_table(sublist)
-    i = len(sublist) - 1
+    i = start + sublist_length - 1
 
-    while i < len(l):
-        j = len(sublist) - 1
+    while i < length:
+        j = sublist_length - 1
         while sublist[j] == l[i]:
             if j == 0:
                 return i
             i -= 1
             j -= 1
-        i += max(offset_table[len(sublist) - 1 - j], char_table.get(l[i], 1));
+        i += max(offset_table[sublist_length - 1 - j], char_table.get(l[i], 1))
     return -1
 
+cdef class MultiSublistSearcher:
+    """
+    Aho-Corasick automaton over a fixed set of sublists with hashable
+    elements. finds all occurences of all sublists in a list in a single
+    pass, i.e. in O(len(l) + number of occurences) instead of one search per
+    sublist. see https://en.wikipedia.org/wiki/Aho%E2%80%93Corasick_algorithm
+    """
+    #one dict per state: element => next state
+    cdef list transitions
+    cdef list failure_links
+    #index of the nearest state on the failure path (excluding the state
+    #itself) at which a sublist ends, -1 if there is none
+    cdef list output_links
+    #indices of the sublists that end exactly in a state
+    cdef list outputs
+    cdef list sublist_lengths
+    cdef list empty_sublist_indices
+
+    def __init__(self, sublists):
+        """
+        builds the automaton
+
+        Parameters
+        ----------
+        sublists : Iterable
+            the sublists to search for. the index of a sublist in this
+            iterable identifies the sublist in the search results.
+        """
+        self.transitions = [{}]
+        self.outputs = [[]]
+        self.sublist_lengths = []
+        self.empty_sublist_indices = []
+        cdef Py_ssize_t state
+        for sublist_index, sublist in enumerate(sublists):
+            self.sublist_lengths.append(len(sublist))
+            if len(sublist) == 0:
+                self.empty_sublist_indices.append(sublist_index)
+                continue
+            state = 0
+            for element in sublist:
+                try:
+                    state = self.transitions[state][element]
+                except KeyError:
+                    self.transitions[state][element] = len(self.transitions)
+                    state = len(self.transitions)
+                    self.transitions.append({})
+                    self.outputs.append([])
+            self.outputs[state].append(sublist_index)
+        self._compute_failure_and_output_links()
+
+    cdef _compute_failure_and_output_links(self):
+        self.failure_links = [0] * len(self.transitions)
+        self.output_links = [-1] * len(self.transitions)
+        cdef list queue = list(self.transitions[0].values())
+        cdef Py_ssize_t queue_index = 0
+        cdef Py_ssize_t state, next_state, failure_state
+        while queue_index < len(queue):
+            state = queue[queue_index]
+            queue_index += 1
+            for element, next_state in self.transitions[state].items():
+                queue.append(next_state)
+                failure_state = self._next_state(self.failure_links[state], element)
+                self.failure_links[next_state] = failure_state
+                if self.outputs[failure_state]:
+                    self.output_links[next_state] = failure_state
+                else:
+                    self.output_links[next_state] = self.output_links[failure_state]
+
+    cdef Py_ssize_t _next_state(self, Py_ssize_t state, element):
+        cdef dict transitions
+        while True:
+            transitions = self.transitions[state]
+            if element in transitions:
+                return transitions[element]
+            if state == 0:
+                return 0
+            state = self.failure_links[state]
+
+    def get_nr_of_sublists(self) -> int:
+        return len(self.sublist_lengths)
+
+    def iter_occurences(self, l):
+        """
+        yields a 2-tuple (sublist index, start index in l) for each occurence
+        of a sublist in l. the occurences are ordered by their end index,
+        occurences with the same end index by their start index (i.e. longer
+        sublists first) and then by the sublist index.
+        empty sublists occur at every index from 0 to len(l).
+        """
+        cdef Py_ssize_t state = 0
+        cdef Py_ssize_t output_state
+        cdef Py_ssize_t i = 0
+        for sublist_index in self.empty_sublist_indices:
+            yield sublist_index, 0
+        for element in l:
+            state = self._next_state(state, element)
+            output_state = state if self.outputs[state] else self.output_links[state]
+            while output_state > 0:
+                for sublist_index in self.outputs[output_state]:
+                    yield sublist_index, i + 1 - self.sublist_lengths[sublist_index]
+                output_state = self.output_links[output_state]
+            i += 1
+            for sublist_index in self.empty_sublist_indices:
+                yield sublist_index, i
+
+    def search_all_occurences(self, l) -> list:
+        """
+        returns for each sublist a list of the start indices of all its
+        occurences in l in ascending order
+        """
+        occurences = [[] for _ in range(len(self.sublist_lengths))]
+        for sublist_index, start_index in self.iter_occurences(l):
+            occurences[sublist_index].append(start_index)
+        return occurences
+
+    def contains_any(self, l) -> bool:
+        """returns True iff at least one of the sublists occurs in l"""
+        for _ in self.iter_occurences(l):
+            return True
+        return False
+
 def make_boyer_moore_char_table(needle):
     """
     Boyer Moore Search:
@@ -184,21 +314,52 @@ def iterate_self_product(l: List, skip_diagonal: bool = False) -> List[Tuple]:
             if not skip_diagonal or i != j:
                 yield (element_i, element_j)
 
-@cython.boundscheck(False)
-@cython.wraparound(False)
 def longest_common_sublists(list list_a not None, list list_b not None) -> tuple[int, list[tuple]]:
     """
     computes the longest common sublist (longest common substring) between two
     lists.
     See https://en.wikipedia.org/wiki/Longest_common_substring_problem
 
+    for small inputs, the quadratic dynamic programming algorithm is used. if
+    len(list_a) * len(list_b) > MAX_NR_OF_CELLS_FOR_DYNAMIC_PROGRAMMING and the
+    elements are hashable, a suffix automaton of list_a is built and list_b is
+    matched against it, i.e. runtime and memory are linear in the length of
+    the lists (plus the number of returned index pairs).
+
     Returns
     -------
     a 2-tuple consisting of the length of longest common list and a list with
     a 2-tuple for each common sublists (there can be more than one longest).
     each of these 2-tuples consists of the start index in list_a and the start index
-    in list_b.
+    in list_b. the 2-tuples are sorted in ascending order.
     """
+    if len(list_a) * len(list_b) > MAX_NR_OF_CELLS_FOR_DYNAMIC_PROGRAMMING:
+        try:
+            codes_a, codes_b = _encode_lists(list_a, list_b)
+        except TypeError:
+            #unhashable elements can only be compared by the dynamic programming
+            pass
+        else:
+            return _longest_common_sublists_by_suffix_automaton(codes_a, codes_b)
+    return _longest_common_sublists_by_dynamic_programming(list_a, list_b)
+
+def _encode_lists(list list_a, list list_b) -> tuple[np.ndarray, np.ndarray]:
+    """encodes the elements of list_a by integers >= 0. elements of list_b
+    that do not occur in list_a are encoded by -1"""
+    cdef dict codes = {}
+    cdef int[:] codes_a = np.empty(len(list_a), dtype=np.intc)
+    cdef int[:] codes_b = np.empty(len(list_b), dtype=np.intc)
+    cdef Py_ssize_t i
+    for i, element in enumerate(list_a):
+        codes_a[i] = codes.setdefault(element, len(codes))
+    for i, element in enumerate(list_b):
+        codes_b[i] = codes.get(element, -1)
+    return np.asarray(codes_a), np.asarray(codes_b)
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _longest_common_sublists_by_dynamic_programming(
+        list list_a, list list_b) -> tuple[int, list[tuple]]:
     cdef int length_a = len(list_a)
     cdef int length_b = len(list_b)
     cdef int[:,:] matrix = np.zeros((length_a, length_b), dtype=np.intc)
@@ -223,6 +384,149 @@ def longest_common_sublists(list list_a not None, list list_b not None) -> tuple
 
     return length, [(i-length+1,j-length+1) for i,j in indices]
 
+cdef class _SuffixAutomaton:
+    """
+    suffix automaton (directed acyclic word graph) of a sequence of integer
+    codes. see https://cp-algorithms.com/string/suffix-automaton.html
+    """
+    cdef vector[unordered_map[int,int]] transitions
+    cdef vector[int] suffix_links
+    cdef vector[int] lengths
+    #end position of the first occurence of the strings of a state
+    cdef vector[int] first_end_positions
+    cdef vector[bint] is_clone
+    cdef int last_state
+    #children in the suffix link tree, computed on demand
+    cdef list children
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def __init__(self, const int[:] codes):
+        cdef Py_ssize_t i
+        self.transitions.reserve(2 * codes.shape[0] + 1)
+        self.suffix_links.reserve(2 * codes.shape[0] + 1)
+        self.lengths.reserve(2 * codes.shape[0] + 1)
+        self.first_end_positions.reserve(2 * codes.shape[0] + 1)
+        self.is_clone.reserve(2 * codes.shape[0] + 1)
+        self.last_state = self._add_state(0, -1, -1, False)
+        with nogil:
+            for i in range(codes.shape[0]):
+                self._extend(codes[i], i)
+
+    cdef int _add_state(self, int length, int suffix_link,
+                        int first_end_position, bint is_clone) noexcept nogil:
+        cdef unordered_map[int,int] transitions
+        self.transitions.push_back(transitions)
+        self.suffix_links.push_back(suffix_link)
+        self.lengths.push_back(length)
+        self.first_end_positions.push_back(first_end_position)
+        self.is_clone.push_back(is_clone)
+        return <int>self.lengths.size() - 1
+
+    cdef void _extend(self, int code, int position) noexcept nogil:
+        cdef int state = self._add_state(
+            self.lengths[self.last_state] + 1, 0, position, False)
+        cdef int p = self.last_state
+        cdef int q, clone
+        cdef unordered_map[int,int] transitions_of_q
+        while p != -1 and self.transitions[p].count(code) == 0:
+            self.transitions[p][code] = state
+            p = self.suffix_links[p]
+        if p != -1:
+            q = self.transitions[p][code]
+            if self.lengths[p] + 1 == self.lengths[q]:
+                self.suffix_links[state] = q
+            else:
+                #copy before _add_state, which can reallocate the vector
+                transitions_of_q = self.transitions[q]
+                clone = self._add_state(
+                    self.lengths[p] + 1, self.suffix_links[q],
+                    self.first_end_positions[q], True)
+                self.transitions[clone] = transitions_of_q
+                while p != -1 and self.transitions[p][code] == q:
+                    self.transitions[p][code] = clone
+                    p = self.suffix_links[p]
+                self.suffix_links[q] = clone
+                self.suffix_links[state] = clone
+        self.last_state = state
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef tuple match_longest(self, const int[:] codes):
+        """returns the length of the longest common sublist and a list of
+        (end position in codes, state) pairs for all occurences in codes"""
+        cdef int state = 0
+        cdef int length = 0
+        cdef int longest = 0
+        cdef vector[int] end_positions
+        cdef vector[int] states
+        cdef Py_ssize_t j
+        cdef int code
+        with nogil:
+            for j in range(codes.shape[0]):
+                code = codes[j]
+                if code < 0:
+                    state = 0
+                    length = 0
+                    continue
+                while state != 0 and self.transitions[state].count(code) == 0:
+                    state = self.suffix_links[state]
+                    length = self.lengths[state]
+                if self.transitions[state].count(code) > 0:
+                    state = self.transitions[state][code]
+                    length += 1
+                else:
+                    length = 0
+                if length > longest:
+                    longest = length
+                    end_positions.clear()
+                    states.clear()
+                if length == longest and length > 0:
+                    end_positions.push_back(<int>j)
+                    states.push_back(state)
+        return longest, [(end_positions[j], states[j]) for j in range(end_positions.size())]
+
+    cdef list get_end_positions(self, int state):
+        """returns all end positions of the strings of the given state, i.e.
+        the first end positions of all non-cloned states in the subtree of the
+        suffix link tree below the given state"""
+        if self.children is None:
+            self.children = self._get_children_in_suffix_link_tree()
+        cdef list children = self.children
+        cdef list end_positions = []
+        cdef list stack = [state]
+        while stack:
+            state = stack.pop()
+            if not self.is_clone[state]:
+                end_positions.append(self.first_end_positions[state])
+            stack.extend(children[state])
+        return end_positions
+
+    cdef list _get_children_in_suffix_link_tree(self):
+        cdef list children = [[] for _ in range(self.lengths.size())]
+        cdef Py_ssize_t state
+        for state in range(1, self.lengths.size()):
+            children[self.suffix_links[state]].append(state)
+        return children
+
+def _longest_common_sublists_by_suffix_automaton(
+        const int[:] codes_a, const int[:] codes_b) -> tuple[int, list[tuple]]:
+    cdef _SuffixAutomaton automaton = _SuffixAutomaton(codes_a)
+    length, occurences_in_b = automaton.match_longest(codes_b)
+    cdef dict end_positions_in_a = {}
+    cdef list indices = []
+    for end_position_in_b, state in occurences_in_b:
+        try:
+            end_positions = end_positions_in_a[state]
+        except KeyError:
+            end_positions = automaton.get_end_positions(state)
+            end_positions_in_a[state] = end_positions
+        for end_position_in_a in end_positions:
+            indices.append((end_position_in_a - length + 1,
+                            end_position_in_b - length + 1))
+    indices.sort()
+    return length, indices
+
 def shuffle_together(*list_of_lists, random: Random|None = None):
     #https://stackoverflow.com/questions/23289547/shuffle-two-list-at-once-with-same-order
     temp = list(zip(*list_of_lists))
@@ -0,0 +1,337 @@
+'''
+    This file is part of Prolothar-Common (More Info: https://github.com/shs-it/prolothar-common).
+
+    Prolothar-Common is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Prolothar-Common is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
+'''
+
+"""
+mergeable streaming summaries of distributions with the same push/merge
+interface as Statistics. in contrast to Statistics, they can answer quantile
+queries (e.g. median or percentiles) without storing all values.
+"""
+
+from typing import Iterable, List
+from random import Random
+import math
+
+import numpy as np
+
+class QuantileSketch():
+    """
+    KLL sketch for approximate quantiles of a stream of numbers in memory
+    O(k), i.e. independent of the number of values.
+    the rank error of a quantile is about 1.7 / k with high probability.
+    see Karnin, Lang and Liberty: "Optimal Quantile Approximation in Streams"
+    https://arxiv.org/abs/1603.05346
+    """
+
+    def __init__(self, iterable: Iterable[float] = (), k: int = 200,
+                 random_seed: int = None):
+        """
+        creates a new sketch
+
+        Parameters
+        ----------
+        iterable : Iterable[float], optional
+            initial values that are pushed into the sketch, by default ()
+        k : int, optional
+            controls accuracy and memory of the sketch, by default 200
+        random_seed : int, optional
+            seed for the random choices of the compactions, by default None
+
+        Raises
+        ------
+        ValueError
+            if k < 2
+        """
+        if k < 2:
+            raise ValueError('k must be at least 2, but is %r' % k)
+        self.__k = k
+        self.__random = Random(random_seed)
+        #compactor at level h stores values with weight 2**h
+        self.__compactors: List[List[float]] = [[]]
+        self.__size = 0
+        self.__max_size = self.__compute_capacity(0)
+        self.__count = 0
+        self.__min = float('NaN')
+        self.__max = float('NaN')
+        for value in iterable:
+            self.push(value)
+
+    def __len__(self):
+        """Number of values that have been pushed."""
+        return self.__count
+
+    def get_k(self) -> int:
+        return self.__k
+
+    def push(self, value: float):
+        """Add `value` to the sketch."""
+        value = float(value)
+        self.__update_min_max(value, value)
+        self.__count += 1
+        self.__compactors[0].append(value)
+        self.__size += 1
+        if self.__size >= self.__max_size:
+            self.__compress()
+
+    def push_array(self, values: np.ndarray):
+        """Add all values of a NumPy array to the sketch."""
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        if len(values) == 0:
+            return
+        self.__update_min_max(values.min(), values.max())
+        self.__count += len(values)
+        for start in range(0, len(values), self.__k):
+            chunk = values[start:start + self.__k].tolist()
+            self.__compactors[0].extend(chunk)
+            self.__size += len(chunk)
+            if self.__size >= self.__max_size:
+                self.__compress()
+
+    def merge(self, other: 'QuantileSketch'):
+        """adds all values summarized by "other" to this sketch. "other" is
+        not changed."""
+        if len(other) == 0:
+            return
+        self.__update_min_max(other.__min, other.__max)
+        self.__count += other.__count
+        while len(self.__compactors) < len(other.__compactors):
+            self.__compactors.append([])
+        for compactor, other_compactor in zip(self.__compactors, other.__compactors):
+            compactor.extend(other_compactor)
+        self.__size += other.__size
+        self.__max_size = self.__compute_max_size()
+        while self.__size >= self.__max_size:
+            self.__compress()
+
+    def minimum(self) -> float:
+        """Minimum of values."""
+        return self.__min
+
+    def maximum(self) -> float:
+        """Maximum of values."""
+        return self.__max
+
+    def quantile(self, q: float) -> float:
+        """returns an approximation of the q-quantile, e.g. the median for
+        q = 0.5. q = 0 and q = 1 return the exact minimum and maximum.
+        returns NaN if the sketch is empty.
+
+        Raises
+        ------
+        ValueError
+            if q is not in [0,1]
+        """
+        return self.quantiles([q])[0]
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        """returns approximations of the q-quantiles for all given q"""
+        qs = list(qs)
+        for q in qs:
+            if not 0 <= q <= 1:
+                raise ValueError('q must be in [0,1], but is %r' % q)
+        if self.__count == 0:
+            return [float('NaN')] * len(qs)
+        values, cumulative_weights = self.__get_sorted_values_and_cumulative_weights()
+        result = []
+        for q in qs:
+            if q == 0:
+                result.append(self.__min)
+            elif q == 1:
+                result.append(self.__max)
+            else:
+                i = np.searchsorted(cumulative_weights, q * cumulative_weights[-1])
+                result.append(float(values[min(i, len(values) - 1)]))
+        return result
+
+    def rank(self, value: float) -> float:
+        """returns an approximation of the fraction of values <= value"""
+        if self.__count == 0:
+            return float('NaN')
+        values, cumulative_weights = self.__get_sorted_values_and_cumulative_weights()
+        i = np.searchsorted(values, value, side='right')
+        if i == 0:
+            return 0.0
+        return float(cumulative_weights[i - 1] / cumulative_weights[-1])
+
+    def __get_sorted_values_and_cumulative_weights(self):
+        values = np.concatenate([
+            np.asarray(compactor, dtype=np.float64) for compactor in self.__compactors])
+        weights = np.concatenate([
+            np.full(len(compactor), 2**level, dtype=np.int64)
+            for level, compactor in enumerate(self.__compactors)])
+        order = np.argsort(values, kind='stable')
+        return values[order], np.cumsum(weights[order])
+
+    def __update_min_max(self, minimum: float, maximum: float):
+        if self.__count == 0:
+            self.__min = float(minimum)
+            self.__max = float(maximum)
+        else:
+            self.__min = min(self.__min, float(minimum))
+            self.__max = max(self.__max, float(maximum))
+
+    def __compute_capacity(self, level: int) -> int:
+        depth = len(self.__compactors) - level - 1
+        return max(2, int(math.ceil(self.__k * (2 / 3)**depth)))
+
+    def __compute_max_size(self) -> int:
+        return sum(self.__compute_capacity(level)
+                   for level in range(len(self.__compactors)))
+
+    def __compress(self):
+        for level, compactor in enumerate(self.__compactors):
+            if len(compactor) >= self.__compute_capacity(level):
+                if level + 1 == len(self.__compactors):
+                    self.__compactors.append([])
+                compactor.sort()
+                #an odd number of values keeps its largest value on this level
+                remainder = [compactor.pop()] if len(compactor) % 2 == 1 else []
+                promoted = compactor[self.__random.randint(0, 1)::2]
+                self.__compactors[level + 1].extend(promoted)
+                self.__compactors[level] = remainder
+                self.__size -= len(compactor) - len(promoted)
+                self.__max_size = self.__compute_max_size()
+                if self.__size < self.__max_size:
+                    break
+
+class Histogram():
+    """
+    counts values in fixed bins of equal width. values outside of the range
+    of the bins are counted separately. histograms with the same bins can be
+    merged.
+    """
+
+    def __init__(self, lower_bound: float, upper_bound: float, nr_of_bins: int,
+                 iterable: Iterable[float] = ()):
+        """
+        creates a new histogram without values
+
+        Parameters
+        ----------
+        lower_bound : float
+            the left edge of the first bin
+        upper_bound : float
+            the right edge of the last bin. values equal to the upper bound
+            are counted in the last bin.
+        nr_of_bins : int
+            number of bins
+        iterable : Iterable[float], optional
+            initial values that are pushed into the histogram, by default ()
+
+        Raises
+        ------
+        ValueError
+            if lower_bound >= upper_bound or nr_of_bins < 1
+        """
+        if not lower_bound < upper_bound:
+            raise ValueError('lower_bound must be smaller than upper_bound')
+        if nr_of_bins < 1:
+            raise ValueError('nr_of_bins must be at least 1, but is %r' % nr_of_bins)
+        self.__lower_bound = float(lower_bound)
+        self.__upper_bound = float(upper_bound)
+        self.__nr_of_bins = nr_of_bins
+        self.__bin_width = (self.__upper_bound - self.__lower_bound) / nr_of_bins
+        self.__counts = np.zeros(nr_of_bins, dtype=np.int64)
+        self.__nr_of_values_below = 0
+        self.__nr_of_values_above = 0
+        for value in iterable:
+            self.push(value)
+
+    def __len__(self):
+        """Number of values that have been pushed."""
+        return (int(self.__counts.sum()) + self.__nr_of_values_below
+                + self.__nr_of_values_above)
+
+    def push(self, value: float):
+        """Add `value` to the histogram."""
+        if value < self.__lower_bound:
+            self.__nr_of_values_below += 1
+        elif value > self.__upper_bound:
+            self.__nr_of_values_above += 1
+        else:
+            self.__counts[min(int((value - self.__lower_bound) / self.__bin_width),
+                              self.__nr_of_bins - 1)] += 1
+
+    def push_array(self, values: np.ndarray):
+        """Add all values of a NumPy array to the histogram."""
+        values = np.asarray(values, dtype=np.float64).reshape(-1)
+        below = values < self.__lower_bound
+        above = values > self.__upper_bound
+        self.__nr_of_values_below += int(below.sum())
+        self.__nr_of_values_above += int(above.sum())
+        values = values[~(below | above)]
+        bin_indices = np.minimum(
+            ((values - self.__lower_bound) / self.__bin_width).astype(np.int64),
+            self.__nr_of_bins - 1)
+        self.__counts += np.bincount(bin_indices, minlength=self.__nr_of_bins)
+
+    def merge(self, other: 'Histogram'):
+        """adds the counts of "other" to this histogram
+
+        Raises
+        ------
+        ValueError
+            if the histograms have different bins
+        """
+        if (self.__lower_bound, self.__upper_bound, self.__nr_of_bins) != \
+           (other.__lower_bound, other.__upper_bound, other.__nr_of_bins):
+            raise ValueError('histograms with different bins cannot be merged')
+        self.__counts += other.__counts
+        self.__nr_of_values_below += other.__nr_of_values_below
+        self.__nr_of_values_above += other.__nr_of_values_above
+
+    def get_counts(self) -> np.ndarray:
+        """returns a copy of the number of values in each bin"""
+        return self.__counts.copy()
+
+    def get_bin_edges(self) -> np.ndarray:
+        """returns the nr_of_bins + 1 edges of the bins"""
+        return np.linspace(self.__lower_bound, self.__upper_bound, self.__nr_of_bins + 1)
+
+    def get_nr_of_values_below(self) -> int:
+        """number of values smaller than the lower bound"""
+        return self.__nr_of_values_below
+
+    def get_nr_of_values_above(self) -> int:
+        """number of values larger than the upper bound"""
+        return self.__nr_of_values_above
+
+    def quantile(self, q: float) -> float:
+        """returns an approximation of the q-quantile by linear interpolation
+        within the bin that contains it. values outside of the bins are
+        considered to lie on the lower and upper bound. returns NaN if the
+        histogram is empty.
+
+        Raises
+        ------
+        ValueError
+            if q is not in [0,1]
+        """
+        if not 0 <= q <= 1:
+            raise ValueError('q must be in [0,1], but is %r' % q)
+        nr_of_values = len(self)
+        if nr_of_values == 0:
+            return float('NaN')
+        target_rank = q * nr_of_values
+        if target_rank <= self.__nr_of_values_below:
+            return self.__lower_bound
+        cumulative_counts = np.cumsum(self.__counts) + self.__nr_of_values_below
+        i = int(np.searchsorted(cumulative_counts, target_rank))
+        if i == self.__nr_of_bins:
+            return self.__upper_bound
+        rank_before_bin = cumulative_counts[i] - self.__counts[i]
+        fraction_of_bin = (target_rank - rank_before_bin) / self.__counts[i]
+        return self.__lower_bound + (i + fraction_of_bin) * self.__bin_width
@@ -16,15 +16,55 @@
 '''
 
 from typing import Iterable
+import numpy as np
 
 class Statistics:
 
     def __init__(self, iterable: Iterable[float]=()): ...
 
+    @staticmethod
+    def from_array(values: np.ndarray) -> 'Statistics':
+        """creates the Statistics summary of all values in a NumPy array
+        (or anything that can be converted to a float64 array) in one C pass"""
+        ...
+
     def push(self, value: float): ...
+    def push_array(self, values: np.ndarray):
+        """Add all values of a NumPy array to the Statistics summary."""
+        ...
     def merge(self, other: 'Statistics'): ...
     def minimum(self) -> float: ...
     def maximum(self) -> float: ...
     def mean(self) -> float: ...
     def variance(self, degrees_of_freedom: int = 1) -> float: ...
     def stddev(self, degrees_of_freedom: int = 1) -> float: ...
+
+def compute_grouped_statistics(
+        key_codes: np.ndarray, values: np.ndarray,
+        nr_of_keys: int = -1) -> list[Statistics]:
+    """
+    computes one Statistics summary per key in one C pass over two arrays
+    of the same length, i.e. values[i] is pushed to the summary of key_codes[i].
+
+    Parameters
+    ----------
+    key_codes : np.ndarray
+        integer codes of the keys, must be >= 0
+    values : np.ndarray
+        the values that are summarized
+    nr_of_keys : int, optional
+        number of keys, by default -1, i.e. max(key_codes) + 1
+
+    Returns
+    -------
+    list[Statistics]
+        the Statistics of the key with code i at index i. keys without values
+        have an empty Statistics summary.
+
+    Raises
+    ------
+    ValueError
+        if the arrays have different lengths or if a key code is negative
+        or not smaller than nr_of_keys
+    """
+    ...
@@ -17,6 +17,38 @@
 
 from libc.math cimport sqrt
 cimport cython
+import numpy as np
+
+@cython.cdivision(True)
+cdef inline void _push_to_moments(
+        double value, unsigned long* count, double* mean, double* rho,
+        double* tau, double* phi, double* minimum, double* maximum) noexcept nogil:
+    if count[0] == 0:
+        minimum[0] = value
+        maximum[0] = value
+    else:
+        if value < minimum[0]:
+            minimum[0] = value
+        if value > maximum[0]:
+            maximum[0] = value
+
+    cdef double delta = value - mean[0]
+    cdef double delta_n = delta / (count[0] + 1)
+    cdef double delta_n2 = delta_n * delta_n
+    cdef double term = delta * delta_n * count[0]
+
+    count[0] += 1
+    cdef double n = count[0]
+    mean[0] += delta_n
+    phi[0] += (
+        term * delta_n2 * (n * n - 3 * n + 3)
+        + 6 * delta_n2 * rho[0]
+        - 4 * delta_n * tau[0]
+    )
+    tau[0] += (
+        term * delta_n * (n - 2) - 3 * delta_n * rho[0]
+    )
+    rho[0] += term
 
 cdef class Statistics:
     """
@@ -38,36 +70,38 @@ cdef class Statistics:
         """Number of values other have been pushed."""
         return self._count
 
-    @cython.cdivision(True)
+    @staticmethod
+    def from_array(values) -> Statistics:
+        """creates the Statistics summary of all values in a NumPy array
+        (or anything that can be converted to a float64 array) in one C pass"""
+        cdef Statistics statistics = Statistics()
+        statistics.push_array(values)
+        return statistics
+
     cpdef push(self, double value):
         """Add `value` to the Statistics summary."""
-        if self._count == 0.0:
-            self._min = value
-            self._max = value
-        else:
-            if value < self._min:
-                self._min = value
-            if value > self._max:
-                self._max = value
-
-        cdef double delta = value - self._mean
-        cdef double delta_n = delta / (self._count + 1)
-        cdef double delta_n2 = delta_n * delta_n
-        cdef double term = delta * delta_n * self._count
-
-        self._count += 1
-        self._mean += delta_n
-        self._phi += (
-            term * delta_n2 * (self._count ** 2 - 3 * self._count + 3)
-            + 6 * delta_n2 * self._rho
-            - 4 * delta_n * self._tau
-        )
-        self._tau += (
-            term * delta_n * (self._count - 2) - 3 * delta_n * self._rho
-        )
-        self._rho += term
+        _push_to_moments(
+            value, &self._count, &self._mean, &self._rho, &self._tau,
+            &self._phi, &self._min, &self._max)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def push_array(self, values):
+        """Add all values of a NumPy array to the Statistics summary."""
+        cdef const double[::1] flat_values = np.ascontiguousarray(
+            values, dtype=np.float64).reshape(-1)
+        cdef Py_ssize_t i
+        with nogil:
+            for i in range(flat_values.shape[0]):
+                _push_to_moments(
+                    flat_values[i], &self._count, &self._mean, &self._rho,
+                    &self._tau, &self._phi, &self._min, &self._max)
 
+    @cython.cdivision(True)
     cpdef merge(self, Statistics other):
+        cdef double count, other_count, sum_count
+        cdef double delta, delta2, delta3, delta4
+        cdef double sum_mean, sum_rho, sum_tau, sum_phi
         if len(other) > 0:
             if len(self) == 0:
                 self._count = other._count
@@ -78,33 +112,36 @@ cdef class Statistics:
                 self._tau = other._tau
                 self._phi = other._phi
             else:
-                sum_count = self._count + other._count
+                #counts as double to avoid integer overflows in the powers
+                count = self._count
+                other_count = other._count
+                sum_count = count + other_count
                 delta = other._mean - self._mean
-                delta2 = delta ** 2
-                delta3 = delta ** 3
-                delta4 = delta ** 4
+                delta2 = delta * delta
+                delta3 = delta2 * delta
+                delta4 = delta2 * delta2
 
                 sum_mean = (
-                    self._count * self._mean + other._count * other._mean
+                    count * self._mean + other_count * other._mean
                 ) / sum_count
 
                 sum_rho = (
                     self._rho
                     + other._rho
-                    + delta2 * self._count * other._count / sum_count
+                    + delta2 * count * other_count / sum_count
                 )
 
                 sum_tau = (
                     self._tau
                     + other._tau
                     + delta3
-                    * self._count
-                    * other._count
-                    * (self._count - other._count)
-                    / (sum_count ** 2)
+                    * count
+                    * other_count
+                    * (count - other_count)
+                    / (sum_count * sum_count)
                     + 3.0
                     * delta
-                    * (self._count * other._rho - other._count * self._rho)
+                    * (count * other._rho - other_count * self._rho)
                     / sum_count
                 )
 
@@ -112,31 +149,32 @@ cdef class Statistics:
                     self._phi
                     + other._phi
                     + delta4
-                    * self._count
-                    * other._count
-                    * (self._count ** 2 - self._count * other._count + other._count ** 2)
-                    / (sum_count ** 3)
+                    * count
+                    * other_count
+                    * (count * count - count * other_count + other_count * other_count)
+                    / (sum_count * sum_count * sum_count)
                     + 6.0
                     * delta2
                     * (
-                        self._count * self._count * other._rho
-                        + other._count * other._count * self._rho
+                        count * count * other._rho
+                        + other_count * other_count * self._rho
                     )
-                    / (sum_count ** 2)
+                    / (sum_count * sum_count)
                     + 4.0
                     * delta
-                    * (self._count * other._tau - other._count * self._tau)
+                    * (count * other._tau - other_count * self._tau)
                     / sum_count
                 )
 
-                self._count = sum_count
+                self._count += other._count
                 self._mean = sum_mean
                 self._rho = sum_rho
                 self._tau = sum_tau
                 self._phi = sum_phi
-                self._min = min(self._min, other._min)
-                self._max = max(self._max, other._max)
-
+                if other._min < self._min:
+                    self._min = other._min
+                if other._max > self._max:
+                    self._max = other._max
 
     cpdef double minimum(self):
         """Minimum of values."""
@@ -163,3 +201,70 @@ cdef class Statistics:
         if degrees_of_freedom >= self._count:
             return float('NaN')
         return sqrt(self._rho / (self._count - degrees_of_freedom))
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def compute_grouped_statistics(key_codes, values, Py_ssize_t nr_of_keys = -1) -> list[Statistics]:
+    """
+    computes one Statistics summary per key in one C pass over two arrays
+    of the same length, i.e. values[i] is pushed to the summary of key_codes[i].
+
+    Parameters
+    ----------
+    key_codes : np.ndarray
+        integer codes of the keys, must be >= 0
+    values : np.ndarray
+        the values that are summarized
+    nr_of_keys : int, optional
+        number of keys, by default -1, i.e. max(key_codes) + 1
+
+    Returns
+    -------
+    list[Statistics]
+        the Statistics of the key with code i at index i. keys without values
+        have an empty Statistics summary.
+
+    Raises
+    ------
+    ValueError
+        if the arrays have different lengths or if a key code is negative
+        or not smaller than nr_of_keys
+    """
+    cdef const long long[::1] flat_key_codes = np.ascontiguousarray(
+        key_codes, dtype=np.int64).reshape(-1)
+    cdef const double[::1] flat_values = np.ascontiguousarray(
+        values, dtype=np.float64).reshape(-1)
+    if flat_key_codes.shape[0] != flat_values.shape[0]:
+        raise ValueError('key_codes and values must have the same length')
+    if nr_of_keys < 0:
+        nr_of_keys = np.max(flat_key_codes) + 1 if flat_key_codes.shape[0] > 0 else 0
+    cdef list statistics_list = [Statistics() for _ in range(nr_of_keys)]
+    #'L' is C unsigned long, which has 32 bits on Windows and 64 bits on Linux
+    cdef unsigned long[::1] counts = np.zeros(nr_of_keys, dtype=np.dtype('L'))
+    cdef double[:,::1] moments = np.zeros((nr_of_keys, 6))
+    cdef Py_ssize_t i
+    cdef long long key
+    cdef bint has_invalid_key_code = False
+    with nogil:
+        for i in range(flat_values.shape[0]):
+            key = flat_key_codes[i]
+            if key < 0 or key >= nr_of_keys:
+                has_invalid_key_code = True
+                break
+            _push_to_moments(
+                flat_values[i], &counts[key], &moments[key,0], &moments[key,1],
+                &moments[key,2], &moments[key,3], &moments[key,4], &moments[key,5])
+    if has_invalid_key_code:
+        raise ValueError('key codes must be >= 0 and < %d' % nr_of_keys)
+    cdef Statistics statistics
+    for i in range(nr_of_keys):
+        if counts[i] > 0:
+            statistics = statistics_list[i]
+            statistics._count = counts[i]
+            statistics._mean = moments[i,0]
+            statistics._rho = moments[i,1]
+            statistics._tau = moments[i,2]
+            statistics._phi = moments[i,3]
+            statistics._min = moments[i,4]
+            statistics._max = moments[i,5]
+    return statistics_list
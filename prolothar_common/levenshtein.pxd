@@ -15,6 +15,25 @@
     along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
 '''
 
+from libc.stdint cimport uint64_t
+from libcpp.vector cimport vector
+
+cdef struct MatchVectors:
+    #code => index of the code in the alphabet of the pattern, -1 if the code
+    #does not occur in the pattern
+    vector[int] code_indices
+    #the non-zero words of code index c are at [starts[c], starts[c+1])
+    vector[Py_ssize_t] starts
+    vector[Py_ssize_t] word_indices
+    vector[uint64_t] words
+
+cdef MatchVectors compute_match_vectors(const int[:] pattern) noexcept nogil
+
+cdef inline int get_code_index(const MatchVectors& match_vectors, int code) noexcept nogil:
+    if code < 0 or <size_t>code >= match_vectors.code_indices.size():
+        return -1
+    return match_vectors.code_indices[code]
+
 cpdef enum EditOperationType:
     DELETE = 0
     INSERT = 1
@@ -25,8 +44,38 @@ cdef class EditOperation:
     cdef public int j
     cdef public EditOperationType operation_type
 
+cdef class EditCostTable:
+    cdef dict codes
+    cdef double[:] insertion_costs
+    cdef double[:] deletion_costs
+    cdef double[:,:] substitution_costs
+    cdef double default_insertion_cost
+    cdef double default_deletion_cost
+    cdef double default_substitution_cost
+
+    cdef double get_insertion_cost(self, int code) noexcept nogil
+    cdef double get_deletion_cost(self, int code) noexcept nogil
+    cdef double get_substitution_cost(self, int code1, int code2) noexcept nogil
+
 cdef int[:,:] compute_cost_matrix(
         s1, s2, int insertion_cost = ?, int deletion_cost = ?,
         int substitution_cost = ?)
 
-cpdef list backtrace(s1, s2, int[:,:] cost_matrix)
\ No newline at end of file
+cpdef list backtrace(s1, s2, int[:,:] cost_matrix)
+
+cdef long long compute_distance_of_codes(
+        const int[:] codes1, const int[:] codes2, int insertion_cost,
+        int deletion_cost, int substitution_cost,
+        long long max_distance) noexcept nogil
+
+cdef void compute_hirschberg_alignment(
+        const int[:] codes1, const int[:] codes2, int insertion_cost,
+        int deletion_cost, int substitution_cost, list edit_operations,
+        list matches)
+
+cpdef double[:,:] compute_cost_matrix_of_codes(
+        const int[:] codes1, const int[:] codes2, EditCostTable cost_table)
+
+cpdef list backtrace_codes(
+        const int[:] codes1, const int[:] codes2, EditCostTable cost_table,
+        const double[:,:] cost_matrix)
@@ -15,13 +15,23 @@
     along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
 '''
 
-from typing import Tuple, List
+from typing import Tuple, List, Dict, Hashable
 import numpy as np
 
 cimport cython
+from libc.stdint cimport uint64_t, int64_t
+from libcpp.vector cimport vector
 
 cdef int MAX_COST = 100000
 
+#if the cost matrix would have more cells, the backtrace is computed with
+#Hirschberg's algorithm in linear memory
+MAX_NR_OF_CELLS_FOR_FULL_BACKTRACE = 25_000_000
+
+#subproblems of Hirschberg's algorithm up to this size are solved with the
+#full cost matrix
+cdef Py_ssize_t _MAX_NR_OF_CELLS_FOR_HIRSCHBERG_BASE_CASE = 4096
+
 cdef class EditOperation:
     def __init__(self, int i, int j, EditOperationType operation_type):
         self.i = i
@@ -47,7 +57,19 @@ def levenshtein_with_backtrace(
     strsimpy
 
     based on https://gist.github.com/curzona/9435822
+
+    if the cost matrix would have more than MAX_NR_OF_CELLS_FOR_FULL_BACKTRACE
+    cells and the elements are hashable,
+    levenshtein_with_linear_memory_backtrace is used instead.
     """
+    if (len(s1) + 1) * (len(s2) + 1) > MAX_NR_OF_CELLS_FOR_FULL_BACKTRACE:
+        try:
+            return levenshtein_with_linear_memory_backtrace(
+                s1, s2, insertion_cost=insertion_cost, deletion_cost=deletion_cost,
+                substitution_cost=substitution_cost)
+        except TypeError:
+            #unhashable elements can only be compared by the full matrix
+            pass
     cdef int[:,:] cost_matrix = compute_cost_matrix(
         s1, s2, insertion_cost=insertion_cost, deletion_cost=deletion_cost,
         substitution_cost=substitution_cost)
@@ -126,6 +148,653 @@ cpdef list backtrace(s1, s2, int[:,:] cost_matrix):
             j = j-1
             edits.append(EditOperation(i, j, EditOperationType.INSERT))
 
-        edits.reverse()
+    edits.reverse()
+    return edits
+
+def levenshtein_with_linear_memory_backtrace(
+        s1, s2, int insertion_cost = 1, int deletion_cost = 1,
+        int substitution_cost = 1) -> Tuple[int, List[EditOperation]]:
+    """
+    levenshtein with backtrace by the divide-and-conquer algorithm of
+    Hirschberg. needs O(min(len(s1), len(s2))) memory in addition to the
+    returned list and roughly twice the time of levenshtein_with_backtrace.
+    the edit operations are sorted by their positions. if there are several
+    optimal alignments, the returned one can differ from the one of
+    levenshtein_with_backtrace. the elements must be hashable.
+    """
+    if insertion_cost < 0 or deletion_cost < 0 or substitution_cost < 0:
+        raise ValueError('costs must not be negative')
+    codes1, codes2 = encode_sequences(s1, s2)
+    cdef list edit_operations = []
+    compute_hirschberg_alignment(
+        codes1, codes2, insertion_cost, deletion_cost, substitution_cost,
+        edit_operations, None)
+    cdef EditOperation edit_operation
+    cdef long long distance = 0
+    for edit_operation in edit_operations:
+        if edit_operation.operation_type == EditOperationType.INSERT:
+            distance += insertion_cost
+        elif edit_operation.operation_type == EditOperationType.DELETE:
+            distance += deletion_cost
+        else:
+            distance += substitution_cost
+    return distance, edit_operations
+
+cdef void compute_hirschberg_alignment(
+        const int[:] codes1, const int[:] codes2, int insertion_cost,
+        int deletion_cost, int substitution_cost, list edit_operations,
+        list matches):
+    """
+    computes an optimal alignment of two integer-coded sequences in linear
+    memory. the edit operations are appended to "edit_operations" and the
+    index pairs (i,j) of aligned equal elements to "matches" (if not None),
+    both in ascending order.
+    """
+    cdef list swapped_edit_operations, swapped_matches
+    cdef EditOperation edit_operation
+    if codes2.shape[0] <= codes1.shape[0]:
+        _compute_hirschberg_alignment(
+            codes1, codes2, insertion_cost, deletion_cost, substitution_cost,
+            0, 0, edit_operations, matches)
+        return
+    #the rows of the cost matrix should have the length of the shorter
+    #sequence. inserting into s2 is deleting from s1 and vice versa
+    swapped_edit_operations = []
+    swapped_matches = None if matches is None else []
+    _compute_hirschberg_alignment(
+        codes2, codes1, deletion_cost, insertion_cost, substitution_cost,
+        0, 0, swapped_edit_operations, swapped_matches)
+    for edit_operation in swapped_edit_operations:
+        edit_operations.append(EditOperation(
+            edit_operation.j, edit_operation.i,
+            _SWAPPED_OPERATION_TYPE[edit_operation.operation_type]))
+    if matches is not None:
+        matches.extend((j, i) for i, j in swapped_matches)
+
+_SWAPPED_OPERATION_TYPE = {
+    EditOperationType.DELETE: EditOperationType.INSERT,
+    EditOperationType.INSERT: EditOperationType.DELETE,
+    EditOperationType.SUBSTITUTE: EditOperationType.SUBSTITUTE
+}
+
+cdef void _compute_hirschberg_alignment(
+        const int[:] codes1, const int[:] codes2, long long insertion_cost,
+        long long deletion_cost, long long substitution_cost, Py_ssize_t offset1,
+        Py_ssize_t offset2, list edit_operations, list matches):
+    cdef Py_ssize_t n = codes1.shape[0]
+    cdef Py_ssize_t m = codes2.shape[0]
+    cdef Py_ssize_t i, j, middle, split
+    if n == 0:
+        for j in range(m):
+            edit_operations.append(EditOperation(
+                offset1, offset2 + j, EditOperationType.INSERT))
+        return
+    if m == 0:
+        for i in range(n):
+            edit_operations.append(EditOperation(
+                offset1 + i, offset2, EditOperationType.DELETE))
+        return
+    if n == 1 or (n + 1) * (m + 1) <= _MAX_NR_OF_CELLS_FOR_HIRSCHBERG_BASE_CASE:
+        _align_with_cost_matrix(
+            codes1, codes2, insertion_cost, deletion_cost, substitution_cost,
+            offset1, offset2, edit_operations, matches)
+        return
+    #the optimal path crosses the middle row at the column that minimizes the
+    #cost of the upper half plus the cost of the (reversed) lower half
+    middle = n // 2
+    cdef vector[int64_t] forward_costs = vector[int64_t](m + 1)
+    cdef vector[int64_t] backward_costs = vector[int64_t](m + 1)
+    with nogil:
+        _compute_last_cost_row(
+            codes1[:middle], codes2, insertion_cost, deletion_cost,
+            substitution_cost, forward_costs)
+        _compute_last_cost_row(
+            codes1[middle:][::-1], codes2[::-1], insertion_cost, deletion_cost,
+            substitution_cost, backward_costs)
+    split = 0
+    for j in range(1, m + 1):
+        if forward_costs[j] + backward_costs[m - j] < \
+        forward_costs[split] + backward_costs[m - split]:
+            split = j
+    _compute_hirschberg_alignment(
+        codes1[:middle], codes2[:split], insertion_cost, deletion_cost,
+        substitution_cost, offset1, offset2, edit_operations, matches)
+    _compute_hirschberg_alignment(
+        codes1[middle:], codes2[split:], insertion_cost, deletion_cost,
+        substitution_cost, offset1 + middle, offset2 + split, edit_operations,
+        matches)
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _compute_last_cost_row(
+        const int[:] codes1, const int[:] codes2, long long insertion_cost,
+        long long deletion_cost, long long substitution_cost,
+        vector[int64_t]& row) noexcept nogil:
+    """stores the last row of the cost matrix in "row" (length m+1)"""
+    cdef Py_ssize_t n = codes1.shape[0]
+    cdef Py_ssize_t m = codes2.shape[0]
+    cdef Py_ssize_t i, j
+    cdef long long diagonal, cost
+    for j in range(m + 1):
+        row[j] = j * insertion_cost
+    for i in range(1, n + 1):
+        diagonal = row[0]
+        row[0] = i * deletion_cost
+        for j in range(1, m + 1):
+            cost = diagonal
+            if codes1[i - 1] != codes2[j - 1]:
+                cost += substitution_cost
+            cost = min(cost, row[j] + deletion_cost, row[j - 1] + insertion_cost)
+            diagonal = row[j]
+            row[j] = cost
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _align_with_cost_matrix(
+        const int[:] codes1, const int[:] codes2, long long insertion_cost,
+        long long deletion_cost, long long substitution_cost, Py_ssize_t offset1,
+        Py_ssize_t offset2, list edit_operations, list matches):
+    """base case of Hirschberg's algorithm"""
+    cdef Py_ssize_t n = codes1.shape[0]
+    cdef Py_ssize_t m = codes2.shape[0]
+    cdef long long[:,:] cost_matrix = np.empty((n + 1, m + 1), dtype=np.longlong)
+    cdef Py_ssize_t i, j
+    cdef long long cost
+    for j in range(m + 1):
+        cost_matrix[0, j] = j * insertion_cost
+    for i in range(1, n + 1):
+        cost_matrix[i, 0] = i * deletion_cost
+        for j in range(1, m + 1):
+            cost = cost_matrix[i - 1, j - 1]
+            if codes1[i - 1] != codes2[j - 1]:
+                cost += substitution_cost
+            cost_matrix[i, j] = min(cost, cost_matrix[i - 1, j] + deletion_cost,
+                                    cost_matrix[i, j - 1] + insertion_cost)
+    cdef list reversed_edit_operations = []
+    cdef list reversed_matches = []
+    i = n
+    j = m
+    while i > 0 or j > 0:
+        if i > 0 and j > 0 and codes1[i - 1] == codes2[j - 1] \
+        and cost_matrix[i, j] == cost_matrix[i - 1, j - 1]:
+            i -= 1
+            j -= 1
+            reversed_matches.append((offset1 + i, offset2 + j))
+        elif i > 0 and j > 0 and cost_matrix[i, j] == \
+        cost_matrix[i - 1, j - 1] + substitution_cost:
+            i -= 1
+            j -= 1
+            reversed_edit_operations.append(EditOperation(
+                offset1 + i, offset2 + j, EditOperationType.SUBSTITUTE))
+        elif i > 0 and cost_matrix[i, j] == cost_matrix[i - 1, j] + deletion_cost:
+            i -= 1
+            reversed_edit_operations.append(EditOperation(
+                offset1 + i, offset2 + j, EditOperationType.DELETE))
+        else:
+            j -= 1
+            reversed_edit_operations.append(EditOperation(
+                offset1 + i, offset2 + j, EditOperationType.INSERT))
+    reversed_edit_operations.reverse()
+    edit_operations.extend(reversed_edit_operations)
+    if matches is not None:
+        reversed_matches.reverse()
+        matches.extend(reversed_matches)
+
+def levenshtein_distance(
+        s1, s2, int insertion_cost = 1, int deletion_cost = 1,
+        int substitution_cost = 1, max_distance = None) -> int:
+    """
+    computes the levenshtein distance between two sequences without
+    backtrace. the elements of both sequences are mapped to integer codes,
+    i.e. they only need to be hashable. for unit costs, the bit-parallel
+    algorithm of Myers (in the blocked version of Hyyrö) is used, which
+    needs O(len(s1) * len(s2) / 64) time. for other costs, the cost matrix is
+    computed row by row in linear memory.
+
+    if max_distance is given, only the band of the cost matrix with costs
+    <= max_distance is computed and the computation stops as soon as the
+    distance must exceed max_distance. in this case, max_distance + 1 is
+    returned.
+    """
+    cdef long long c_max_distance = -1 if max_distance is None else max_distance
+    if max_distance is not None and max_distance < 0:
+        raise ValueError('max_distance must not be negative')
+    if insertion_cost < 0 or deletion_cost < 0 or substitution_cost < 0:
+        raise ValueError('costs must not be negative')
+    codes1, codes2 = encode_sequences(s1, s2)
+    return compute_distance_of_codes(
+        codes1, codes2, insertion_cost, deletion_cost, substitution_cost,
+        c_max_distance)
+
+def levenshtein_distance_of_codes(
+        const int[:] codes1, const int[:] codes2, int insertion_cost = 1,
+        int deletion_cost = 1, int substitution_cost = 1,
+        max_distance = None) -> int:
+    """same as levenshtein_distance, but for sequences that are already
+    encoded as integer arrays (dtype intc) with non-negative codes, e.g. by
+    encode_sequences. avoids the encoding if a sequence is compared many
+    times"""
+    if max_distance is not None and max_distance < 0:
+        raise ValueError('max_distance must not be negative')
+    if insertion_cost < 0 or deletion_cost < 0 or substitution_cost < 0:
+        raise ValueError('costs must not be negative')
+    return compute_distance_of_codes(
+        codes1, codes2, insertion_cost, deletion_cost, substitution_cost,
+        -1 if max_distance is None else max_distance)
+
+def encode_sequences(s1, s2) -> Tuple[np.ndarray, np.ndarray]:
+    """maps the elements of two sequences to integer codes 0, 1, 2, ...
+    such that equal elements have the same code. returns two numpy arrays of
+    dtype intc"""
+    cdef dict codes = {}
+    return (
+        np.fromiter([codes.setdefault(x, len(codes)) for x in s1],
+                    dtype=np.intc, count=len(s1)),
+        np.fromiter([codes.setdefault(x, len(codes)) for x in s2],
+                    dtype=np.intc, count=len(s2))
+    )
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef long long compute_distance_of_codes(
+        const int[:] codes1, const int[:] codes2, int insertion_cost,
+        int deletion_cost, int substitution_cost,
+        long long max_distance) noexcept nogil:
+    """
+    levenshtein distance between two integer-coded sequences with
+    non-negative codes. max_distance = -1 means that there is no limit.
+    otherwise, max_distance + 1 is returned if the distance is larger than
+    max_distance.
+    """
+    cdef Py_ssize_t start = 0
+    cdef Py_ssize_t end1 = codes1.shape[0]
+    cdef Py_ssize_t end2 = codes2.shape[0]
+    #common prefixes and suffixes do not change the distance
+    while start < end1 and start < end2 and codes1[start] == codes2[start]:
+        start += 1
+    while end1 > start and end2 > start and codes1[end1 - 1] == codes2[end2 - 1]:
+        end1 -= 1
+        end2 -= 1
+    cdef long long upper_bound = (
+        <long long>(end1 - start) * deletion_cost
+        + <long long>(end2 - start) * insertion_cost)
+    if max_distance < 0 or max_distance > upper_bound:
+        max_distance = upper_bound
+    cdef long long distance
+    if end1 == start or end2 == start:
+        distance = upper_bound
+    elif insertion_cost == 1 and deletion_cost == 1 and substitution_cost == 1:
+        if end1 - start <= end2 - start:
+            distance = _compute_bit_parallel_distance(
+                codes1[start:end1], codes2[start:end2], max_distance)
+        else:
+            distance = _compute_bit_parallel_distance(
+                codes2[start:end2], codes1[start:end1], max_distance)
+    else:
+        distance = _compute_banded_distance(
+            codes1[start:end1], codes2[start:end2], insertion_cost,
+            deletion_cost, substitution_cost, max_distance)
+    return distance if distance <= max_distance else max_distance + 1
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef MatchVectors compute_match_vectors(const int[:] pattern) noexcept nogil:
+    """
+    match vectors of a pattern with non-negative codes for bit-parallel
+    algorithms: bit i of word w of a code is set iff pattern[64w+i] equals
+    the code. only the non-zero words of the codes in the pattern are stored,
+    i.e. the memory is linear in len(pattern) and the largest code instead of
+    the product of the number of codes and len(pattern) / 64.
+    """
+    cdef MatchVectors match_vectors
+    cdef Py_ssize_t m = pattern.shape[0]
+    cdef Py_ssize_t i, w
+    cdef int code_index, nr_of_codes = 0, max_code = -1
+    for i in range(m):
+        if pattern[i] > max_code:
+            max_code = pattern[i]
+    match_vectors.code_indices.assign(max_code + 1, -1)
+    #the last word in which a code has been seen and the number of its words
+    cdef vector[Py_ssize_t] last_words
+    cdef vector[Py_ssize_t] nr_of_words
+    for i in range(m):
+        code_index = match_vectors.code_indices[pattern[i]]
+        if code_index < 0:
+            code_index = nr_of_codes
+            match_vectors.code_indices[pattern[i]] = code_index
+            nr_of_codes += 1
+            last_words.push_back(-1)
+            nr_of_words.push_back(0)
+        if last_words[code_index] != i // 64:
+            last_words[code_index] = i // 64
+            nr_of_words[code_index] += 1
+    match_vectors.starts.assign(nr_of_codes + 1, 0)
+    for code_index in range(nr_of_codes):
+        match_vectors.starts[code_index + 1] = (
+            match_vectors.starts[code_index] + nr_of_words[code_index])
+        last_words[code_index] = -1
+    match_vectors.word_indices.assign(match_vectors.starts[nr_of_codes], 0)
+    match_vectors.words.assign(match_vectors.starts[nr_of_codes], 0)
+    #reused as position of the current word of each code
+    cdef vector[Py_ssize_t] positions = match_vectors.starts
+    for i in range(m):
+        code_index = match_vectors.code_indices[pattern[i]]
+        w = i // 64
+        if last_words[code_index] != w:
+            last_words[code_index] = w
+            match_vectors.word_indices[positions[code_index]] = w
+            positions[code_index] += 1
+        match_vectors.words[positions[code_index] - 1] |= (<uint64_t>1) << (i % 64)
+    return match_vectors
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef long long _compute_bit_parallel_distance(
+        const int[:] pattern, const int[:] text,
+        long long max_distance) noexcept nogil:
+    """unit cost levenshtein distance by the blocked bit-vector algorithm of
+    Myers and Hyyrö. the pattern should be the shorter sequence. returns a
+    value > max_distance as soon as the distance must exceed max_distance."""
+    cdef Py_ssize_t m = pattern.shape[0]
+    cdef Py_ssize_t n = text.shape[0]
+    cdef Py_ssize_t nr_of_words = (m + 63) // 64
+    cdef Py_ssize_t j, w, p, end_of_code
+    cdef int code_index
+    cdef MatchVectors peq = compute_match_vectors(pattern)
+    #vertical positive and negative deltas of the current column
+    cdef vector[uint64_t] pv = vector[uint64_t](nr_of_words, ~(<uint64_t>0))
+    cdef vector[uint64_t] mv = vector[uint64_t](nr_of_words, 0)
+    cdef uint64_t high_bit = (<uint64_t>1) << 63
+    cdef uint64_t last_bit = (<uint64_t>1) << ((m - 1) % 64)
+    cdef uint64_t eq, xv, xh, ph, mh
+    cdef int ingoing_delta, outgoing_delta
+    cdef long long score = m
+    for j in range(n):
+        #the first row of the cost matrix increases by one per column
+        outgoing_delta = 1
+        code_index = get_code_index(peq, text[j])
+        if code_index >= 0:
+            p = peq.starts[code_index]
+            end_of_code = peq.starts[code_index + 1]
+        else:
+            p = 0
+            end_of_code = 0
+        for w in range(nr_of_words):
+            ingoing_delta = outgoing_delta
+            if p < end_of_code and peq.word_indices[p] == w:
+                eq = peq.words[p]
+                p += 1
+            else:
+                eq = 0
+            xv = eq | mv[w]
+            if ingoing_delta < 0:
+                eq |= 1
+            xh = (((eq & pv[w]) + pv[w]) ^ pv[w]) | eq
+            ph = mv[w] | ~(xh | pv[w])
+            mh = pv[w] & xh
+            if w + 1 < nr_of_words:
+                outgoing_delta = (ph & high_bit != 0) - (mh & high_bit != 0)
+            else:
+                score += (ph & last_bit != 0) - (mh & last_bit != 0)
+            ph <<= 1
+            mh <<= 1
+            if ingoing_delta < 0:
+                mh |= 1
+            elif ingoing_delta > 0:
+                ph |= 1
+            pv[w] = mh | ~(xv | ph)
+            mv[w] = ph & xv
+        #the distance decreases by at most one per remaining column
+        if score - (n - j - 1) > max_distance:
+            return max_distance + 1
+    return score
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef long long _compute_banded_distance(
+        const int[:] codes1, const int[:] codes2, long long insertion_cost,
+        long long deletion_cost, long long substitution_cost,
+        long long max_distance) noexcept nogil:
+    """levenshtein distance with arbitrary costs in linear memory. only cells
+    whose cost can be <= max_distance are computed. returns a value >
+    max_distance as soon as the distance must exceed max_distance."""
+    cdef Py_ssize_t n = codes1.shape[0]
+    cdef Py_ssize_t m = codes2.shape[0]
+    cdef long long infinity = max_distance + 1
+    #a cell (i,j) needs at least i-j deletions or j-i insertions
+    cdef Py_ssize_t max_nr_of_deletions = n if deletion_cost == 0 else min(
+        n, max_distance // deletion_cost)
+    cdef Py_ssize_t max_nr_of_insertions = m if insertion_cost == 0 else min(
+        m, max_distance // insertion_cost)
+    cdef vector[int64_t] previous_row = vector[int64_t](m + 1, infinity)
+    cdef vector[int64_t] current_row = vector[int64_t](m + 1, infinity)
+    cdef Py_ssize_t i, j, first_column, last_column
+    cdef long long cost, row_minimum
+    for j in range(max_nr_of_insertions + 1):
+        previous_row[j] = min(j * insertion_cost, infinity)
+    for i in range(1, n + 1):
+        first_column = max(1, i - max_nr_of_deletions)
+        last_column = min(m, i + max_nr_of_insertions)
+        if first_column == 1:
+            current_row[0] = min(i * deletion_cost, infinity)
+            row_minimum = current_row[0]
+        else:
+            current_row[first_column - 1] = infinity
+            row_minimum = infinity
+        for j in range(first_column, last_column + 1):
+            cost = previous_row[j - 1]
+            if codes1[i - 1] != codes2[j - 1]:
+                cost += substitution_cost
+            cost = min(cost, previous_row[j] + deletion_cost,
+                       current_row[j - 1] + insertion_cost, infinity)
+            current_row[j] = cost
+            if cost < row_minimum:
+                row_minimum = cost
+        if last_column < m:
+            current_row[last_column + 1] = infinity
+        #the minimum of a row never decreases in the following rows
+        if row_minimum > max_distance:
+            return infinity
+        previous_row.swap(current_row)
+    return previous_row[m]
+
+cdef class EditCostTable:
+    """
+    costs of edit operations per activity (or any other hashable element).
+    elements that are not contained in the table have the default costs.
+    substituting an element by itself is free.
+    """
+
+    def __init__(self, insertion_costs: Dict[Hashable, float] = None,
+                 deletion_costs: Dict[Hashable, float] = None,
+                 substitution_costs: Dict[Tuple[Hashable, Hashable], float] = None,
+                 double default_insertion_cost = 1,
+                 double default_deletion_cost = 1,
+                 double default_substitution_cost = 1):
+        """
+        creates a new cost table
+
+        Parameters
+        ----------
+        insertion_costs : Dict[Hashable, float], optional
+            cost of inserting an element, by default None, i.e. all elements
+            have the default insertion cost
+        deletion_costs : Dict[Hashable, float], optional
+            cost of deleting an element, by default None, i.e. all elements
+            have the default deletion cost
+        substitution_costs : Dict[Tuple[Hashable, Hashable], float], optional
+            cost of substituting the first element by the second element,
+            by default None, i.e. all pairs of different elements have the
+            default substitution cost. the table is not symmetric, i.e.
+            (a,b) and (b,a) must be given if both directions have the same
+            non-default cost.
+
+        Raises
+        ------
+        ValueError
+            if one of the costs is negative
+        """
+        insertion_costs = insertion_costs if insertion_costs is not None else {}
+        deletion_costs = deletion_costs if deletion_costs is not None else {}
+        substitution_costs = substitution_costs if substitution_costs is not None else {}
+        self.default_insertion_cost = default_insertion_cost
+        self.default_deletion_cost = default_deletion_cost
+        self.default_substitution_cost = default_substitution_cost
+        self.codes = {}
+        for element in insertion_costs:
+            self.codes.setdefault(element, len(self.codes))
+        for element in deletion_costs:
+            self.codes.setdefault(element, len(self.codes))
+        for a, b in substitution_costs:
+            self.codes.setdefault(a, len(self.codes))
+            self.codes.setdefault(b, len(self.codes))
+        insertion = np.full(len(self.codes), default_insertion_cost)
+        deletion = np.full(len(self.codes), default_deletion_cost)
+        substitution = np.full(
+            (len(self.codes), len(self.codes)), default_substitution_cost)
+        for element, cost in insertion_costs.items():
+            insertion[self.codes[element]] = cost
+        for element, cost in deletion_costs.items():
+            deletion[self.codes[element]] = cost
+        for (a, b), cost in substitution_costs.items():
+            substitution[self.codes[a], self.codes[b]] = cost
+        np.fill_diagonal(substitution, 0)
+        if min(default_insertion_cost, default_deletion_cost,
+               default_substitution_cost) < 0 \
+        or (self.codes and min(insertion.min(), deletion.min(),
+                               substitution.min()) < 0):
+            raise ValueError('costs must not be negative')
+        self.insertion_costs = insertion
+        self.deletion_costs = deletion
+        self.substitution_costs = substitution
 
+    def encode(self, s1, s2) -> Tuple[np.ndarray, np.ndarray]:
+        """maps the elements of both sequences to their codes in this table.
+        elements that are not in the table get codes >= the size of the table
+        such that equal elements have equal codes"""
+        cdef dict codes = dict(self.codes)
+        return (
+            np.fromiter([codes.setdefault(x, len(codes)) for x in s1],
+                        dtype=np.intc, count=len(s1)),
+            np.fromiter([codes.setdefault(x, len(codes)) for x in s2],
+                        dtype=np.intc, count=len(s2))
+        )
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef inline double get_insertion_cost(self, int code) noexcept nogil:
+        if code < self.insertion_costs.shape[0]:
+            return self.insertion_costs[code]
+        return self.default_insertion_cost
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef inline double get_deletion_cost(self, int code) noexcept nogil:
+        if code < self.deletion_costs.shape[0]:
+            return self.deletion_costs[code]
+        return self.default_deletion_cost
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef inline double get_substitution_cost(self, int code1, int code2) noexcept nogil:
+        if code1 == code2:
+            return 0
+        if code1 < self.substitution_costs.shape[0] \
+        and code2 < self.substitution_costs.shape[0]:
+            return self.substitution_costs[code1, code2]
+        return self.default_substitution_cost
+
+def levenshtein_with_cost_table(
+        s1, s2, EditCostTable cost_table,
+        bint with_backtrace = True) -> Tuple[float, List[EditOperation]]:
+    """
+    levenshtein distance with per-element costs and (optionally) the
+    backtrace. the cost matrix is computed over integer codes in a typed
+    loop. the backtrace takes time linear in len(s1) + len(s2).
+    returns the distance and the list of edit operations sorted by their
+    positions, which is None if with_backtrace is False.
+    """
+    codes1, codes2 = cost_table.encode(s1, s2)
+    cdef double[:,:] cost_matrix = compute_cost_matrix_of_codes(
+        codes1, codes2, cost_table)
+    cdef double distance = cost_matrix[len(s1), len(s2)]
+    if not with_backtrace:
+        return distance, None
+    return distance, backtrace_codes(codes1, codes2, cost_table, cost_matrix)
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef double[:,:] compute_cost_matrix_of_codes(
+        const int[:] codes1, const int[:] codes2, EditCostTable cost_table):
+    """computes the cost matrix of the levenshtein algorithm with the costs
+    of the given table"""
+    cdef Py_ssize_t n = codes1.shape[0]
+    cdef Py_ssize_t m = codes2.shape[0]
+    cdef double[:,:] cost_matrix = np.empty((n + 1, m + 1), dtype=np.float64)
+    cdef Py_ssize_t i, j
+    cdef double deletion_cost, cost
+    with nogil:
+        cost_matrix[0, 0] = 0
+        for j in range(1, m + 1):
+            cost_matrix[0, j] = cost_matrix[0, j - 1] + \
+                cost_table.get_insertion_cost(codes2[j - 1])
+        for i in range(1, n + 1):
+            deletion_cost = cost_table.get_deletion_cost(codes1[i - 1])
+            cost_matrix[i, 0] = cost_matrix[i - 1, 0] + deletion_cost
+            for j in range(1, m + 1):
+                cost = min(
+                    cost_matrix[i - 1, j - 1] + cost_table.get_substitution_cost(
+                        codes1[i - 1], codes2[j - 1]),
+                    cost_matrix[i - 1, j] + deletion_cost)
+                cost_matrix[i, j] = min(
+                    cost, cost_matrix[i, j - 1] +
+                    cost_table.get_insertion_cost(codes2[j - 1]))
+    return cost_matrix
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef list backtrace_codes(
+        const int[:] codes1, const int[:] codes2, EditCostTable cost_table,
+        const double[:,:] cost_matrix):
+    """
+    backtracing of compute_cost_matrix_of_codes. the path is written
+    backwards into preallocated arrays, and the EditOperation objects are
+    created once in forward order.
+    """
+    cdef Py_ssize_t i = codes1.shape[0]
+    cdef Py_ssize_t j = codes2.shape[0]
+    cdef Py_ssize_t max_nr_of_edits = i + j
+    cdef int[:] edit_i = np.empty(max_nr_of_edits, dtype=np.intc)
+    cdef int[:] edit_j = np.empty(max_nr_of_edits, dtype=np.intc)
+    cdef int[:] edit_type = np.empty(max_nr_of_edits, dtype=np.intc)
+    #edits are stored in edit_*[k:]
+    cdef Py_ssize_t k = max_nr_of_edits
+    with nogil:
+        while i > 0 or j > 0:
+            if i > 0 and j > 0 and cost_matrix[i, j] == cost_matrix[i - 1, j - 1] + \
+            cost_table.get_substitution_cost(codes1[i - 1], codes2[j - 1]):
+                i -= 1
+                j -= 1
+                if codes1[i] == codes2[j]:
+                    continue
+                k -= 1
+                edit_type[k] = EditOperationType.SUBSTITUTE
+            elif i > 0 and cost_matrix[i, j] == cost_matrix[i - 1, j] + \
+            cost_table.get_deletion_cost(codes1[i - 1]):
+                i -= 1
+                k -= 1
+                edit_type[k] = EditOperationType.DELETE
+            else:
+                j -= 1
+                k -= 1
+                edit_type[k] = EditOperationType.INSERT
+            edit_i[k] = i
+            edit_j[k] = j
+    cdef list edits = [None] * (max_nr_of_edits - k)
+    cdef Py_ssize_t l
+    for l in range(k, max_nr_of_edits):
+        edits[l - k] = EditOperation(
+            edit_i[l], edit_j[l], <EditOperationType>edit_type[l])
     return edits
\ No newline at end of file
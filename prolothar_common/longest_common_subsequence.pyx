@@ -19,17 +19,42 @@
 defines functions to compute the longest common subsequence with backtrace
 for arbitrary lists.
 See https://en.wikipedia.org/wiki/Longest_common_subsequence_problem for details
+
+the length of the longest common subsequence is computed by the bit-vector
+algorithm of Allison-Dix (in the formulation of Hyyrö) on integer codes of the
+elements, which needs O(len(x) * len(y) / 64) time and memory linear in the
+shorter sequence.
 """
 
-from typing import List, Tuple, Union
+from typing import List, Tuple, Union, Iterable
 
 import numpy as np
 
+from prolothar_common.levenshtein import encode_sequences
 cimport cython
+from libc.stdint cimport uint64_t
+from libcpp.vector cimport vector
+from prolothar_common.levenshtein cimport compute_hirschberg_alignment
+from prolothar_common.levenshtein cimport MatchVectors, compute_match_vectors, get_code_index
+
+cdef extern from *:
+    int __builtin_popcountll(unsigned long long) nogil
+
+#if the LCS matrix would have more cells, the backtrace is computed in linear
+#memory
+MAX_NR_OF_CELLS_FOR_FULL_MATRIX = 25_000_000
+
+cdef int[:,:] compute_lcs_matrix(x_list: Union[List,str], y_list: Union[List,str]):
+    try:
+        x_codes, y_codes = encode_sequences(x_list, y_list)
+    except TypeError:
+        #unhashable elements can only be compared one by one
+        return _compute_lcs_matrix_of_elements(x_list, y_list)
+    return _compute_lcs_matrix_of_codes(x_codes, y_codes)
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-cdef int[:,:] compute_lcs_matrix(x_list: Union[List,str], y_list: Union[List,str]):
+cdef int[:,:] _compute_lcs_matrix_of_elements(x_list: Union[List,str], y_list: Union[List,str]):
     cdef int[:,:] C = np.zeros((len(x_list) + 1, len(y_list) + 1), dtype=np.intc)
 
     cdef int i
@@ -43,8 +68,130 @@ cdef int[:,:] compute_lcs_matrix(x_list: Union[List,str], y_list: Union[List,str
 
     return C
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef int[:,:] _compute_lcs_matrix_of_codes(const int[:] x_codes, const int[:] y_codes):
+    cdef int[:,:] C = np.zeros((x_codes.shape[0] + 1, y_codes.shape[0] + 1), dtype=np.intc)
+
+    cdef Py_ssize_t i
+    cdef Py_ssize_t j
+    with nogil:
+        for i in range(x_codes.shape[0]):
+            for j in range(y_codes.shape[0]):
+                if x_codes[i] == y_codes[j]:
+                    C[i+1,j+1] = C[i,j] + 1
+                else:
+                    C[i+1,j+1] = max(C[i+1,j],C[i,j+1])
+
+    return C
+
 def length_of_common_subsequence(x_list: Union[List,str], y_list: Union[List,str]) -> int:
-    return compute_lcs_matrix(x_list, y_list)[len(x_list)][len(y_list)]
+    """returns the length of the longest common subsequence. unhashable
+    elements are compared by the quadratic dynamic programming algorithm"""
+    try:
+        x_codes, y_codes = encode_sequences(x_list, y_list)
+    except TypeError:
+        return compute_lcs_matrix(x_list, y_list)[len(x_list)][len(y_list)]
+    return compute_lcs_length_of_codes(x_codes, y_codes)
+
+def lengths_of_common_subsequences(
+        query: Union[List,str], sequences: Iterable[Union[List,str]]) -> np.ndarray:
+    """
+    returns the lengths of the longest common subsequences of "query" with
+    each of the given sequences as int64 array. the bit vectors of the query
+    are built only once, i.e. this is faster than calling
+    length_of_common_subsequence for each sequence. the elements must be
+    hashable.
+    """
+    cdef dict codes = {}
+    cdef int[:] query_codes = np.fromiter(
+        [codes.setdefault(x, len(codes)) for x in query],
+        dtype=np.intc, count=len(query))
+    cdef Py_ssize_t nr_of_words = (len(query) + 63) // 64
+    cdef MatchVectors match_vectors = compute_match_vectors(query_codes)
+    cdef vector[uint64_t] v = vector[uint64_t](nr_of_words)
+    cdef int[:] sequence_codes
+    lengths = []
+    for sequence in sequences:
+        #elements that do not occur in the query get the code -1
+        sequence_codes = np.fromiter(
+            [codes.get(x, -1) for x in sequence], dtype=np.intc, count=len(sequence))
+        lengths.append(_compute_lcs_length(
+            match_vectors, query_codes.shape[0], sequence_codes, v))
+    return np.array(lengths, dtype=np.int64)
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef long long compute_lcs_length_of_codes(
+        const int[:] x_codes, const int[:] y_codes) noexcept nogil:
+    """length of the longest common subsequence of two integer-coded
+    sequences with non-negative codes"""
+    if x_codes.shape[0] < y_codes.shape[0]:
+        x_codes, y_codes = y_codes, x_codes
+    #the bit vectors are built for the shorter sequence
+    cdef Py_ssize_t m = y_codes.shape[0]
+    if m == 0:
+        return 0
+    cdef vector[uint64_t] v = vector[uint64_t]((m + 63) // 64)
+    return _compute_lcs_length(compute_match_vectors(y_codes), m, x_codes, v)
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+@cython.cdivision(True)
+cdef long long _compute_lcs_length(
+        const MatchVectors& match_vectors, Py_ssize_t m,
+        const int[:] text, vector[uint64_t]& v) noexcept nogil:
+    """
+    bit-vector algorithm for the LCS length of a pattern of length m, given
+    by its match vectors, and a text. codes of the text that are not in the
+    alphabet of the pattern (e.g. negative codes) are skipped. "v" is a
+    buffer with one word per 64 elements of the pattern. the zero bits of v
+    mark the positions of the pattern that are part of the LCS.
+    """
+    cdef Py_ssize_t nr_of_words = v.size()
+    cdef Py_ssize_t j, w, p, end_of_code
+    cdef int code_index
+    cdef uint64_t match, u, x, carry, carry_of_sum
+    if m == 0:
+        return 0
+    for w in range(nr_of_words):
+        v[w] = ~(<uint64_t>0)
+    for j in range(text.shape[0]):
+        code_index = get_code_index(match_vectors, text[j])
+        if code_index < 0:
+            continue
+        p = match_vectors.starts[code_index]
+        end_of_code = match_vectors.starts[code_index + 1]
+        carry = 0
+        w = match_vectors.word_indices[p]
+        while w < nr_of_words:
+            if p < end_of_code and match_vectors.word_indices[p] == w:
+                match = match_vectors.words[p]
+                p += 1
+            else:
+                match = 0
+            u = v[w] & match
+            #x = v + u + carry with the carry for the next word
+            x = v[w] + carry
+            carry_of_sum = x < carry
+            x += u
+            carry = carry_of_sum | (x < u)
+            v[w] = x | (v[w] & ~match)
+            w += 1
+            #a word without match and carry does not change
+            if carry == 0:
+                if p == end_of_code:
+                    break
+                w = match_vectors.word_indices[p]
+    cdef long long nr_of_ones = 0
+    for w in range(nr_of_words - 1):
+        nr_of_ones += __builtin_popcountll(v[w])
+    if m % 64 == 0:
+        nr_of_ones += __builtin_popcountll(v[nr_of_words - 1])
+    else:
+        nr_of_ones += __builtin_popcountll(
+            v[nr_of_words - 1] & (((<uint64_t>1) << (m % 64)) - 1))
+    return m - nr_of_ones
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
@@ -55,7 +202,17 @@ def lcs_with_backtrace(x_list: Union[List,str], y_list: Union[List,str]) -> Tupl
     the seconds element is a list of tuples. the first element of each tuple (i,j)
     corresponds to an index in x_list, and the seconds element to an index in y_list,
     such that x_list[i] == y_list[i]
+
+    if the LCS matrix would have more than MAX_NR_OF_CELLS_FOR_FULL_MATRIX
+    cells and the elements are hashable, lcs_with_linear_memory_backtrace is
+    used instead.
     """
+    if (len(x_list) + 1) * (len(y_list) + 1) > MAX_NR_OF_CELLS_FOR_FULL_MATRIX:
+        try:
+            return lcs_with_linear_memory_backtrace(x_list, y_list)
+        except TypeError:
+            #unhashable elements can only be compared by the full matrix
+            pass
     cdef int[:,:] C = compute_lcs_matrix(x_list, y_list)
     cdef int i = len(x_list)
     cdef int j = len(y_list)
@@ -70,3 +227,19 @@ def lcs_with_backtrace(x_list: Union[List,str], y_list: Union[List,str]) -> Tupl
         else:
             j -= 1
     return C[len(x_list)][len(y_list)], backtrace[::-1]
+
+def lcs_with_linear_memory_backtrace(
+        x_list: Union[List,str], y_list: Union[List,str]) -> Tuple[int, List[Tuple[int,int]]]:
+    """
+    same as lcs_with_backtrace, but uses the divide-and-conquer algorithm of
+    Hirschberg, which needs O(min(len(x_list), len(y_list))) memory in
+    addition to the returned list. if there are several longest common
+    subsequences, the returned one can differ from the one of
+    lcs_with_backtrace. the elements must be hashable.
+    """
+    x_codes, y_codes = encode_sequences(x_list, y_list)
+    cdef list matches = []
+    #a substitution is more expensive than a deletion and an insertion, i.e.
+    #only equal elements are aligned and the alignment maximizes their number
+    compute_hirschberg_alignment(x_codes, y_codes, 1, 1, 3, [], matches)
+    return len(matches), matches
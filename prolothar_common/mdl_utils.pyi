@@ -15,10 +15,109 @@
     along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
 '''
 
+import numpy as np
+
+DEFAULT_L_N_TABLE_SIZE: int
+
 def L_N(n: int) -> float: ...
+def precompute_L_N(max_n: int):
+    """
+    extends the lookup table of L_N such that it covers all n from 1 to max_n.
+    the table never shrinks, i.e. nothing happens if it is already large
+    enough.
+    """
+    ...
+def get_L_N_table() -> np.ndarray:
+    """
+    returns the current (read-only) lookup table of L_N, i.e. L_N(n) is
+    stored at index n-1. a worker process can install a table of its parent
+    by "set_L_N_table" instead of computing it again, e.g. if the table was
+    saved with np.save and is loaded with np.load(..., mmap_mode='r'), all
+    processes share the same physical memory.
+    """
+    ...
+def set_L_N_table(table: np.ndarray):
+    """
+    replaces the lookup table of L_N, i.e. L_N(n) = table[n-1].
+    see "get_L_N_table".
+
+    Raises
+    ------
+    ValueError
+        if table is not a one-dimensional float64 array
+    """
+    ...
+def L_N_array(n: np.ndarray) -> np.ndarray:
+    """
+    vectorized version of L_N, i.e. computes L_N for each element of an
+    integer array in a single C loop
+
+    Raises
+    ------
+    ValueError
+        if one of the integers is < 1
+    """
+    ...
 def log2binom(n: int, k: int) -> float: ...
+def log2binom_array(n: np.ndarray, k: np.ndarray) -> np.ndarray:
+    """
+    vectorized version of log2binom. n and k are integer arrays (or scalars)
+    that are broadcasted against each other.
+    """
+    ...
 def log2multinom(n: int, ks: list[int]|tuple[int]|set[int]) -> float: ...
 def L_U(m: int, n: int) -> float: ...
+def L_U_array(m: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """
+    vectorized version of L_U. m and n are integer arrays (or scalars)
+    that are broadcasted against each other.
+    """
+    ...
 def prequential_coding_length(counts: dict[object,int], epsilon: float = 0.5) -> float: ...
-def cached_lgamma(x: float) -> float: ...
-def L_R(real_number: float, precision: int = 5) -> float: ...
\ No newline at end of file
+def prequential_coding_length_array(counts: np.ndarray, epsilon: float = 0.5) -> float|np.ndarray:
+    """
+    vectorized version of prequential_coding_length.
+
+    Args:
+        counts:
+            an integer array with the usage of every symbol of the alphabet
+            in the sequence. if the array has more than one dimension, each
+            vector along the last axis is the alphabet of another sequence.
+        epsilon:
+            the initial usage (epsilon in literature) of all symbols.
+            default is 0.5
+
+    Returns:
+        a float if counts is one-dimensional, otherwise an array with the
+        shape of counts without the last axis
+    """
+    ...
+def cached_lgamma(x: float) -> float:
+    """
+    computes the lgamma function. integer and half-integer points up to the
+    bound set by "set_lgamma_table_bound" are looked up in a table, which is
+    grown on demand. the results for all other points are cached in a LRU
+    cache.
+    """
+    ...
+def precompute_lgamma(max_x: float):
+    """
+    extends the lookup table of "cached_lgamma" such that it covers all
+    integer and half-integer points from 0.5 to max_x. the table never
+    shrinks and never exceeds the bound set by "set_lgamma_table_bound".
+    """
+    ...
+def set_lgamma_table_bound(max_x: float):
+    """
+    sets the largest point up to which "cached_lgamma" uses its lookup table
+    (1_000_000 by default, i.e. a table of at most 16 MB). the table
+    shrinks if it is larger than the new bound.
+    """
+    ...
+def L_R(real_number: float, precision: int = 5) -> float: ...
+def L_R_array(real_numbers: np.ndarray, precision: int = 5) -> np.ndarray:
+    """
+    vectorized version of L_R, i.e. computes L_R for each element of a float
+    array in a single C loop
+    """
+    ...
\ No newline at end of file
@@ -22,16 +22,47 @@ from libc.math cimport log2 as clog2
 from libc.math cimport log as cln
 from libc.math cimport log10 as clog10
 from libc.math cimport ceil as cceil
+from libc.math cimport pow as cpow
 from math import log as ln
+import numpy as np
 from scipy.special.cython_special cimport betaln # type: ignore
+from scipy.special.cython_special cimport gammaln as cgammaln # type: ignore
 from scipy.special import gammaln as lgamma # type: ignore
 
 from lru import LRU
 
-_PRECOMPUTED_LN: List[float] = []
 _PRECOMPUTED_SUM_LOG_I_FROM_1_TO_N: List[float] = []
+#cache for lgamma at points that are not covered by _LGAMMA_TABLE
 _LGAMMA_CACHE = LRU(1000)
 
+#lgamma(i/2) is stored at index i-1, i.e. the table covers all integer and
+#half-integer points from 0.5 to len(_LGAMMA_TABLE) / 2
+cdef double[::1] _LGAMMA_TABLE = np.empty(0)
+#the table is grown on demand up to this bound
+cdef double _LGAMMA_TABLE_BOUND = 1_000_000
+
+#L_N(n) is looked up in this table for 1 <= n <= len(table)
+DEFAULT_L_N_TABLE_SIZE = 100
+cdef const double[::1] _L_N_TABLE = np.empty(0)
+
+cdef inline double _compute_L_N(long long n) noexcept nogil:
+    # intialize code length to c_0 of the paper
+    # c_0 is a constant based on kraft inequalitiy and ensures that the probabilites
+    # of all numbers sums up to 1
+    cdef double code_length = clog2(2.8565064)
+    cdef double summand = clog2(<double>n)
+    while summand > 0:
+        code_length += summand
+        summand = clog2(summand)
+    return code_length
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline double _L_N(long long n) noexcept nogil:
+    if n <= _L_N_TABLE.shape[0]:
+        return _L_N_TABLE[n-1]
+    return _compute_L_N(n)
+
 cpdef double L_N(int n) except 0.0:
     """returns the length of the code length of encoding a positive integer n
     with optimal prefix codes.
@@ -39,27 +70,91 @@ cpdef double L_N(int n) except 0.0:
 
     L_N(n) = log(n) + loglog(n) + logloglog(n) + ... + log(c_0)
     """
-    cdef double code_length
-    cdef double summand
     if n < 1:
         raise ValueError('n must be a positive integer, but is %r' % n)
-    try:
-        return _PRECOMPUTED_LN[n-1]
-    except IndexError:
-        # intialize code length to c_0 of the paper
-        # c_0 is a constant based on kraft inequalitiy and ensures that the probabilites
-        # of all numbers sums up to 1
-        code_length = clog2(2.8565064)
-        summand = clog2(n)
-        while summand > 0:
-            code_length += summand
-            summand = clog2(summand)
-        return code_length
+    return _L_N(n)
 
-@cython.cdivision(True)
-cpdef double log2binom(int n, int k):
-    """computes and returns log2(binom(n,k))
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def precompute_L_N(Py_ssize_t max_n):
+    """
+    extends the lookup table of L_N such that it covers all n from 1 to max_n.
+    the table never shrinks, i.e. nothing happens if it is already large
+    enough.
+    """
+    cdef Py_ssize_t old_size = _L_N_TABLE.shape[0]
+    if max_n <= old_size:
+        return
+    cdef double[::1] table = np.empty(max_n)
+    table[:old_size] = _L_N_TABLE
+    cdef Py_ssize_t n
+    with nogil:
+        for n in range(old_size + 1, max_n + 1):
+            table[n-1] = _compute_L_N(n)
+    set_L_N_table(np.asarray(table))
+
+def get_L_N_table() -> np.ndarray:
+    """
+    returns the current (read-only) lookup table of L_N, i.e. L_N(n) is
+    stored at index n-1. a worker process can install a table of its parent
+    by "set_L_N_table" instead of computing it again, e.g. if the table was
+    saved with np.save and is loaded with np.load(..., mmap_mode='r'), all
+    processes share the same physical memory.
+    """
+    table = np.asarray(_L_N_TABLE)
+    table.flags.writeable = False
+    return table
+
+def set_L_N_table(table: np.ndarray):
+    """
+    replaces the lookup table of L_N, i.e. L_N(n) = table[n-1].
+    see "get_L_N_table".
+
+    Raises
+    ------
+    ValueError
+        if table is not a one-dimensional float64 array
     """
+    global _L_N_TABLE
+    table = np.asarray(table)
+    if table.ndim != 1 or table.dtype != np.float64:
+        raise ValueError('table must be a one-dimensional float64 array')
+    _L_N_TABLE = np.ascontiguousarray(table)
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def L_N_array(n) -> np.ndarray:
+    """
+    vectorized version of L_N, i.e. computes L_N for each element of an
+    integer array in a single C loop
+
+    Raises
+    ------
+    ValueError
+        if one of the integers is < 1
+    """
+    cdef const long long[::1] flat_n
+    n, flat_n = _as_flat_array(n, np.int64)
+    cdef double[::1] result = np.empty(flat_n.shape[0])
+    cdef Py_ssize_t i
+    cdef bint has_invalid_value = False
+    with nogil:
+        for i in range(flat_n.shape[0]):
+            if flat_n[i] < 1:
+                has_invalid_value = True
+                break
+            result[i] = _L_N(flat_n[i])
+    if has_invalid_value:
+        raise ValueError('n must only contain positive integers')
+    return np.asarray(result).reshape(n.shape)
+
+def _as_flat_array(array, dtype) -> tuple[np.ndarray, np.ndarray]:
+    """returns the array with the given dtype and a contiguous flat view of it"""
+    array = np.ascontiguousarray(array, dtype=dtype)
+    return array, array.reshape(-1)
+
+@cython.cdivision(True)
+cdef inline double _log2binom(double n, double k) noexcept nogil:
     #https://stackoverflow.com/questions/21767690/python-log-n-choose-k
     #divided by ln(2) to transform to log_2
     if k == 0:
@@ -69,6 +164,30 @@ cpdef double log2binom(int n, int k):
     else:
         return (-betaln(1 + n - k, 1 + k) - cln(n + 1)) / cln(2)
 
+cpdef double log2binom(int n, int k):
+    """computes and returns log2(binom(n,k))
+    """
+    return _log2binom(n, k)
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def log2binom_array(n, k) -> np.ndarray:
+    """
+    vectorized version of log2binom. n and k are integer arrays (or scalars)
+    that are broadcasted against each other.
+    """
+    n, k = np.broadcast_arrays(np.asarray(n, dtype=np.int64), np.asarray(k, dtype=np.int64))
+    cdef const long long[::1] flat_n
+    cdef const long long[::1] flat_k
+    n, flat_n = _as_flat_array(n, np.int64)
+    k, flat_k = _as_flat_array(k, np.int64)
+    cdef double[::1] result = np.empty(flat_n.shape[0])
+    cdef Py_ssize_t i
+    with nogil:
+        for i in range(flat_n.shape[0]):
+            result[i] = _log2binom(flat_n[i], flat_k[i])
+    return np.asarray(result).reshape(n.shape)
+
 def log2multinom(n: int, ks: Union[List[int],Tuple[int],Set[int]]) -> float:
     """computes the logarithm of a multinomial"""
     if n != sum(ks):
@@ -87,6 +206,28 @@ cpdef double L_U(int m, int n):
         return 0.0
     return log2binom(m-1, n-1)
 
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def L_U_array(m, n) -> np.ndarray:
+    """
+    vectorized version of L_U. m and n are integer arrays (or scalars)
+    that are broadcasted against each other.
+    """
+    m, n = np.broadcast_arrays(np.asarray(m, dtype=np.int64), np.asarray(n, dtype=np.int64))
+    cdef const long long[::1] flat_m
+    cdef const long long[::1] flat_n
+    m, flat_m = _as_flat_array(m, np.int64)
+    n, flat_n = _as_flat_array(n, np.int64)
+    cdef double[::1] result = np.empty(flat_m.shape[0])
+    cdef Py_ssize_t i
+    with nogil:
+        for i in range(flat_m.shape[0]):
+            if flat_m[i] == 0 and flat_n[i] == 0:
+                result[i] = 0.0
+            else:
+                result[i] = _log2binom(flat_m[i] - 1, flat_n[i] - 1)
+    return np.asarray(result).reshape(m.shape)
+
 @cython.cdivision(True)
 cpdef double prequential_coding_length(
         dict counts, double epsilon = 0.5):
@@ -120,10 +261,66 @@ cpdef double prequential_coding_length(
 
     return total_length
 
+@cython.boundscheck(False)
+@cython.cdivision(True)
+def prequential_coding_length_array(counts, double epsilon = 0.5):
+    """
+    vectorized version of prequential_coding_length.
+
+    Args:
+        counts:
+            an integer array with the usage of every symbol of the alphabet
+            in the sequence. if the array has more than one dimension, each
+            vector along the last axis is the alphabet of another sequence.
+        epsilon:
+            the initial usage (epsilon in literature) of all symbols.
+            default is 0.5
+
+    Returns:
+        a float if counts is one-dimensional, otherwise an array with the
+        shape of counts without the last axis
+    """
+    counts = np.ascontiguousarray(counts, dtype=np.int64)
+    if counts.ndim == 0:
+        raise ValueError('counts must have at least one dimension')
+    cdef long long[:,::1] count_matrix = counts.reshape(
+        int(np.prod(counts.shape[:-1])), counts.shape[-1])
+    cdef double[::1] result = np.empty(count_matrix.shape[0])
+    cdef Py_ssize_t nr_of_symbols = count_matrix.shape[1]
+    cdef Py_ssize_t i, j
+    cdef long long length_of_sequence
+    cdef double total_length
+    if count_matrix.shape[0] > 0 and nr_of_symbols > 0:
+        precompute_lgamma(epsilon * nr_of_symbols + counts.sum(axis=-1).max())
+    cdef double lgamma_of_epsilon = _lgamma(epsilon)
+    with nogil:
+        for i in range(count_matrix.shape[0]):
+            length_of_sequence = 0
+            for j in range(nr_of_symbols):
+                length_of_sequence += count_matrix[i,j]
+            if nr_of_symbols <= 1 or length_of_sequence == 0:
+                result[i] = 0
+                continue
+            total_length = _lgamma(epsilon * nr_of_symbols + length_of_sequence)
+            total_length -= _lgamma(epsilon * nr_of_symbols)
+            for j in range(nr_of_symbols):
+                total_length -= _lgamma(epsilon + count_matrix[i,j]) - lgamma_of_epsilon
+            result[i] = total_length / cln(2)
+    if counts.ndim == 1:
+        return result[0]
+    return np.asarray(result).reshape(counts.shape[:-1])
+
 cpdef double cached_lgamma(double x):
     """
-    computes the lgamma function and caches the result in a LRU cache
+    computes the lgamma function. integer and half-integer points up to the
+    bound set by "set_lgamma_table_bound" are looked up in a table, which is
+    grown on demand. the results for all other points are cached in a LRU
+    cache.
     """
+    if _is_in_lgamma_table_range(x):
+        if 2 * x > _LGAMMA_TABLE.shape[0]:
+            precompute_lgamma(max(x, _LGAMMA_TABLE.shape[0]))
+        return _LGAMMA_TABLE[<Py_ssize_t>(2 * x) - 1]
     try:
         return _LGAMMA_CACHE[x]
     except KeyError:
@@ -131,6 +328,46 @@ cpdef double cached_lgamma(double x):
         _LGAMMA_CACHE[x] = y
         return y
 
+cdef inline bint _is_in_lgamma_table_range(double x) noexcept nogil:
+    return 0 < x <= _LGAMMA_TABLE_BOUND and 2 * x == <double>(<Py_ssize_t>(2 * x))
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline double _lgamma(double x) noexcept nogil:
+    """looks up lgamma(x) in the table if possible and falls back to scipy"""
+    if _is_in_lgamma_table_range(x) and 2 * x <= _LGAMMA_TABLE.shape[0]:
+        return _LGAMMA_TABLE[<Py_ssize_t>(2 * x) - 1]
+    return cgammaln(x)
+
+def precompute_lgamma(double max_x):
+    """
+    extends the lookup table of "cached_lgamma" such that it covers all
+    integer and half-integer points from 0.5 to max_x. the table never
+    shrinks and never exceeds the bound set by "set_lgamma_table_bound".
+    """
+    global _LGAMMA_TABLE
+    cdef Py_ssize_t old_size = _LGAMMA_TABLE.shape[0]
+    cdef Py_ssize_t new_size = <Py_ssize_t>(2 * min(max_x, _LGAMMA_TABLE_BOUND))
+    if new_size <= old_size:
+        return
+    table = np.empty(new_size)
+    table[:old_size] = _LGAMMA_TABLE
+    table[old_size:] = lgamma(np.arange(old_size + 1, new_size + 1) / 2)
+    _LGAMMA_TABLE = table
+
+def set_lgamma_table_bound(double max_x):
+    """
+    sets the largest point up to which "cached_lgamma" uses its lookup table
+    (1_000_000 by default, i.e. a table of at most 16 MB). the table
+    shrinks if it is larger than the new bound.
+    """
+    global _LGAMMA_TABLE, _LGAMMA_TABLE_BOUND
+    if max_x < 0:
+        raise ValueError('max_x must not be negative, but is %r' % max_x)
+    _LGAMMA_TABLE_BOUND = max_x
+    if _LGAMMA_TABLE.shape[0] > 2 * max_x:
+        _LGAMMA_TABLE = _LGAMMA_TABLE[:<Py_ssize_t>(2 * max_x)].copy()
+
 def sum_log_i_from_1_to_n(n: int) -> float:
     """
     computes log(1) + log(2) + log(3) + ... + log(n)
@@ -152,28 +389,48 @@ def sum_log_i_from_1_to_n(n: int) -> float:
     except IndexError:
         return lgamma(n+1) / ln(2)
 
-cpdef double L_R(double real_number, int precision = 5):
-    """
-    computes the encoded length of a real number up to a given precision
-    """
+cdef double _L_R(double real_number, int precision) noexcept nogil:
     #encode sign +,-,0
     cdef double encoded_length = clog2(3)
     if real_number == 0:
         return encoded_length
     if real_number < 0:
         real_number = -real_number
-    cdef int shift = int(cceil(precision - clog10(real_number)))
+    cdef int shift = <int>cceil(precision - clog10(real_number))
     #sign of shift +,-0
     encoded_length *= 2
     if shift > 0:
-        encoded_length += L_N(shift) + L_N(max(<int>cceil(real_number * 10**shift), 1))
+        encoded_length += _L_N(shift) + _L_N(max(<long long>cceil(real_number * cpow(10, shift)), 1))
     elif shift < 0:
-        encoded_length += L_N(-shift) + L_N(max(1, <int>cceil(real_number)))
+        encoded_length += _L_N(-shift) + _L_N(max(1, <long long>cceil(real_number)))
     else:
-        encoded_length += L_N(<int>cceil(real_number))
+        encoded_length += _L_N(<long long>cceil(real_number))
     return encoded_length
 
-_PRECOMPUTED_LN = [L_N(n) for n in range(1, 101)]
+cpdef double L_R(double real_number, int precision = 5):
+    """
+    computes the encoded length of a real number up to a given precision
+    """
+    return _L_R(real_number, precision)
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def L_R_array(real_numbers, int precision = 5) -> np.ndarray:
+    """
+    vectorized version of L_R, i.e. computes L_R for each element of a float
+    array in a single C loop
+    """
+    cdef double[::1] flat_real_numbers
+    real_numbers, flat_real_numbers = _as_flat_array(real_numbers, np.float64)
+    cdef double[::1] result = np.empty(flat_real_numbers.shape[0])
+    cdef Py_ssize_t i
+    with nogil:
+        for i in range(flat_real_numbers.shape[0]):
+            result[i] = _L_R(flat_real_numbers[i], precision)
+    return np.asarray(result).reshape(real_numbers.shape)
+
+precompute_L_N(DEFAULT_L_N_TABLE_SIZE)
+precompute_lgamma(1024)
 _PRECOMPUTED_SUM_LOG_I_FROM_1_TO_N = [
     sum_log_i_from_1_to_n(n) for n in range(1, 101)
 ]
\ No newline at end of file
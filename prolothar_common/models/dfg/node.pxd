@@ -15,10 +15,21 @@
     along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
 '''
 
+cdef class EdgeList:
+    cdef readonly bint outgoing
+    cdef readonly dict edges_by_activity
+
+    cdef str _get_neighbour_activity(self, object edge)
+    cpdef append(self, object edge)
+    cpdef remove(self, object edge)
+    cpdef object get(self, str activity)
+    cpdef bint contains_activity(self, str activity)
+    cpdef rename_activity(self, str old_activity, str new_activity)
+
 cdef class Node:
     cdef public str activity
-    cdef public list edges
-    cdef public list ingoing_edges
+    cdef public EdgeList edges
+    cdef public EdgeList ingoing_edges
     cdef public  str color
     cdef public str fontcolor
     cdef public object pattern
@@ -15,15 +15,71 @@
     along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
 '''
 
-from typing import List
+from typing import Iterable, Iterator, Dict
 from dataclasses import dataclass
 
+class EdgeList:
+     """
+     adjacency list of a Node. edges are indexed by the activity of the
+     neighbour node (the end of outgoing edges, the start of ingoing edges),
+     i.e. lookup, insertion and removal take constant time. iteration
+     follows the insertion order, like a list of edges.
+     """
+     outgoing: bool
+     edges_by_activity: Dict[str, 'Edge']
+
+     def __init__(self, outgoing: bool, edges: Iterable['Edge'] = None):
+        """
+        creates a new adjacency list
+
+        Args:
+            outgoing:
+                True if the list contains outgoing edges, i.e. edges are
+                indexed by their end activity. False for ingoing edges, which
+                are indexed by their start activity.
+            edges:
+                optional iterable of edges that are appended to the list
+        """
+        ...
+
+     def append(self, edge: 'Edge'):
+        """adds an edge. an existing edge to the same neighbour is replaced
+        but keeps its position"""
+        ...
+
+     def remove(self, edge: 'Edge'):
+        """removes the edge to the neighbour of the given edge
+
+        Raises:
+            ValueError: if there is no edge to this neighbour
+        """
+        ...
+
+     def get(self, activity: str) -> 'Edge':
+        """returns the edge to the neighbour with the given activity or None"""
+        ...
+
+     def contains_activity(self, activity: str) -> bool:
+        """returns True if there is an edge to the neighbour with the given activity"""
+        ...
+
+     def rename_activity(self, old_activity: str, new_activity: str):
+        """changes the index of the edge to a renamed neighbour without
+        changing the order of the edges"""
+        ...
+
+     def __len__(self) -> int:
+        ...
+
+     def __iter__(self) -> Iterator['Edge']:
+        ...
+
 @dataclass
 class Node:
      """a node of a directly follows graph"""
      activity: str
-     edges: List = None
-     ingoing_edges: List = None
+     edges: EdgeList = None
+     ingoing_edges: EdgeList = None
      color: str = 'white'
      fontcolor: str = 'black'
      def is_followed_by(self, activity: str) -> bool:
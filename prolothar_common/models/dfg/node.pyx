@@ -15,13 +15,91 @@
     along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
 '''
 
+cdef class EdgeList:
+     """
+     adjacency list of a Node. edges are indexed by the activity of the
+     neighbour node (the end of outgoing edges, the start of ingoing edges),
+     i.e. lookup, insertion and removal take constant time. iteration
+     follows the insertion order, like a list of edges.
+     """
+
+     def __init__(self, bint outgoing, edges = None):
+        """
+        creates a new adjacency list
+
+        Args:
+            outgoing:
+                True if the list contains outgoing edges, i.e. edges are
+                indexed by their end activity. False for ingoing edges, which
+                are indexed by their start activity.
+            edges:
+                optional iterable of edges that are appended to the list
+        """
+        self.outgoing = outgoing
+        self.edges_by_activity = {}
+        if edges is not None:
+            for edge in edges:
+                self.append(edge)
+
+     cdef str _get_neighbour_activity(self, object edge):
+        return edge.end.activity if self.outgoing else edge.start.activity
+
+     cpdef append(self, object edge):
+        """adds an edge. an existing edge to the same neighbour is replaced
+        but keeps its position"""
+        self.edges_by_activity[self._get_neighbour_activity(edge)] = edge
+
+     cpdef remove(self, object edge):
+        """removes the edge to the neighbour of the given edge
+
+        Raises:
+            ValueError: if there is no edge to this neighbour
+        """
+        try:
+            del self.edges_by_activity[self._get_neighbour_activity(edge)]
+        except KeyError:
+            raise ValueError('%r is not in EdgeList' % edge)
+
+     cpdef object get(self, str activity):
+        """returns the edge to the neighbour with the given activity or None"""
+        return self.edges_by_activity.get(activity)
+
+     cpdef bint contains_activity(self, str activity):
+        """returns True if there is an edge to the neighbour with the given activity"""
+        return activity in self.edges_by_activity
+
+     cpdef rename_activity(self, str old_activity, str new_activity):
+        """changes the index of the edge to a renamed neighbour without
+        changing the order of the edges"""
+        if old_activity in self.edges_by_activity:
+            self.edges_by_activity = {
+                (new_activity if activity == old_activity else activity): edge
+                for activity, edge in self.edges_by_activity.items()
+            }
+
+     def __len__(self):
+        return len(self.edges_by_activity)
+
+     def __iter__(self):
+        return iter(self.edges_by_activity.values())
+
+     def __contains__(self, edge):
+        contained_edge = self.edges_by_activity.get(self._get_neighbour_activity(edge))
+        return contained_edge is not None and contained_edge == edge
+
+     def __eq__(self, other):
+        return other is not None and list(self) == list(other)
+
+     def __repr__(self) -> str:
+        return 'EdgeList%r' % list(self)
+
 cdef class Node:
      """a node of a directly follows graph"""
 
-     def __init__(self, str activity, list edges = None, list ingoing_edges = None, str color = 'white', str fontcolor = 'black'):
+     def __init__(self, str activity, edges = None, ingoing_edges = None, str color = 'white', str fontcolor = 'black'):
         self.activity = activity
-        self.edges = edges
-        self.ingoing_edges = ingoing_edges
+        self.edges = EdgeList(True, edges)
+        self.ingoing_edges = EdgeList(False, ingoing_edges)
         self.color = color
         self.fontcolor = fontcolor
 
@@ -40,7 +118,4 @@ cdef class Node:
      cpdef bint is_followed_by(self, str activity):
          """returns True if there is edge from this node to a node with the
          given activity"""
-         for edge in self.edges:
-             if edge.end.activity == activity:
-                 return True
-         return False
\ No newline at end of file
+         return self.edges.contains_activity(activity)
\ No newline at end of file
@@ -0,0 +1,208 @@
+'''
+    This file is part of Prolothar-Common (More Info: https://github.com/shs-it/prolothar-common).
+
+    Prolothar-Common is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Prolothar-Common is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
+'''
+
+from typing import Dict, Hashable, Tuple
+from collections import Counter, deque
+import math
+
+from prolothar_common.models.directly_follows_graph import DirectlyFollowsGraph
+
+class OnlineDirectlyFollowsGraphBuilder():
+    """
+    builds a DirectlyFollowsGraph incrementally from a stream of events. only
+    the last activity of each open case is stored, i.e. the memory consumption
+    does not depend on the number of events.
+
+    optionally, the graph only covers a sliding time window. the window is
+    divided into buckets of equal length, and the counts of a bucket are
+    subtracted from the graph as soon as the bucket leaves the window.
+    nodes and edges whose count drops to zero are removed.
+    """
+
+    def __init__(self, window_size=None, bucket_size=None):
+        """
+        creates a new builder with an empty graph
+
+        Parameters
+        ----------
+        window_size : optional
+            length of the time window, e.g. a number or a timedelta, depending
+            on the type of the timestamps. by default None, i.e. counts never
+            expire and timestamps are optional.
+        bucket_size : optional
+            granularity of the expiry, i.e. counts expire at most bucket_size
+            too late. must have the same type as window_size.
+            by default None, i.e. window_size / 10
+
+        Raises
+        ------
+        ValueError
+            if bucket_size is given without window_size or if bucket_size is
+            larger than window_size
+        """
+        if window_size is None and bucket_size is not None:
+            raise ValueError('bucket_size must not be set without window_size')
+        if window_size is not None and bucket_size is None:
+            bucket_size = window_size / 10
+        if window_size is not None and bucket_size > window_size:
+            raise ValueError('bucket_size must not be larger than window_size')
+        self.dfg = DirectlyFollowsGraph()
+        self.__window_size = window_size
+        self.__bucket_size = bucket_size
+        self.__nr_of_buckets = None if window_size is None else math.ceil(
+            window_size / bucket_size)
+        self.__origin = None
+        self.__newest_bucket_index = None
+        #case id => (last activity, bucket index of the last event)
+        self.__open_cases: Dict[Hashable, Tuple[str, int]] = {}
+        #(bucket index, edge counts, activity counts) in ascending order
+        self.__buckets = deque()
+        #number of events of each activity in the window
+        self.__activity_counts = Counter()
+
+    def add_event(self, case_id: Hashable, activity: str, timestamp=None):
+        """
+        adds an event to the graph. if the case has a previous event, the count
+        of the edge from the previous activity to the given activity is
+        increased.
+
+        Parameters
+        ----------
+        case_id : Hashable
+            identifier of the case (= trace) of the event
+        activity : str
+            activity of the event
+        timestamp : optional
+            time of the event. mandatory if the builder has a window.
+            events are expected to arrive roughly in the order of their
+            timestamps: counts of events that are older than the window are
+            ignored. open cases whose last event has left the window are
+            forgotten.
+
+        Raises
+        ------
+        ValueError
+            if the builder has a window and timestamp is None
+        """
+        bucket_index = self.__get_bucket_index(timestamp)
+        if bucket_index is not None:
+            self.__expire_buckets(bucket_index)
+            if not self.__is_in_window(bucket_index):
+                return
+            edge_counts, activity_counts = self.__get_bucket(bucket_index)
+            activity_counts[activity] += 1
+        previous = self.__open_cases.get(case_id)
+        self.__open_cases[case_id] = (activity, bucket_index)
+        self.__activity_counts[activity] += 1
+        self.dfg.add_node(activity)
+        if previous is not None and (bucket_index is None
+                                     or self.__is_in_window(previous[1])):
+            self.dfg.add_count(previous[0], activity)
+            if bucket_index is not None:
+                edge_counts[(previous[0], activity)] += 1
+
+    def close_case(self, case_id: Hashable):
+        """marks the case as finished, i.e. its last activity is forgotten.
+        does nothing if there is no open case with the given id."""
+        self.__open_cases.pop(case_id, None)
+
+    def get_nr_of_open_cases(self) -> int:
+        return len(self.__open_cases)
+
+    def advance_time(self, timestamp):
+        """expires all counts that are older than the window ending at the
+        given timestamp, even if no new event arrives"""
+        self.__expire_buckets(self.__get_bucket_index(timestamp))
+
+    def get_snapshot(self) -> DirectlyFollowsGraph:
+        """returns a copy of the current graph that is not changed by
+        subsequent events"""
+        return self.dfg.copy()
+
+    def merge(self, other: 'OnlineDirectlyFollowsGraphBuilder'):
+        """adds the counts of another builder (e.g. of another worker that
+        processes a disjoint set of cases) to the graph of this builder.
+        open cases of "other" are not taken over.
+
+        Raises
+        ------
+        ValueError
+            if one of the builders has a window, because the merged counts
+            could not expire correctly
+        """
+        if self.__window_size is not None or other.__window_size is not None:
+            raise ValueError('builders with window cannot be merged')
+        self.dfg.merge(other.dfg)
+
+    def __get_bucket_index(self, timestamp) -> int:
+        if self.__window_size is None:
+            return None
+        if timestamp is None:
+            raise ValueError('timestamp must not be None if there is a window')
+        if self.__origin is None:
+            self.__origin = timestamp
+        return math.floor((timestamp - self.__origin) / self.__bucket_size)
+
+    def __is_in_window(self, bucket_index: int) -> bool:
+        return bucket_index > self.__newest_bucket_index - self.__nr_of_buckets
+
+    def __get_bucket(self, bucket_index: int) -> Tuple[Counter, Counter]:
+        for index, edge_counts, activity_counts in reversed(self.__buckets):
+            if index == bucket_index:
+                return edge_counts, activity_counts
+            if index < bucket_index:
+                break
+        bucket = (bucket_index, Counter(), Counter())
+        #out-of-order events may create a bucket before the newest one
+        position = len(self.__buckets)
+        while position > 0 and self.__buckets[position - 1][0] > bucket_index:
+            position -= 1
+        self.__buckets.insert(position, bucket)
+        return bucket[1], bucket[2]
+
+    def __expire_buckets(self, bucket_index: int):
+        if self.__newest_bucket_index is None \
+        or bucket_index > self.__newest_bucket_index:
+            self.__newest_bucket_index = bucket_index
+        else:
+            return
+        if self.__buckets and not self.__is_in_window(self.__buckets[0][0]):
+            self.__open_cases = {
+                case_id: last_event for case_id, last_event in self.__open_cases.items()
+                if self.__is_in_window(last_event[1])
+            }
+        while self.__buckets and not self.__is_in_window(self.__buckets[0][0]):
+            _, edge_counts, activity_counts = self.__buckets.popleft()
+            for (start, end), count in edge_counts.items():
+                self.dfg.add_count(start, end, -count)
+                if self.dfg.get_count(start, end) == 0:
+                    self.dfg.remove_edge((start, end))
+            for activity, count in activity_counts.items():
+                self.__activity_counts[activity] -= count
+                if self.__activity_counts[activity] == 0:
+                    del self.__activity_counts[activity]
+            for (start, end) in edge_counts:
+                self.__remove_node_if_unused(start)
+                self.__remove_node_if_unused(end)
+            for activity in activity_counts:
+                self.__remove_node_if_unused(activity)
+
+    def __remove_node_if_unused(self, activity: str):
+        node = self.dfg.nodes.get(activity)
+        if node is not None and activity not in self.__activity_counts \
+        and not node.edges and not node.ingoing_edges:
+            self.dfg.remove_node(activity)
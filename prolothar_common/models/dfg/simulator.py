@@ -0,0 +1,223 @@
+'''
+    This file is part of Prolothar-Common (More Info: https://github.com/shs-it/prolothar-common).
+
+    Prolothar-Common is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Prolothar-Common is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
+'''
+
+from typing import Iterable, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from prolothar_common.models.eventlog.columnar_eventlog import ColumnarEventLog
+
+class DirectlyFollowsGraphSimulator():
+    """
+    samples traces from a DirectlyFollowsGraph. the graph is compiled once into
+    transition arrays in compressed sparse row format, i.e. the successors of
+    activity i are successors[indptr[i]:indptr[i+1]]. all traces of a batch are
+    simulated simultaneously: each step draws one random number per unfinished
+    trace and selects the successors with a single binary search on the
+    cumulative transition probabilities.
+
+    the simulator does not observe changes of the graph after its creation.
+    """
+
+    def __init__(self, dfg: 'DirectlyFollowsGraph',
+                 start_activities: Iterable[str] = None,
+                 end_activities: Iterable[str] = None,
+                 weighted: bool = False):
+        """
+        compiles the given graph into transition arrays
+
+        Parameters
+        ----------
+        dfg : DirectlyFollowsGraph
+            the graph from which traces are sampled
+        start_activities : Iterable[str], optional
+            the first activity of a trace is drawn uniformly from this list.
+            by default None, i.e. the source activities of the graph
+        end_activities : Iterable[str], optional
+            a trace ends as soon as it reaches one of these activities.
+            by default None, i.e. the sink activities of the graph.
+            traces also end in activities without successors.
+        weighted : bool, optional
+            if True, the next activity is drawn proportionally to the counts
+            of the outgoing edges. by default False, i.e. all successors are
+            equally likely
+
+        Raises
+        ------
+        ValueError
+            if start_activities or end_activities is empty or contains an
+            activity that is not in the graph
+        """
+        self.activities: List[str] = list(dfg.nodes.keys())
+        activity_index = {activity: i for i, activity in enumerate(self.activities)}
+        if start_activities is None:
+            start_activities = dfg.get_source_activities()
+        if end_activities is None:
+            end_activities = dfg.get_sink_activities()
+        self.start_codes = _encode_activities(start_activities, activity_index)
+        if len(self.start_codes) == 0:
+            raise ValueError('start activities must not be empty')
+        end_codes = _encode_activities(end_activities, activity_index)
+        if len(end_codes) == 0:
+            raise ValueError('end activities must not be empty')
+
+        nr_of_activities = len(self.activities)
+        self.indptr = np.zeros(nr_of_activities + 1, dtype=np.int64)
+        successors = []
+        weights = []
+        for i, activity in enumerate(self.activities):
+            for edge in dfg.nodes[activity].edges:
+                successors.append(activity_index[edge.end.activity])
+                weights.append(edge.count if weighted else 1)
+            self.indptr[i + 1] = len(successors)
+        self.successors = np.array(successors, dtype=np.int32)
+        self.cumulative_probabilities = _compute_cumulative_probabilities(
+            self.indptr, np.array(weights, dtype=np.float64))
+        self.is_terminal = np.diff(self.indptr) == 0
+        self.is_terminal[end_codes] = True
+
+    def generate_log(self, nr_of_traces: int, random_seed: int = None,
+                     max_trace_length: int = None, nr_of_workers: int = 1,
+                     batch_size: int = 100_000) -> ColumnarEventLog:
+        """
+        samples traces with the ids 0, 1, ..., nr_of_traces - 1
+
+        Parameters
+        ----------
+        nr_of_traces : int
+            number of traces to generate
+        random_seed : int, optional
+            seed for reproducible results, by default None.
+            every batch uses its own random stream derived from this seed,
+            i.e. the result does not depend on nr_of_workers.
+        max_trace_length : int, optional
+            traces are cut after this number of events, by default None, i.e.
+            traces only end in end activities. without this limit, the
+            generation does not terminate if the graph has a cycle from which
+            no end activity can be reached.
+        nr_of_workers : int, optional
+            number of processes that generate batches in parallel,
+            by default 1, i.e. no additional processes are started
+        batch_size : int, optional
+            number of traces that are simulated simultaneously,
+            by default 100_000
+
+        Raises
+        ------
+        ValueError
+            if one of the parameters is out of range
+        """
+        if nr_of_traces < 0:
+            raise ValueError('nr_of_traces must not be negative')
+        if max_trace_length is not None and max_trace_length < 1:
+            raise ValueError('max_trace_length must be at least 1')
+        if nr_of_workers < 1:
+            raise ValueError('nr_of_workers must be at least 1')
+        if batch_size < 1:
+            raise ValueError('batch_size must be at least 1')
+        batch_sizes = [batch_size] * (nr_of_traces // batch_size)
+        if nr_of_traces % batch_size > 0:
+            batch_sizes.append(nr_of_traces % batch_size)
+        seeds = np.random.SeedSequence(random_seed).spawn(len(batch_sizes))
+        max_trace_lengths = [max_trace_length] * len(batch_sizes)
+        if nr_of_workers == 1 or len(batch_sizes) <= 1:
+            batches = list(map(self._generate_batch, batch_sizes, seeds,
+                               max_trace_lengths))
+        else:
+            with ProcessPoolExecutor(max_workers=nr_of_workers) as executor:
+                batches = list(executor.map(self._generate_batch, batch_sizes,
+                                            seeds, max_trace_lengths))
+        return self.__concatenate_batches(batches)
+
+    def _generate_batch(self, nr_of_traces: int,
+                        seed: np.random.SeedSequence,
+                        max_trace_length: int) -> Tuple[np.ndarray, np.ndarray]:
+        """returns the activity codes and trace offsets of a batch of traces"""
+        random_generator = np.random.default_rng(seed)
+        current_codes = self.start_codes[random_generator.integers(
+            len(self.start_codes), size=nr_of_traces)]
+        unfinished_traces = np.arange(nr_of_traces)
+        trace_lengths = np.zeros(nr_of_traces, dtype=np.int64)
+        #codes of the step-th event of all traces that are longer than step
+        traces_per_step = []
+        codes_per_step = []
+        while len(unfinished_traces) > 0:
+            traces_per_step.append(unfinished_traces)
+            codes_per_step.append(current_codes)
+            trace_lengths[unfinished_traces] += 1
+            if len(traces_per_step) == max_trace_length:
+                break
+            is_unfinished = ~self.is_terminal[current_codes]
+            unfinished_traces = unfinished_traces[is_unfinished]
+            current_codes = current_codes[is_unfinished]
+            current_codes = self.__draw_successors(current_codes, random_generator)
+
+        trace_offsets = np.zeros(nr_of_traces + 1, dtype=np.int64)
+        np.cumsum(trace_lengths, out=trace_offsets[1:])
+        activity_codes = np.empty(trace_offsets[-1], dtype=np.int32)
+        for step, (traces, codes) in enumerate(zip(traces_per_step, codes_per_step)):
+            activity_codes[trace_offsets[traces] + step] = codes
+        return activity_codes, trace_offsets
+
+    def __draw_successors(self, codes: np.ndarray,
+                          random_generator: np.random.Generator) -> np.ndarray:
+        #the cumulative probabilities of row i are in (i, i+1], i.e. a single
+        #search on the whole array finds the successor within row i
+        positions = np.searchsorted(
+            self.cumulative_probabilities,
+            codes + random_generator.random(len(codes)), side='right')
+        #i + u can be rounded up to i + 1 for large i
+        np.minimum(positions, self.indptr[codes + 1] - 1, out=positions)
+        return self.successors[positions]
+
+    def __concatenate_batches(
+            self, batches: List[Tuple[np.ndarray, np.ndarray]]) -> ColumnarEventLog:
+        if not batches:
+            return ColumnarEventLog(self.activities, np.empty(0, dtype=np.int32),
+                                    np.zeros(1, dtype=np.int64))
+        activity_codes = np.concatenate([codes for codes, _ in batches])
+        trace_offsets = [batches[0][1]]
+        for _, offsets in batches[1:]:
+            trace_offsets.append(offsets[1:] + trace_offsets[-1][-1])
+        return ColumnarEventLog(self.activities, activity_codes,
+                                np.concatenate(trace_offsets))
+
+def _encode_activities(activities: Iterable[str], activity_index: dict) -> np.ndarray:
+    try:
+        return np.array([activity_index[activity] for activity in activities],
+                        dtype=np.int32)
+    except KeyError as e:
+        raise ValueError('activity %r is not in the graph' % e.args[0])
+
+def _compute_cumulative_probabilities(indptr: np.ndarray,
+                                      weights: np.ndarray) -> np.ndarray:
+    """returns row + cumulative probability of each entry of a CSR matrix.
+    rows with a total weight of 0 are treated as uniformly distributed."""
+    nr_of_successors = np.diff(indptr)
+    rows = np.repeat(np.arange(len(nr_of_successors)), nr_of_successors)
+    row_sums = np.bincount(rows, weights=weights, minlength=len(nr_of_successors))
+    weights = np.where(row_sums[rows] > 0, weights, 1.0)
+    row_sums = np.where(row_sums > 0, row_sums, nr_of_successors)
+    cumulative_weights = np.cumsum(weights)
+    row_starts = np.concatenate(([0.0], cumulative_weights))[indptr[:-1]]
+    cumulative_probabilities = rows + (
+        cumulative_weights - row_starts[rows]) / row_sums[rows]
+    #the last entry of row i must be exactly i + 1
+    non_empty_rows = np.flatnonzero(nr_of_successors)
+    cumulative_probabilities[indptr[non_empty_rows + 1] - 1] = non_empty_rows + 1
+    return cumulative_probabilities
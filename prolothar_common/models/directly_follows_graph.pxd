@@ -7,6 +7,13 @@ cdef class DirectlyFollowsGraph():
     """
     cdef public dict edges
     cdef public dict nodes
+    cdef dict _cache
+
+    cdef _invalidate_caches(self)
+    cdef object _get_cached(self, str key)
+    cdef tuple _get_breadth_first_search_tree(self, str start_activity)
+    cdef tuple _compute_breadth_first_search_tree(
+            self, str start_activity, set forbidden_edges, str target_activity)
 
     cpdef add_node(self, str activity)
     cpdef remove_node(self, str activity, bint create_connections=?)
@@ -24,3 +31,4 @@ cdef class DirectlyFollowsGraph():
     cpdef Edge remove_edge(self, tuple edge_key)
     cpdef DirectlyFollowsGraph copy(self)
     cpdef join(self, DirectlyFollowsGraph other)
+    cpdef merge(self, DirectlyFollowsGraph other)
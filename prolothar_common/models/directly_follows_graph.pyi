@@ -15,9 +15,13 @@
     along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
 '''
 
-from typing import List, Tuple, Set, Iterable, Union, Iterable
+from typing import List, Tuple, Set, Dict, Iterable, Union, Iterable
 
-from prolothar_common.models.eventlog import EventLog
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from prolothar_common.models.eventlog import EventLog, Trace, VariantLog
+from prolothar_common.models.eventlog import ColumnarEventLog
 from prolothar_common.models.dfg.node import Node
 from prolothar_common.models.dfg.edge import Edge
 
@@ -100,7 +104,13 @@ class DirectlyFollowsGraph():
         """Uses breadth-first-search algorithm for computing the shortest path (
         i.e. the path with the minimal number of edges) between two activity
         nodes in the DFG. If no path is found, an empty list is returned. If
-        start = end then also an empty list is returned
+        start = end then also an empty list is returned.
+        neighbours are visited in sorted order, which makes the choice between
+        paths of equal length reproducible.
+        the breadth-first-search tree of each start activity is cached until
+        the graph is changed, i.e. repeated queries take time linear in the
+        length of the path. forbidden edges are skipped during the search
+        without changing the graph.
         """
         ...
 
@@ -111,7 +121,9 @@ class DirectlyFollowsGraph():
         i.e. the path with the minimal number of edges) between a start activity
         and a set of end activties of nodes in the DFG.
         If no path is found, an empty list is returned. If
-        start = end then also an empty list is returned
+        start = end then also an empty list is returned.
+        if several end activities have a path of minimal length, the first
+        one found by the search is chosen (see compute_shortest_path).
         """
         ...
 
@@ -132,7 +144,25 @@ class DirectlyFollowsGraph():
         """
         ...
 
-    def read_counts_from_log(self, log: EventLog):
+    def merge(self, other: 'DirectlyFollowsGraph'):
+        """adds all nodes and edge counts from "other" to this graph. in
+        contrast to "join", counts of edges that exist in both graphs are
+        summed up, i.e. partial graphs of disjoint sets of cases (e.g. created
+        by different workers) can be combined into the graph of all cases.
+        """
+        ...
+
+    def read_counts_from_log(self, log: Iterable[Trace]):
+        """adds the directly-follows counts of an EventLog or any other
+        iterable of traces (e.g. a streaming reader) to this graph. the traces
+        are encoded batch-wise into integer arrays and the counts of each
+        batch are computed in one vectorized pass, i.e. Node and Edge objects
+        are only touched once per distinct edge and batch."""
+        ...
+
+    def read_counts_from_variant_log(self, variant_log: VariantLog):
+        """adds the directly-follows counts of a VariantLog to this graph. each
+        variant is only processed once and weighted by its number of traces"""
         ...
 
     def select_nodes(self, activities: Union[List[str],Set[str]]) -> 'DirectlyFollowsGraph':
@@ -166,26 +196,66 @@ class DirectlyFollowsGraph():
 
     def get_weakly_connected_components(self) -> List[List[str]]:
         """returns a list of connected components. each component is a list
-        of activities in that component
+        of activities in that component. components and activities are
+        ordered by the insertion order of the nodes.
         """
         ...
 
-    def _create_weakly_connected_component_from_start(
-            self, start_activity: str, unseen_activities: Set[str]) -> List[str]:
-        ...
-
     def get_reachable_activities(self, start_activity: str) -> Set[str]:
-        """returns the set of reachable nodes (activities) starting from
-        the given activity
+        """
+        returns the set of reachable nodes (activities) starting from
+        the given activity. the start activity is only contained if it is part
+        of a cycle.
         """
         ...
 
     def get_activities_that_reach(self, end_activity: str) -> Set[str]:
         """
-        returns all activities that can reach the given activity
+        returns all activities that can reach the given activity. the end
+        activity is only contained if it is part of a cycle.
         """
         ...
 
+    def get_activity_index(self) -> Dict[str,int]:
+        """returns the row and column index of each activity in the matrices
+        returned by get_adjacency_matrix and compute_reachability_matrix.
+        the returned dictionary must not be modified."""
+        ...
+
+    def get_adjacency_matrix(self, sparse: bool = None) -> Union[np.ndarray, csr_matrix]:
+        """
+        returns the adjacency matrix of this graph. the entry in row i and
+        column j is the count of the edge from activity i to activity j, see
+        get_activity_index. the matrix is cached until the graph is changed
+        and must not be modified.
+
+        Args:
+            sparse:
+                if True, a scipy.sparse.csr_matrix is returned. if False, a
+                dense numpy array is returned. by default None, i.e. sparse
+                if the graph has more than 1,000 nodes
+        """
+        ...
+
+    def compute_reachability_matrix(self) -> np.ndarray:
+        """
+        returns a dense boolean matrix R, with R[i,j] being True iff there is a
+        path with at least one edge from activity i to activity j, see
+        get_activity_index. in particular, R[i,i] is True iff activity i is
+        part of a cycle. needs quadratic memory in the number of nodes.
+        """
+        ...
+
+    def compute_outdegrees(self) -> np.ndarray:
+        """returns the number of outgoing edges of each activity, see
+        get_activity_index. self-loops are counted."""
+        ...
+
+    def compute_indegrees(self) -> np.ndarray:
+        """returns the number of ingoing edges of each activity, see
+        get_activity_index. self-loops are counted."""
+        ...
+
     def get_count(self, a: str, b: str) -> int:
         ...
 
@@ -211,22 +281,35 @@ class DirectlyFollowsGraph():
 
     def generate_log(
             self, nr_of_traces: int, start_activities = None,
-            end_activities = None, random_seed = None) -> EventLog:
-        """samples sequences from the directly-follows-graph.
+            end_activities = None, random_seed = None,
+            max_trace_length: int = None, weighted: bool = False,
+            nr_of_workers: int = 1) -> ColumnarEventLog:
+        """samples sequences from the directly-follows-graph. see
+        DirectlyFollowsGraphSimulator, which can be reused for several logs.
 
         Args:
             nr_of_traces:
-                nr of traces in the log that should be generated. must be > 0
+                nr of traces in the log that should be generated. must be >= 0
             start_activities:
                 default is None. if None, the source activities of the graph
                 will be the start activities.
             end_activities:
                 default is None. if None, the end activities of the graph will
                 be the end activities. must be reachable from the list of
-                start activities.
+                start activities. traces also end in activities without
+                outgoing edges.
             random_seed:
                 default is None. can be set to a fixed value for reproducible
                 results.
+            max_trace_length:
+                default is None. if set, traces are cut after this number of
+                events.
+            weighted:
+                default is False. if True, the next activity is drawn
+                proportionally to the edge counts, otherwise uniformly.
+            nr_of_workers:
+                default is 1. number of processes that generate traces in
+                parallel. the result does not depend on this number.
 
         Raises:
             ValueError:
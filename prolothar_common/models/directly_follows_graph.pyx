@@ -16,14 +16,18 @@
 '''
 
 from typing import List, Tuple, Set, Dict, Iterable, Union, Iterable
-from random import Random
 import random
-from collections import deque
 from graphviz import Digraph
-
-from prolothar_common.models.eventlog import EventLog, Trace, Event
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import breadth_first_order, connected_components, shortest_path
+cimport cython
+
+from prolothar_common.models.eventlog import EventLog, Trace, Event, VariantLog
+from prolothar_common.models.eventlog import ColumnarEventLog
+from prolothar_common.models.dfg.simulator import DirectlyFollowsGraphSimulator
 import prolothar_common.gviz_utils as gviz_utils
-from prolothar_common.experiments.statistics import Statistics
+from prolothar_common.experiments.statistics import compute_grouped_statistics
 
 cdef class DirectlyFollowsGraph():
 
@@ -32,14 +36,75 @@ cdef class DirectlyFollowsGraph():
     def __init__(self):
         self.edges = {}
         self.nodes = {}
+        self._cache = {}
+
+    cdef _invalidate_caches(self):
+        #must be called by every method that changes nodes, edges or counts
+        if self._cache:
+            self._cache = {}
+
+    cdef object _get_cached(self, str key):
+        if self._cache is None:
+            self._cache = {}
+        try:
+            return self._cache[key]
+        except KeyError:
+            pass
+        if key == 'activities':
+            value = list(self.nodes.keys())
+        elif key == 'index':
+            value = {activity: i for i, activity in enumerate(self._get_cached('activities'))}
+        elif key == 'csr':
+            value = self.__create_csr_matrix()
+        elif key == 'structure':
+            #graph algorithms use a matrix with weight 1 for every edge,
+            #because edges with count 0 would otherwise be ignored
+            csr = self._get_cached('csr')
+            value = csr_matrix(
+                (np.ones(len(csr.indices), dtype=np.float64), csr.indices, csr.indptr),
+                shape=csr.shape)
+        elif key == 'transposed_structure':
+            value = csr_matrix(self._get_cached('structure').T)
+        elif key == 'sorted_successors':
+            value = {
+                activity: sorted((<Node>node).edges.edges_by_activity)
+                for activity, node in self.nodes.items()
+            }
+        elif key == 'dense':
+            value = self._get_cached('csr').toarray()
+            value.setflags(write=False)
+        elif key == 'reachability':
+            adjacency_matrix = self._get_cached('structure')
+            #reachability with paths of length >= 0
+            value = np.isfinite(shortest_path(
+                adjacency_matrix, directed=True, unweighted=True))
+            #one edge followed by a path of length >= 0
+            value = (adjacency_matrix @ value.astype(np.float64)) > 0
+            value.setflags(write=False)
+        else:
+            raise ValueError('unknown cache key %s' % key)
+        self._cache[key] = value
+        return value
+
+    def __create_csr_matrix(self):
+        cdef dict index = self._get_cached('index')
+        cdef Py_ssize_t nr_of_edges = len(self.edges)
+        rows = np.empty(nr_of_edges, dtype=np.int64)
+        columns = np.empty(nr_of_edges, dtype=np.int64)
+        counts = np.empty(nr_of_edges, dtype=np.int64)
+        cdef Py_ssize_t i = 0
+        cdef Edge edge
+        for edge in self.edges.values():
+            rows[i] = index[edge.start.activity]
+            columns[i] = index[edge.end.activity]
+            counts[i] = edge.count
+            i += 1
+        return csr_matrix((counts, (rows, columns)), shape=(len(index), len(index)))
 
     cpdef add_node(self, str activity):
         if activity not in self.nodes:
-            self.nodes[activity] = Node(
-                activity, 
-                edges=[], 
-                ingoing_edges=[]
-            )
+            self.nodes[activity] = Node(activity)
+            self._invalidate_caches()
 
     cpdef remove_node(self, str activity, bint create_connections=False):
         """removes a node from the graph
@@ -56,6 +121,7 @@ cdef class DirectlyFollowsGraph():
                     self.add_count(predecessor, ancestor)
 
         node = self.nodes.pop(activity)
+        self._invalidate_caches()
         cdef set edge_keys_to_delete = set()
         for edge in node.edges:
             edge_keys_to_delete.add((
@@ -76,6 +142,7 @@ cdef class DirectlyFollowsGraph():
             edge = self.edges.pop(edge_key)
             edge.start.edges.remove(edge)
             edge.end.ingoing_edges.remove(edge)
+            self._invalidate_caches()
             return edge
         return None
 
@@ -89,6 +156,7 @@ cdef class DirectlyFollowsGraph():
             self.nodes[start_activity].edges.append(self.edges[edge])
             self.nodes[end_activity].ingoing_edges.append(self.edges[edge])
         self.edges[edge].count += count
+        self._invalidate_caches()
 
     cpdef int get_nr_of_nodes(self):
         return len(self.nodes)
@@ -165,13 +233,19 @@ cdef class DirectlyFollowsGraph():
 
     def __compute_random_walk_based_node_groups(
             self, random_walk_alignment: Tuple[str,str,int]) -> Dict[int,List[Node]]:
-        statistics_dict = {
-                activity: Statistics() for activity in self.nodes
-        }
+        activity_codes = {activity: i for i, activity in enumerate(self.nodes)}
+        visited_activity_codes = []
+        steps = []
         for _ in range(random_walk_alignment[2]):
             self.__do_random_walk(random_walk_alignment[0],
                                   random_walk_alignment[1],
-                                  statistics_dict)
+                                  activity_codes, visited_activity_codes, steps)
+        statistics_list = compute_grouped_statistics(
+            visited_activity_codes, steps, nr_of_keys=len(activity_codes))
+        statistics_dict = {
+                activity: statistics_list[code]
+                for activity, code in activity_codes.items()
+        }
         for node in sorted(self.get_nodes(),
                key=lambda v: statistics_dict[v.activity].mean()):
             statistics_dict[node.activity] = round(
@@ -207,7 +281,10 @@ cdef class DirectlyFollowsGraph():
                        fillcolor=node.color, fontcolor=node.fontcolor)
 
     def __do_random_walk(self, start_activity: str, end_activity: str,
-                         statistics_dict: Dict[str, Statistics]):
+                         activity_codes: Dict[str, int],
+                         visited_activity_codes: List[int], steps: List[int]):
+        """appends the code of each visited activity and the number of the
+        step in which it has been visited to the given lists"""
         i = 0
         visited = set()
         current = self.nodes[start_activity]
@@ -220,7 +297,8 @@ cdef class DirectlyFollowsGraph():
                 break
             current = random.choice(unvisited_choices).end
             visited.add(current.activity)
-            statistics_dict[current.activity].push(i)
+            visited_activity_codes.append(activity_codes[current.activity])
+            steps.append(i)
             i += 1
 
     def __plot_edges(
@@ -301,85 +379,100 @@ cdef class DirectlyFollowsGraph():
         i.e. the path with the minimal number of edges) between two activity
         nodes in the DFG. If no path is found, an empty list is returned. If
         start = end then also an empty list is returned.
+        neighbours are visited in sorted order, which makes the choice between
+        paths of equal length reproducible.
+        the breadth-first-search tree of each start activity is cached until
+        the graph is changed, i.e. repeated queries take time linear in the
+        length of the path. forbidden edges are skipped during the search
+        without changing the graph.
 
         forbidden_edges: Iterable[Tuple[str,str]]
         result: List[str]
         """
-        #https://codereview.stackexchange.com/questions/193410/breadth-first-search-implementation-in-python-3-to-find-path-between-two-given-n
         if start_activity not in self.nodes:
             raise ValueError('start activity %s not in DFG' % start_activity)
 
         if start_activity == end_activity:
             return []
 
-        cdef list removed_edges = []
+        cdef dict predecessors
         if forbidden_edges is not None:
-            for edge_key in forbidden_edges:
-                removed_edges.append(self.remove_edge(<tuple>edge_key))
-
-        cdef set visited = {start_activity}
-        queue = deque([(start_activity, [])])
-
-        cdef str current_activity
-        cdef list path
-        cdef str neighbor
-        cdef Edge edge
-        try:
-            while queue:
-                current_activity, path = queue.popleft()
-                visited.add(current_activity)
-                #sorted makes the choice reproducible
-                for neighbor in sorted(self.get_following_activities(current_activity)):
-                    if neighbor == end_activity:
-                        return path + [current_activity, neighbor]
-                    if neighbor not in visited:
-                        queue.append((neighbor, path + [current_activity]))
-                        visited.add(neighbor)
-
-            # no path found
-            return []
-        finally:
-            for edge in removed_edges:
-                self.add_count(edge.start.activity, edge.end.activity,
-                               count=edge.count)
+            predecessors = self._compute_breadth_first_search_tree(
+                start_activity, set(forbidden_edges), end_activity)[0]
+        else:
+            predecessors = self._get_breadth_first_search_tree(start_activity)[0]
+        return _create_path(predecessors, end_activity)
 
     cpdef list compute_shortest_path_to_one_of(self, str start_activity, set end_activities):
         """Uses breadth-first-search algorithm for computing the shortest path (
         i.e. the path with the minimal number of edges) between a start activity
         and a set of end activties of nodes in the DFG.
         If no path is found, an empty list is returned. If
-        start = end then also an empty list is returned
+        start = end then also an empty list is returned.
+        if several end activities have a path of minimal length, the first
+        one found by the search is chosen (see compute_shortest_path).
 
         result: List[str]
         """
-        #https://codereview.stackexchange.com/questions/193410/breadth-first-search-implementation-in-python-3-to-find-path-between-two-given-n
         if start_activity not in self.nodes:
             raise ValueError('start activity %s not in DFG' % start_activity)
 
         if start_activity in end_activities:
             return []
 
-        cdef set visited = {start_activity}
-        queue = deque([(start_activity, [])])
-
+        predecessors, discovery_rank = self._get_breadth_first_search_tree(start_activity)
+        cdef object closest_end_activity = None
+        cdef Py_ssize_t min_rank = len(discovery_rank)
+        for end_activity in end_activities:
+            rank = discovery_rank.get(end_activity)
+            if rank is not None and rank < min_rank:
+                min_rank = rank
+                closest_end_activity = end_activity
+        if closest_end_activity is None:
+            return []
+        return _create_path(predecessors, closest_end_activity)
+
+    cdef tuple _get_breadth_first_search_tree(self, str start_activity):
+        """returns the cached (predecessors, discovery_rank) of a breadth-first
+        search from the given start activity"""
+        if self._cache is None:
+            self._cache = {}
+        cdef dict trees = self._cache.setdefault('breadth_first_search_trees', {})
+        try:
+            return trees[start_activity]
+        except KeyError:
+            tree = self._compute_breadth_first_search_tree(start_activity, None, None)
+            trees[start_activity] = tree
+            return tree
+
+    cdef tuple _compute_breadth_first_search_tree(
+            self, str start_activity, set forbidden_edges, str target_activity):
+        """breadth-first search that visits neighbours in sorted order.
+        stops as soon as target_activity is found if it is not None"""
+        cdef dict sorted_successors = self._get_cached('sorted_successors')
+        cdef dict predecessors = {start_activity: None}
+        cdef list discovery_order = [start_activity]
+        cdef Py_ssize_t i = 0
         cdef str current_activity
-        cdef list path
-        while queue:
-            current_activity, path = queue.popleft()
-            visited.add(current_activity)
-            #sorted makes the choice reproducible
-            for neighbor in sorted(self.get_following_activities(current_activity)):
-                if neighbor in end_activities:
-                    return path + [current_activity, neighbor]
-                if neighbor not in visited:
-                    queue.append((neighbor, path + [current_activity]))
-                    visited.add(neighbor)
-
-        # no path found
-        return []
+        cdef str neighbor
+        while i < len(discovery_order):
+            current_activity = discovery_order[i]
+            i += 1
+            for neighbor in sorted_successors[current_activity]:
+                if neighbor in predecessors or (
+                        forbidden_edges is not None
+                        and (current_activity, neighbor) in forbidden_edges):
+                    continue
+                predecessors[neighbor] = current_activity
+                discovery_order.append(neighbor)
+                if neighbor == target_activity:
+                    return predecessors, None
+        return predecessors, {
+            activity: rank for rank, activity in enumerate(discovery_order)
+        }
 
     cpdef int compute_indegree(self, str activity):
-        return len((<Node>self.nodes[activity]).ingoing_edges)
+        return len((<Node>self.nodes[activity]).ingoing_edges.edges_by_activity)
 
     cpdef list get_preceeding_activities(self, str activity):
         cdef list result = []
@@ -412,16 +505,44 @@ cdef class DirectlyFollowsGraph():
             (<Node>self.nodes[(<Edge>edge).start.activity]).edges.append(self.edges[edge_key])
         for edge_key, edge in other.edges.items():
             (<Node>self.nodes[(<Edge>edge).end.activity]).ingoing_edges.append(self.edges[edge_key])
+        self._invalidate_caches()
 
-    def read_counts_from_log(self, log: EventLog):
-        for trace in log.traces:
-            if len(trace) > 0:
-                self.add_node(trace.events[0].activity_name)
-            for i in range(len(trace.events) - 1):
-                self.add_node(trace.events[i].activity_name)
-                self.add_count(
-                    trace.events[i].activity_name,
-                    trace.events[i+1].activity_name)
+    cpdef merge(self, DirectlyFollowsGraph other):
+        """adds all nodes and edge counts from "other" to this graph. in
+        contrast to "join", counts of edges that exist in both graphs are
+        summed up, i.e. partial graphs of disjoint sets of cases (e.g. created
+        by different workers) can be combined into the graph of all cases.
+        """
+        cdef Node node
+        cdef Edge edge
+        cdef Edge existing_edge
+        for node in other.nodes.values():
+            self.add_node(node.activity)
+        for edge_key, edge in other.edges.items():
+            existing_edge = self.edges.get(edge_key)
+            if existing_edge is None:
+                existing_edge = Edge(self.nodes[edge.start.activity],
+                                     self.nodes[edge.end.activity], edge.count)
+                self.edges[edge_key] = existing_edge
+                existing_edge.start.edges.append(existing_edge)
+                existing_edge.end.ingoing_edges.append(existing_edge)
+            else:
+                existing_edge.count += edge.count
+        self._invalidate_caches()
+
+    def read_counts_from_log(self, log: Iterable[Trace]):
+        """adds the directly-follows counts of an EventLog or any other
+        iterable of traces (e.g. a streaming reader) to this graph. the traces
+        are encoded batch-wise into integer arrays and the counts of each
+        batch are computed in one vectorized pass, i.e. Node and Edge objects
+        are only touched once per distinct edge and batch."""
+        for activities, codes, trace_offsets, weights in _iter_encoded_batches(log):
+            _add_directly_follows_counts(self, activities, codes, trace_offsets, weights)
+
+    def read_counts_from_variant_log(self, variant_log: VariantLog):
+        """adds the directly-follows counts of a VariantLog to this graph. each
+        variant is only processed once and weighted by its number of traces"""
+        self.read_counts_from_log(variant_log)
 
     def select_nodes(self, activities: Union[List[str],Set[str]]) -> 'DirectlyFollowsGraph':
         """returns a copy of this graph with nodes whose activity is in the
@@ -439,10 +560,14 @@ cdef class DirectlyFollowsGraph():
         """
         returns all nodes that have no ingoing edges. self-loops do not count
         """
-        return [node for node in self.get_nodes()
-                if self.compute_indegree(node.activity) == 0 or (
-                        self.compute_indegree(node.activity) == 1 and
-                        node.is_followed_by(node.activity))]
+        cdef Node node
+        cdef Py_ssize_t indegree
+        cdef list source_nodes = []
+        for node in self.nodes.values():
+            indegree = len(node.ingoing_edges.edges_by_activity)
+            if indegree == 0 or (indegree == 1 and node.is_followed_by(node.activity)):
+                source_nodes.append(node)
+        return source_nodes
 
     def get_source_activities(self) -> List[str]:
         """returns the activities of all source nodes"""
@@ -452,9 +577,14 @@ cdef class DirectlyFollowsGraph():
         """
         returns all nodes that have no outgoing edges. self-loops do not count
         """
-        return [node for node in self.get_nodes()
-                if len(node.edges) == 0 or (
-                        len(node.edges) == 1 and node.is_followed_by(node.activity))]
+        cdef Node node
+        cdef Py_ssize_t outdegree
+        cdef list sink_nodes = []
+        for node in self.nodes.values():
+            outdegree = len(node.edges.edges_by_activity)
+            if outdegree == 0 or (outdegree == 1 and node.is_followed_by(node.activity)):
+                sink_nodes.append(node)
+        return sink_nodes
 
     def get_sink_activities(self) -> List[str]:
         """returns the activities of all sink nodes"""
@@ -472,61 +602,95 @@ cdef class DirectlyFollowsGraph():
 
     def get_weakly_connected_components(self) -> List[List[str]]:
         """returns a list of connected components. each component is a list
-        of activities in that component
+        of activities in that component. components and activities are
+        ordered by the insertion order of the nodes.
         """
-        unseen_activities = set(self.nodes.keys())
-        connected_components = []
-        while unseen_activities:
-            start_activity = next(iter(unseen_activities))
-            unseen_activities.remove(start_activity)
-            connected_components.append(
-                    self._create_weakly_connected_component_from_start(
-                            start_activity, unseen_activities))
-        return connected_components
-
-    def _create_weakly_connected_component_from_start(
-            self, start_activity: str, unseen_activities: Set[str]) -> List[str]:
-        connected_component = []
-        next_activities = [start_activity]
-        while next_activities:
-            activity = next_activities.pop()
-            connected_component.append(activity)
-            for next_activity in (
-                    self.get_preceeding_activities(activity) +
-                    self.get_following_activities(activity)):
-                if next_activity in unseen_activities:
-                    unseen_activities.remove(next_activity)
-                    next_activities.append(next_activity)
-        return connected_component
+        activities = self._get_cached('activities')
+        if not activities:
+            return []
+        _, labels = connected_components(
+            self._get_cached('structure'), directed=True, connection='weak')
+        connected_components_by_label = {}
+        for activity, label in zip(activities, labels.tolist()):
+            connected_components_by_label.setdefault(label, []).append(activity)
+        return list(connected_components_by_label.values())
 
     cpdef set get_reachable_activities(self, str start_activity):
         """
         returns the set of reachable nodes (activities) starting from
-        the given activity
+        the given activity. the start activity is only contained if it is part
+        of a cycle.
         """
-        cdef set reachable_activities = set()
-        cdef set next_activities = set(self.get_following_activities(start_activity))
-        while next_activities:
-            activity = next_activities.pop()
-            reachable_activities.add(activity)
-            for following_activity in self.get_following_activities(<str>activity):
-                if following_activity not in reachable_activities:
-                    next_activities.add(following_activity)
-        return reachable_activities
+        return self.__get_reachable_activities(
+            start_activity, 'structure', 'transposed_structure')
 
     def get_activities_that_reach(self, end_activity: str) -> Set[str]:
         """
-        returns all activities that can reach the given activity
+        returns all activities that can reach the given activity. the end
+        activity is only contained if it is part of a cycle.
         """
-        activities_that_reach = set()
-        next_activities = set(self.get_preceeding_activities(end_activity))
-        while next_activities:
-            activity = next_activities.pop()
-            activities_that_reach.add(activity)
-            for preceding_activity in self.get_preceeding_activities(activity):
-                if preceding_activity not in activities_that_reach:
-                    next_activities.add(preceding_activity)
-        return activities_that_reach
+        return self.__get_reachable_activities(
+            end_activity, 'transposed_structure', 'structure')
+
+    def __get_reachable_activities(
+            self, activity: str, adjacency_key: str, reversed_adjacency_key: str) -> Set[str]:
+        cdef list activities = self._get_cached('activities')
+        cdef Py_ssize_t i = self._get_cached('index')[activity]
+        adjacency_matrix = self._get_cached(adjacency_key)
+        reached = breadth_first_order(
+            adjacency_matrix, i, directed=True, return_predecessors=False)
+        reachable_activities = set(activities[j] for j in reached.tolist())
+        #breadth_first_order always contains the start. it can only be reached
+        #again if one of its predecessors is reachable
+        reversed_adjacency_matrix = self._get_cached(reversed_adjacency_key)
+        if not any(activities[j] in reachable_activities for j in
+                   reversed_adjacency_matrix.indices[
+                       reversed_adjacency_matrix.indptr[i]:
+                       reversed_adjacency_matrix.indptr[i+1]].tolist()):
+            reachable_activities.discard(activity)
+        return reachable_activities
+
+    def get_activity_index(self) -> Dict[str,int]:
+        """returns the row and column index of each activity in the matrices
+        returned by get_adjacency_matrix and compute_reachability_matrix.
+        the returned dictionary must not be modified."""
+        return self._get_cached('index')
+
+    def get_adjacency_matrix(self, sparse: bool = None):
+        """
+        returns the adjacency matrix of this graph. the entry in row i and
+        column j is the count of the edge from activity i to activity j, see
+        get_activity_index. the matrix is cached until the graph is changed
+        and must not be modified.
+
+        Args:
+            sparse:
+                if True, a scipy.sparse.csr_matrix is returned. if False, a
+                dense numpy array is returned. by default None, i.e. sparse
+                if the graph has more than 1,000 nodes
+        """
+        if sparse is None:
+            sparse = len(self.nodes) > _MAX_NR_OF_NODES_FOR_DENSE_MATRIX
+        return self._get_cached('csr' if sparse else 'dense')
+
+    def compute_reachability_matrix(self) -> np.ndarray:
+        """
+        returns a dense boolean matrix R, with R[i,j] being True iff there is a
+        path with at least one edge from activity i to activity j, see
+        get_activity_index. in particular, R[i,i] is True iff activity i is
+        part of a cycle. needs quadratic memory in the number of nodes.
+        """
+        return self._get_cached('reachability')
+
+    def compute_outdegrees(self) -> np.ndarray:
+        """returns the number of outgoing edges of each activity, see
+        get_activity_index. self-loops are counted."""
+        return np.diff(self._get_cached('structure').indptr)
+
+    def compute_indegrees(self) -> np.ndarray:
+        """returns the number of ingoing edges of each activity, see
+        get_activity_index. self-loops are counted."""
+        return np.diff(self._get_cached('transposed_structure').indptr)
 
     def get_count(self, a: str, b: str) -> int:
         edge_key = (a,b)
@@ -565,6 +729,7 @@ cdef class DirectlyFollowsGraph():
         node = self.nodes[old_name]
         self.nodes[new_name] = node
         self.nodes.pop(old_name)
+        self._invalidate_caches()
         node.activity = new_name
         for ingoing_edge in node.ingoing_edges:
             if ingoing_edge.is_self_loop():
@@ -572,63 +737,59 @@ cdef class DirectlyFollowsGraph():
             else:
                 self.edges.pop((ingoing_edge.start.activity, old_name))
             self.edges[(ingoing_edge.start.activity, new_name)] = ingoing_edge
+            ingoing_edge.start.edges.rename_activity(old_name, new_name)
         for outgoing_edge in node.edges:
             if not outgoing_edge.is_self_loop():
                 self.edges.pop((old_name, outgoing_edge.end.activity))
                 self.edges[(new_name, outgoing_edge.end.activity)] = outgoing_edge
+            outgoing_edge.end.ingoing_edges.rename_activity(old_name, new_name)
 
     def generate_log(
             self, nr_of_traces: int, start_activities = None,
-            end_activities = None, random_seed = None) -> EventLog:
-        """samples sequences from the directly-follows-graph.
+            end_activities = None, random_seed = None,
+            max_trace_length: int = None, weighted: bool = False,
+            nr_of_workers: int = 1) -> ColumnarEventLog:
+        """samples sequences from the directly-follows-graph. see
+        DirectlyFollowsGraphSimulator, which can be reused for several logs.
 
         Args:
             nr_of_traces:
-                nr of traces in the log that should be generated. must be > 0
+                nr of traces in the log that should be generated. must be >= 0
             start_activities:
                 default is None. if None, the source activities of the graph
                 will be the start activities.
             end_activities:
                 default is None. if None, the end activities of the graph will
                 be the end activities. must be reachable from the list of
-                start activities.
+                start activities. traces also end in activities without
+                outgoing edges.
             random_seed:
                 default is None. can be set to a fixed value for reproducible
                 results.
+            max_trace_length:
+                default is None. if set, traces are cut after this number of
+                events.
+            weighted:
+                default is False. if True, the next activity is drawn
+                proportionally to the edge counts, otherwise uniformly.
+            nr_of_workers:
+                default is 1. number of processes that generate traces in
+                parallel. the result does not depend on this number.
 
         Raises:
             ValueError:
                 if the list of start_activities or end_activities is empty
         """
-        random_generator = Random(random_seed)
-        if start_activities is None:
-            start_activities = self.get_source_activities()
-        if end_activities is None:
-            end_activities = self.get_sink_activities()
-        if not start_activities:
-            raise ValueError('start activities must not be empty')
-        if not end_activities:
-            raise ValueError('end activities must not be empty')
-        log = EventLog()
-        for i in range(nr_of_traces):
-            events_in_trace = []
-            current_activity = None
-            next_possible_activities = start_activities
-            while True:
-                current_activity = random_generator.choice(
-                        next_possible_activities)
-                next_possible_activities = self.get_following_activities(
-                        current_activity)
-                events_in_trace.append(Event(current_activity))
-                if current_activity in end_activities:
-                    break
-            log.add_trace(Trace(i, events_in_trace))
-        return log
+        return DirectlyFollowsGraphSimulator(
+            self, start_activities=start_activities,
+            end_activities=end_activities, weighted=weighted).generate_log(
+                nr_of_traces, random_seed=random_seed,
+                max_trace_length=max_trace_length, nr_of_workers=nr_of_workers)
 
     @staticmethod
     def create_from_event_log(log: EventLog) -> 'DirectlyFollowsGraph':
         dfg = DirectlyFollowsGraph()
-        dfg.read_counts_from_log(log)
+        dfg.read_counts_from_log(_get_encodable_view(log))
         return dfg
 
     @staticmethod
@@ -640,12 +801,179 @@ cdef class DirectlyFollowsGraph():
         between A and B iff B is eventually observed after A, i.e. there can be
         other activities occuring between A and B.
         """
-        filtered_log = log.copy()
-        filtered_log.keep_first_occurence_of_activity_only()
         follows_graph = DirectlyFollowsGraph()
-        for trace in filtered_log.traces:
-            for i,event in enumerate(trace.events):
-                for following_event in trace.events[i+1:]:
-                    follows_graph.add_count(event.activity_name,
-                                            following_event.activity_name)
-        return follows_graph
\ No newline at end of file
+        for activities, codes, trace_offsets, weights in _iter_encoded_batches(
+                _get_encodable_view(log)):
+            codes, trace_offsets = _keep_first_occurences(
+                np.asarray(codes, dtype=np.int64),
+                np.asarray(trace_offsets, dtype=np.int64), len(activities))
+            pairs_per_trace = np.diff(trace_offsets) * (np.diff(trace_offsets) - 1) // 2
+            cumulative_pairs = np.concatenate(([0], np.cumsum(pairs_per_trace)))
+            first_trace = 0
+            while first_trace < len(pairs_per_trace):
+                #bounds the memory for the pair keys of long traces
+                last_trace = max(first_trace + 1, int(np.searchsorted(
+                    cumulative_pairs,
+                    cumulative_pairs[first_trace] + _MAX_NR_OF_PAIRS_PER_BATCH,
+                    side='right')) - 1)
+                keys, trace_indices = _compute_eventually_follows_pairs(
+                    codes, trace_offsets, first_trace, last_trace, len(activities),
+                    cumulative_pairs[last_trace] - cumulative_pairs[first_trace])
+                _add_pair_counts(
+                    follows_graph, activities, keys,
+                    None if weights is None else weights[trace_indices])
+                first_trace = last_trace
+        return follows_graph
+
+cdef list _create_path(dict predecessors, str end_activity):
+    """follows the predecessors from the end activity back to the start.
+    returns an empty list if the end activity has not been reached"""
+    if end_activity not in predecessors:
+        return []
+    cdef list path = []
+    cdef object activity = end_activity
+    while activity is not None:
+        path.append(activity)
+        activity = predecessors[activity]
+    path.reverse()
+    return path
+
+#larger graphs are exported as sparse matrices by default
+_MAX_NR_OF_NODES_FOR_DENSE_MATRIX = 1000
+#number of events of a stream of traces that are encoded at once
+_ENCODING_BATCH_SIZE = 1_000_000
+#maximal number of eventually-follows pairs that are counted at once
+_MAX_NR_OF_PAIRS_PER_BATCH = 10_000_000
+
+def _get_encodable_view(log: EventLog):
+    """returns the log itself if its integer encoding can be used directly,
+    otherwise its VariantLog"""
+    if isinstance(log, ColumnarEventLog) and not log.is_materialized():
+        return log
+    return log.compute_variant_log()
+
+def _iter_encoded_batches(log):
+    """
+    yields tuples (activities, codes, trace_offsets, weights). codes contains
+    the concatenated activity codes of a batch of traces, trace i of the batch
+    is codes[trace_offsets[i]:trace_offsets[i+1]]. weights is None or the
+    number of occurences of each trace if log is a VariantLog.
+    activity codes are assigned in order of first occurence, empty traces
+    are skipped.
+    """
+    if isinstance(log, ColumnarEventLog) and not log.is_materialized():
+        yield log.activities, log.activity_codes, log.trace_offsets, None
+        return
+    cdef dict activity_dictionary = {}
+    cdef list activities = []
+    cdef list codes = []
+    cdef list trace_offsets = [0]
+    cdef list weights = []
+    cdef bint is_variant_log = isinstance(log, VariantLog)
+    cdef str activity
+    for trace in log:
+        activity_sequence = trace.activities if is_variant_log else trace.to_activity_list()
+        if not activity_sequence:
+            continue
+        for activity in activity_sequence:
+            try:
+                codes.append(activity_dictionary[activity])
+            except KeyError:
+                activity_dictionary[activity] = len(activities)
+                codes.append(len(activities))
+                activities.append(activity)
+        trace_offsets.append(len(codes))
+        if is_variant_log:
+            weights.append(trace.count)
+        elif len(codes) >= _ENCODING_BATCH_SIZE:
+            yield (activities, np.array(codes, dtype=np.int64),
+                   np.array(trace_offsets, dtype=np.int64), None)
+            codes = []
+            trace_offsets = [0]
+    if codes:
+        yield (activities, np.array(codes, dtype=np.int64),
+               np.array(trace_offsets, dtype=np.int64),
+               np.array(weights, dtype=np.int64) if is_variant_log else None)
+
+cdef _add_directly_follows_counts(
+        DirectlyFollowsGraph dfg, list activities, codes, trace_offsets, weights):
+    codes = np.asarray(codes, dtype=np.int64)
+    trace_offsets = np.asarray(trace_offsets, dtype=np.int64)
+    #nodes are added in order of their first occurence
+    node_codes, first_indices = np.unique(codes, return_index=True)
+    for code in node_codes[np.argsort(first_indices)].tolist():
+        dfg.add_node(activities[code])
+    if len(codes) < 2:
+        return
+    keys = codes[:-1] * len(activities) + codes[1:]
+    #the pairs between the last event of a trace and the first of the next
+    #trace are not counted
+    within_trace = np.ones(len(keys), dtype=bool)
+    within_trace[trace_offsets[1:-1] - 1] = False
+    if weights is not None:
+        weights = np.repeat(weights, np.diff(trace_offsets))[:-1][within_trace]
+    _add_pair_counts(dfg, activities, keys[within_trace], weights)
+
+cdef _add_pair_counts(DirectlyFollowsGraph dfg, list activities, keys, weights):
+    """adds the counts of the pair keys start_code * nr_of_activities + end_code
+    in order of their first occurence"""
+    if len(keys) == 0:
+        return
+    cdef long long nr_of_activities = len(activities)
+    cdef long long key
+    unique_keys, first_indices, inverse = np.unique(
+        keys, return_index=True, return_inverse=True)
+    if weights is None:
+        counts = np.bincount(inverse, minlength=len(unique_keys))
+    else:
+        counts = np.bincount(inverse, weights=weights, minlength=len(unique_keys))
+    order = np.argsort(first_indices)
+    for key, count in zip(unique_keys[order].tolist(), counts[order].tolist()):
+        dfg.add_count(activities[key // nr_of_activities],
+                      activities[key % nr_of_activities], int(count))
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _keep_first_occurences(
+        const long long[:] codes, const long long[:] trace_offsets,
+        Py_ssize_t nr_of_activities) -> Tuple[np.ndarray, np.ndarray]:
+    """removes repeated activities from each trace, e.g. ABCBCD => ABCD"""
+    filtered_codes = np.empty(len(codes), dtype=np.int64)
+    filtered_trace_offsets = np.zeros(len(trace_offsets), dtype=np.int64)
+    last_seen_in_trace = np.full(nr_of_activities, -1, dtype=np.int64)
+    cdef long long[:] filtered_codes_view = filtered_codes
+    cdef long long[:] filtered_trace_offsets_view = filtered_trace_offsets
+    cdef long long[:] last_seen_in_trace_view = last_seen_in_trace
+    cdef Py_ssize_t nr_of_filtered_codes = 0
+    cdef Py_ssize_t trace_index, i
+    for trace_index in range(len(trace_offsets) - 1):
+        for i in range(trace_offsets[trace_index], trace_offsets[trace_index + 1]):
+            if last_seen_in_trace_view[codes[i]] != trace_index:
+                last_seen_in_trace_view[codes[i]] = trace_index
+                filtered_codes_view[nr_of_filtered_codes] = codes[i]
+                nr_of_filtered_codes += 1
+        filtered_trace_offsets_view[trace_index + 1] = nr_of_filtered_codes
+    return filtered_codes[:nr_of_filtered_codes], filtered_trace_offsets
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _compute_eventually_follows_pairs(
+        const long long[:] codes, const long long[:] trace_offsets,
+        Py_ssize_t first_trace, Py_ssize_t last_trace,
+        long long nr_of_activities, Py_ssize_t nr_of_pairs) -> Tuple[np.ndarray, np.ndarray]:
+    """returns the pair keys start_code * nr_of_activities + end_code of all
+    ordered pairs of events in the traces first_trace,...,last_trace - 1 and
+    the index of the trace of each pair"""
+    keys = np.empty(nr_of_pairs, dtype=np.int64)
+    trace_indices = np.empty(nr_of_pairs, dtype=np.int64)
+    cdef long long[:] keys_view = keys
+    cdef long long[:] trace_indices_view = trace_indices
+    cdef Py_ssize_t pair_index = 0
+    cdef Py_ssize_t trace_index, i, j
+    for trace_index in range(first_trace, last_trace):
+        for i in range(trace_offsets[trace_index], trace_offsets[trace_index + 1]):
+            for j in range(i + 1, trace_offsets[trace_index + 1]):
+                keys_view[pair_index] = codes[i] * nr_of_activities + codes[j]
+                trace_indices_view[pair_index] = trace_index
+                pair_index += 1
+    return keys, trace_indices
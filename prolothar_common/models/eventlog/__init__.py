@@ -1,4 +1,6 @@
 from prolothar_common.models.eventlog.eventlog import EventLog
 from prolothar_common.models.eventlog.trace import Trace
 from prolothar_common.models.eventlog.event import Event
-from prolothar_common.models.eventlog.complex_event import ComplexEvent
\ No newline at end of file
+from prolothar_common.models.eventlog.complex_event import ComplexEvent
+from prolothar_common.models.eventlog.columnar_eventlog import ColumnarEventLog
+from prolothar_common.models.eventlog.variant_log import VariantLog, Variant
\ No newline at end of file
@@ -0,0 +1,205 @@
+'''
+    This file is part of Prolothar-Common (More Info: https://github.com/shs-it/prolothar-common).
+
+    Prolothar-Common is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Prolothar-Common is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
+'''
+
+"""
+binary on-disk format for event logs. a file consists of
+
+1. the magic bytes "PLEVLOG" followed by a zero byte
+2. the length of the header as unsigned 64 bit integer (little endian)
+3. the header, a UTF-8 encoded JSON document with the activity dictionary
+   and the dtype, length and position of all arrays
+4. the arrays (activity codes, trace offsets, attribute columns), each aligned
+   to 64 bytes
+
+opening a file maps it into memory and creates read-only numpy arrays on top of
+the mapped memory, i.e. nothing is copied and opening takes constant time
+(apart from parsing the header). several processes that open the same file
+share the data through the page cache of the operating system.
+"""
+
+from typing import Dict, List, Tuple
+import json
+import mmap
+import struct
+
+import numpy as np
+
+from prolothar_common.models.eventlog.eventlog import EventLog
+from prolothar_common.models.eventlog.columnar_eventlog import ColumnarEventLog
+from prolothar_common.models.eventlog.columnar_eventlog import AttributeColumn
+from prolothar_common.models.eventlog.columnar_eventlog import StringAttributeColumn
+
+MAGIC = b'PLEVLOG\x00'
+FORMAT_VERSION = 1
+_ALIGNMENT = 64
+_HEADER_LENGTH_FORMAT = '<Q'
+
+def write_binary_event_log(log: EventLog, filepath: str):
+    """
+    writes an EventLog into a binary file that can be opened with
+    "open_binary_event_log".
+
+    Parameters
+    ----------
+    log : EventLog
+        the log that is written. if this is not a ColumnarEventLog, it is
+        converted first
+    filepath : str
+        path to the target file. an existing file is overwritten.
+
+    Raises
+    ------
+    ValueError
+        if the log contains trace ids or attribute values that cannot be stored,
+        i.e. values that are not bool, int, float, datetime, timedelta or str
+    """
+    if not isinstance(log, ColumnarEventLog) or log.is_materialized():
+        log = ColumnarEventLog.create_from_event_log(log)
+
+    arrays: List[Tuple[int, np.ndarray]] = []
+    header = {
+        'version': FORMAT_VERSION,
+        'activities': log.activities,
+        'activity_codes': _add_array(arrays, log.activity_codes.astype('<i4', copy=False)),
+        'trace_offsets': _add_array(arrays, log.trace_offsets.astype('<i8', copy=False)),
+        'trace_ids': _add_column(arrays, 'trace id', _trace_ids_to_column(log.trace_ids)),
+        'event_attributes': {
+            name: _add_column(arrays, name, column)
+            for name, column in log.event_attributes.items()
+        },
+        'trace_attributes': {
+            name: _add_column(arrays, name, column)
+            for name, column in log.trace_attributes.items()
+        }
+    }
+    encoded_header = json.dumps(header).encode('utf-8')
+    data_start = _align(len(MAGIC) + struct.calcsize(_HEADER_LENGTH_FORMAT) + len(encoded_header))
+
+    with open(filepath, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack(_HEADER_LENGTH_FORMAT, len(encoded_header)))
+        f.write(encoded_header)
+        f.write(b'\x00' * (data_start - f.tell()))
+        position = 0
+        for offset, array in arrays:
+            f.write(b'\x00' * (offset - position))
+            f.write(array.tobytes())
+            position = offset + array.nbytes
+
+def open_binary_event_log(filepath: str) -> ColumnarEventLog:
+    """
+    opens a file that has been written by "write_binary_event_log". the file is
+    memory mapped, i.e. the arrays of the returned log are read-only views on
+    the file content and are loaded lazily by the operating system.
+
+    the returned log remembers its file: pickling it only stores the filepath,
+    such that other processes map the same file instead of copying the data.
+
+    Raises
+    ------
+    ValueError
+        if the file is not a binary event log or has an unsupported version
+    """
+    with open(filepath, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    header_length_start = len(MAGIC)
+    data_offset = header_length_start + struct.calcsize(_HEADER_LENGTH_FORMAT)
+    if len(buffer) < data_offset or buffer[:len(MAGIC)] != MAGIC:
+        raise ValueError('%s is not a binary event log' % filepath)
+    header_length = struct.unpack_from(_HEADER_LENGTH_FORMAT, buffer, header_length_start)[0]
+    header = json.loads(bytes(buffer[data_offset:data_offset + header_length]).decode('utf-8'))
+    if header['version'] != FORMAT_VERSION:
+        raise ValueError('unsupported version %r of binary event log' % header['version'])
+    data_start = _align(data_offset + header_length)
+
+    def read_array(array_spec: Dict) -> np.ndarray:
+        return _read_array(buffer, data_start, array_spec)
+
+    #the values of the columns have been validated before writing. checking
+    #them again would read the whole file
+    log = ColumnarEventLog._create_from_trusted_columns(
+        header['activities'],
+        read_array(header['activity_codes']),
+        read_array(header['trace_offsets']),
+        trace_ids=_read_column(header['trace_ids'], read_array),
+        event_attributes={
+            name: _read_column(column_spec, read_array)
+            for name, column_spec in header['event_attributes'].items()
+        },
+        trace_attributes={
+            name: _read_column(column_spec, read_array)
+            for name, column_spec in header['trace_attributes'].items()
+        })
+    log._filepath = filepath
+    return log
+
+def _align(position: int) -> int:
+    return (position + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+def _add_array(arrays: List[Tuple[int, np.ndarray]], array: np.ndarray) -> Dict:
+    if arrays:
+        offset = _align(arrays[-1][0] + arrays[-1][1].nbytes)
+    else:
+        offset = 0
+    arrays.append((offset, np.ascontiguousarray(array)))
+    return {'offset': offset, 'dtype': array.dtype.str, 'length': len(array)}
+
+def _read_array(buffer: mmap.mmap, data_start: int, array_spec: Dict) -> np.ndarray:
+    dtype = np.dtype(array_spec['dtype'])
+    if array_spec['length'] == 0:
+        return np.empty(0, dtype=dtype)
+    return np.frombuffer(
+        buffer, dtype=dtype, count=array_spec['length'],
+        offset=data_start + array_spec['offset'])
+
+def _trace_ids_to_column(trace_ids) -> AttributeColumn:
+    if isinstance(trace_ids, AttributeColumn):
+        return trace_ids
+    if all(type(trace_id) is int for trace_id in trace_ids):
+        return AttributeColumn(np.array(trace_ids, dtype=np.int64))
+    if all(isinstance(trace_id, str) for trace_id in trace_ids):
+        return StringAttributeColumn.create_from_values(trace_ids)
+    raise ValueError('trace ids must either be all int or all str')
+
+def _add_column(arrays: List[Tuple[int, np.ndarray]], name: str, column: AttributeColumn) -> Dict:
+    if not isinstance(column, StringAttributeColumn) and column.values.dtype == object:
+        try:
+            column = StringAttributeColumn.create_from_values(
+                column.values.tolist(),
+                None if column.present is None else column.present.tolist())
+        except ValueError as e:
+            raise ValueError('column %s cannot be stored: %s' % (name, e))
+    column_spec = {
+        'present': None if column.present is None else _add_array(
+            arrays, column.present.astype(bool, copy=False))
+    }
+    if isinstance(column, StringAttributeColumn):
+        column_spec['kind'] = 'strings'
+        column_spec['data'] = _add_array(arrays, column.data)
+        column_spec['offsets'] = _add_array(arrays, column.offsets.astype('<i8', copy=False))
+    else:
+        column_spec['kind'] = 'array'
+        column_spec['values'] = _add_array(arrays, column.values)
+    return column_spec
+
+def _read_column(column_spec: Dict, read_array) -> AttributeColumn:
+    present = None if column_spec['present'] is None else read_array(column_spec['present'])
+    if column_spec['kind'] == 'strings':
+        return StringAttributeColumn(
+            read_array(column_spec['data']), read_array(column_spec['offsets']),
+            present=present)
+    return AttributeColumn(read_array(column_spec['values']), present=present)
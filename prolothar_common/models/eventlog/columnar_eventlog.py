@@ -0,0 +1,576 @@
+'''
+    This file is part of Prolothar-Common (More Info: https://github.com/shs-it/prolothar-common).
+
+    Prolothar-Common is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Prolothar-Common is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
+'''
+
+from typing import List, Dict, Set, Iterable, Iterator, Hashable
+from collections import Counter
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from prolothar_common.models.eventlog.eventlog import EventLog, ActivityLog
+from prolothar_common.models.eventlog.trace import Trace
+from prolothar_common.models.eventlog.event import Event
+from prolothar_common.models.eventlog.complex_event import ComplexEvent
+from prolothar_common.models.eventlog.variant_log import VariantLog, Variant
+
+class AttributeColumn():
+    """
+    typed column of attribute values. numeric and boolean values are stored in
+    a numpy array of the respective type, all other values in an object array.
+    missing values are marked by a boolean mask.
+    """
+
+    def __init__(self, values: np.ndarray, present: np.ndarray = None):
+        """
+        creates a new column
+
+        Parameters
+        ----------
+        values : np.ndarray
+            the values of the column. entries at missing positions are ignored
+        present : np.ndarray, optional
+            boolean mask that is True for all positions where the value is
+            present, by default None, i.e. all values are present
+        """
+        if present is not None and len(present) != len(values):
+            raise ValueError('values and present must have the same length')
+        self.values = values
+        self.present = present
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __getitem__(self, index: int):
+        return self.get(index)
+
+    def get(self, index: int, default=None):
+        """returns the value at the given index or "default" if it is missing"""
+        if self.present is not None and not self.present[index]:
+            return default
+        value = self.values[index]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def to_list(self, start: int, end: int) -> List[object]:
+        """
+        returns the values in the interval [start, end) as Python objects.
+        missing values are None
+        """
+        values = self.values[start:end].tolist()
+        if self.present is not None:
+            for i, is_present in enumerate(self.present[start:end]):
+                if not is_present:
+                    values[i] = None
+        return values
+
+    def is_present(self, index: int) -> bool:
+        return self.present is None or bool(self.present[index])
+
+    def copy(self) -> 'AttributeColumn':
+        return AttributeColumn(
+            self.values.copy(),
+            None if self.present is None else self.present.copy())
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, AttributeColumn) and
+                len(self) == len(other) and
+                all(self.is_present(i) == other.is_present(i) and
+                    (not self.is_present(i) or self.get(i) == other.get(i))
+                    for i in range(len(self))))
+
+    @staticmethod
+    def create_from_values(values: List[object], present: List[bool] = None) -> 'AttributeColumn':
+        """
+        creates a column from a list of Python objects. the type of the column
+        is inferred from the present values: bool, int64, float64,
+        datetime64[us], timedelta64[us] or object.
+
+        Parameters
+        ----------
+        values : List[object]
+            values of the column. the value at missing positions is ignored.
+        present : List[bool], optional
+            mask of present values, by default None, i.e. all values are present
+        """
+        if present is not None and all(present):
+            present = None
+        present_values = values if present is None else [
+            v for v, is_present in zip(values, present) if is_present]
+        dtype = _infer_dtype(present_values)
+        if dtype is object:
+            column_values = np.empty(len(values), dtype=object)
+            column_values[:] = values
+        else:
+            column_values = np.zeros(len(values), dtype=dtype)
+            if present is None:
+                column_values[:] = values
+            else:
+                for i, (value, is_present) in enumerate(zip(values, present)):
+                    if is_present:
+                        column_values[i] = value
+        return AttributeColumn(
+            column_values,
+            None if present is None else np.asarray(present, dtype=bool))
+
+def _infer_dtype(values: List[object]):
+    if not values:
+        return object
+    value_types = set(type(v) for v in values)
+    if value_types == {bool}:
+        return np.bool_
+    if value_types == {int}:
+        if all(-2**63 <= v < 2**63 for v in values):
+            return np.int64
+        return object
+    if value_types <= {int, float}:
+        return np.float64
+    if value_types == {datetime} and all(v.tzinfo is None for v in values):
+        return 'datetime64[us]'
+    if value_types == {timedelta}:
+        return 'timedelta64[us]'
+    return object
+
+class StringAttributeColumn(AttributeColumn):
+    """
+    column of string values. all strings are stored UTF-8 encoded in one
+    byte array. the string at index i is data[offsets[i]:offsets[i+1]].
+    """
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray, present: np.ndarray = None):
+        if present is not None and len(present) != len(offsets) - 1:
+            raise ValueError('present must have one value per string')
+        self.data = data
+        self.offsets = offsets
+        self.present = present
+
+    @property
+    def values(self) -> np.ndarray:
+        """returns the strings as object array"""
+        values = np.empty(len(self), dtype=object)
+        values[:] = self.to_list(0, len(self))
+        return values
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def get(self, index: int, default=None):
+        if self.present is not None and not self.present[index]:
+            return default
+        return bytes(self.data[self.offsets[index]:self.offsets[index+1]]).decode('utf-8')
+
+    def to_list(self, start: int, end: int) -> List[object]:
+        offsets = self.offsets[start:end+1].tolist()
+        data = bytes(self.data[offsets[0]:offsets[-1]]) if offsets else b''
+        first_offset = offsets[0] if offsets else 0
+        values = [
+            data[offsets[i] - first_offset:offsets[i+1] - first_offset].decode('utf-8')
+            for i in range(len(offsets) - 1)
+        ]
+        if self.present is not None:
+            for i, is_present in enumerate(self.present[start:end]):
+                if not is_present:
+                    values[i] = None
+        return values
+
+    def copy(self) -> 'StringAttributeColumn':
+        return StringAttributeColumn(
+            self.data.copy(), self.offsets.copy(),
+            None if self.present is None else self.present.copy())
+
+    @staticmethod
+    def create_from_values(values: List[str], present: List[bool] = None) -> 'StringAttributeColumn':
+        """
+        creates a column from a list of strings. the value at missing
+        positions is ignored.
+
+        Raises
+        ------
+        ValueError
+            if a present value is not a string
+        """
+        if present is not None and all(present):
+            present = None
+        encoded_values = []
+        for i, value in enumerate(values):
+            if present is not None and not present[i]:
+                encoded_values.append(b'')
+            elif isinstance(value, str):
+                encoded_values.append(value.encode('utf-8'))
+            else:
+                raise ValueError('%r is not a string' % (value,))
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum([len(v) for v in encoded_values], out=offsets[1:])
+        return StringAttributeColumn(
+            np.frombuffer(b''.join(encoded_values), dtype=np.uint8).copy(),
+            offsets,
+            None if present is None else np.asarray(present, dtype=bool))
+
+class ColumnarEventLog(EventLog):
+    """
+    an EventLog that does not store Trace and Event objects, but a dictionary
+    of activities, an int32 array of activity codes, an array of trace offsets
+    and a typed column per event and trace attribute. the events of trace i
+    are stored at positions [trace_offsets[i], trace_offsets[i+1]).
+
+    Trace and Event objects are created on demand, e.g. when iterating over the
+    log. these objects are views, i.e. modifying them does not change the log.
+    the counting methods of EventLog are computed on the code array.
+
+    accessing the "traces" attribute (which is done by all modifying methods
+    of EventLog) converts the log once into a list of Trace objects. afterwards,
+    the log behaves like a normal EventLog and the columns are not used anymore.
+    """
+
+    def __init__(self, activities: List[str], activity_codes: np.ndarray,
+                 trace_offsets: np.ndarray, trace_ids: List[Hashable] = None,
+                 event_attributes: Dict[str, AttributeColumn] = None,
+                 trace_attributes: Dict[str, AttributeColumn] = None):
+        """
+        creates a new ColumnarEventLog. consider using "create_from_event_log"
+        if you have an EventLog.
+
+        Parameters
+        ----------
+        activities : List[str]
+            dictionary of activities. activity code i represents activities[i]
+        activity_codes : np.ndarray
+            activity codes of all events of all traces
+        trace_offsets : np.ndarray
+            array of length nr_of_traces + 1 with the start index of each trace
+            in activity_codes. the last element is len(activity_codes)
+        trace_ids : List[Hashable], optional
+            ids of the traces as list or AttributeColumn,
+            by default None => 0, 1, 2, ...
+        event_attributes : Dict[str, AttributeColumn], optional
+            columns of event attributes. each column has one value per event,
+            by default None
+        trace_attributes : Dict[str, AttributeColumn], optional
+            columns of trace attributes. each column has one value per trace,
+            by default None
+
+        Raises
+        ------
+        ValueError
+            if the arrays are inconsistent or a trace is empty
+        """
+        activity_codes = np.asarray(activity_codes, dtype=np.int32)
+        trace_offsets = np.asarray(trace_offsets, dtype=np.int64)
+        self._init_columns(activities, activity_codes, trace_offsets, trace_ids,
+                           event_attributes, trace_attributes)
+        if np.any(np.diff(trace_offsets) <= 0):
+            raise ValueError('traces must not be empty')
+        if len(activity_codes) > 0 and (
+                activity_codes.min() < 0 or activity_codes.max() >= len(activities)):
+            raise ValueError('activity codes must be in [0, len(activities))')
+
+    @staticmethod
+    def _create_from_trusted_columns(
+            activities: List[str], activity_codes: np.ndarray,
+            trace_offsets: np.ndarray, trace_ids: List[Hashable] = None,
+            event_attributes: Dict[str, AttributeColumn] = None,
+            trace_attributes: Dict[str, AttributeColumn] = None) -> 'ColumnarEventLog':
+        """creates a log like the constructor, but only checks the lengths of
+        the columns and not their values. this avoids reading every element
+        of memory mapped columns, e.g. of files written by
+        write_binary_event_log."""
+        log = ColumnarEventLog.__new__(ColumnarEventLog)
+        log._init_columns(activities, activity_codes, trace_offsets, trace_ids,
+                          event_attributes, trace_attributes)
+        return log
+
+    def _init_columns(self, activities: List[str], activity_codes: np.ndarray,
+                      trace_offsets: np.ndarray, trace_ids: List[Hashable],
+                      event_attributes: Dict[str, AttributeColumn],
+                      trace_attributes: Dict[str, AttributeColumn]):
+        if len(trace_offsets) == 0 or trace_offsets[0] != 0 or \
+        trace_offsets[-1] != len(activity_codes):
+            raise ValueError(
+                'trace_offsets must start with 0 and end with len(activity_codes)')
+        nr_of_traces = len(trace_offsets) - 1
+        if trace_ids is None:
+            trace_ids = list(range(nr_of_traces))
+        elif len(trace_ids) != nr_of_traces:
+            raise ValueError('there must be exactly one id per trace')
+        elif not isinstance(trace_ids, AttributeColumn):
+            trace_ids = list(trace_ids)
+        self.activities = list(activities)
+        self.activity_codes = activity_codes
+        self.trace_offsets = trace_offsets
+        self.trace_ids = trace_ids
+        self.event_attributes = event_attributes if event_attributes is not None else {}
+        self.trace_attributes = trace_attributes if trace_attributes is not None else {}
+        for name, column in self.event_attributes.items():
+            if len(column) != len(activity_codes):
+                raise ValueError('event attribute %s must have one value per event' % name)
+        for name, column in self.trace_attributes.items():
+            if len(column) != nr_of_traces:
+                raise ValueError('trace attribute %s must have one value per trace' % name)
+        self._traces = None
+        self._filepath = None
+
+    def __reduce_ex__(self, protocol):
+        #a memory mapped log is pickled as path to its file such that the
+        #receiving process maps the same file instead of copying the data
+        if self._filepath is not None and self._traces is None:
+            from prolothar_common.models.eventlog.binary_format import open_binary_event_log
+            return (open_binary_event_log, (self._filepath,))
+        return super().__reduce_ex__(protocol)
+
+    @property
+    def traces(self) -> List[Trace]:
+        if self._traces is None:
+            self._traces = [self.get_trace(i) for i in range(len(self.trace_ids))]
+        return self._traces
+
+    @traces.setter
+    def traces(self, traces: List[Trace]):
+        self._traces = traces
+
+    def is_materialized(self) -> bool:
+        """returns True if this log has been converted to Trace objects,
+        i.e. the columns are not used anymore"""
+        return self._traces is not None
+
+    def get_trace(self, index: int) -> Trace:
+        """creates the Trace object of the trace at the given index"""
+        start = int(self.trace_offsets[index])
+        end = int(self.trace_offsets[index + 1])
+        event_attribute_values = [
+            (name, column.to_list(start, end), column.present)
+            for name, column in self.event_attributes.items()
+        ]
+        events = []
+        for i, code in enumerate(self.activity_codes[start:end].tolist()):
+            attributes = {}
+            for name, values, present in event_attribute_values:
+                if present is None or present[start + i]:
+                    attributes[name] = values[i]
+            events.append(Event(self.activities[code], attributes))
+        trace_attributes = {
+            name: column.get(index) for name, column in self.trace_attributes.items()
+            if column.is_present(index)
+        }
+        return Trace(self.trace_ids[index], events, trace_attributes)
+
+    def get_trace_codes(self, index: int) -> np.ndarray:
+        """returns the activity codes of the trace at the given index"""
+        return self.activity_codes[
+            self.trace_offsets[index]:self.trace_offsets[index + 1]]
+
+    def get_nr_of_traces(self):
+        if self._traces is not None:
+            return super().get_nr_of_traces()
+        return len(self.trace_ids)
+
+    def __len__(self):
+        return self.get_nr_of_traces()
+
+    def __iter__(self) -> Iterator[Trace]:
+        if self._traces is not None:
+            return super().__iter__()
+        return (self.get_trace(i) for i in range(len(self.trace_ids)))
+
+    def __repr__(self):
+        if self._traces is not None:
+            return super().__repr__()
+        lines = ['==========', 'EventLog with %r traces' % self.get_nr_of_traces(),
+                 '----------']
+        for i in range(len(self.trace_ids)):
+            lines.append('Trace(id=%s)%s' % (
+                str(self.trace_ids[i]),
+                str([self.activities[c] for c in self.get_trace_codes(i).tolist()])))
+        lines.append('==========')
+        return '\n'.join(lines) + '\n'
+
+    def __eq__(self, other):
+        return Counter(iter(self)) == Counter(iter(other))
+
+    def copy(self) -> 'ColumnarEventLog':
+        if self._traces is not None:
+            return ColumnarEventLog.create_from_event_log(self)
+        return ColumnarEventLog(
+            self.activities, self.activity_codes.copy(), self.trace_offsets.copy(),
+            trace_ids=self.trace_ids,
+            event_attributes={
+                name: column.copy() for name, column in self.event_attributes.items()
+            },
+            trace_attributes={
+                name: column.copy() for name, column in self.trace_attributes.items()
+            })
+
+    def write_to_binary_file(self, filepath: str):
+        """writes this log into a binary file that can be memory mapped with
+        ColumnarEventLog.open_binary_file"""
+        from prolothar_common.models.eventlog.binary_format import write_binary_event_log
+        write_binary_event_log(self, filepath)
+
+    @staticmethod
+    def open_binary_file(filepath: str) -> 'ColumnarEventLog':
+        """memory maps a file that has been written by write_to_binary_file
+        without copying its content"""
+        from prolothar_common.models.eventlog.binary_format import open_binary_event_log
+        return open_binary_event_log(filepath)
+
+    def to_event_log(self) -> EventLog:
+        """converts this log into a normal EventLog with Trace and Event objects"""
+        log = EventLog()
+        log.traces = [self.get_trace(i) for i in range(len(self.trace_ids))] \
+            if self._traces is None else list(self._traces)
+        return log
+
+    def to_simple_activity_log(self) -> ActivityLog:
+        if self._traces is not None:
+            return super().to_simple_activity_log()
+        activity_names = np.asarray(self.activities, dtype=object)[
+            self.activity_codes].tolist()
+        offsets = self.trace_offsets.tolist()
+        return [
+            activity_names[offsets[i]:offsets[i+1]]
+            for i in range(len(offsets) - 1)
+        ]
+
+    def count_nr_of_events(self) -> int:
+        if self._traces is not None:
+            return super().count_nr_of_events()
+        return len(self.activity_codes)
+
+    def compute_activity_set(self) -> Set[str]:
+        if self._traces is not None:
+            return super().compute_activity_set()
+        return set(self.activities[c] for c in np.unique(self.activity_codes).tolist())
+
+    def compute_activity_supports(self) -> Dict[str, int]:
+        if self._traces is not None:
+            return super().compute_activity_supports()
+        counts = np.bincount(self.activity_codes, minlength=len(self.activities))
+        return Counter({
+            self.activities[code]: count
+            for code, count in enumerate(counts.tolist()) if count > 0
+        })
+
+    def compute_set_of_start_activities(self) -> Set[str]:
+        if self._traces is not None:
+            return super().compute_set_of_start_activities()
+        return set(self.activities[c] for c in np.unique(
+            self.activity_codes[self.trace_offsets[:-1]]).tolist())
+
+    def compute_set_of_end_activities(self) -> Set[str]:
+        if self._traces is not None:
+            return super().compute_set_of_end_activities()
+        return set(self.activities[c] for c in np.unique(
+            self.activity_codes[self.trace_offsets[1:] - 1]).tolist())
+
+    def compute_variant_log(self) -> VariantLog:
+        if self._traces is not None:
+            return super().compute_variant_log()
+        #traces are grouped by the raw bytes of their activity codes, i.e.
+        #activity names are only looked up once per variant
+        variants: Dict[bytes, Variant] = {}
+        trace_ids = self.trace_ids.to_list(0, len(self.trace_ids)) \
+            if isinstance(self.trace_ids, AttributeColumn) else self.trace_ids
+        offsets = self.trace_offsets.tolist()
+        for i in range(len(offsets) - 1):
+            codes = self.activity_codes[offsets[i]:offsets[i+1]]
+            key = codes.tobytes()
+            try:
+                variant = variants[key]
+            except KeyError:
+                variant = Variant(tuple(self.activities[c] for c in codes.tolist()))
+                variants[key] = variant
+            variant.trace_ids.append(trace_ids[i])
+        variant_log = VariantLog()
+        for variant in variants.values():
+            variant_log.add_variant(variant)
+        return variant_log
+
+    @staticmethod
+    def create_from_event_log(log: Iterable[Trace]) -> 'ColumnarEventLog':
+        """
+        converts an EventLog (or any iterable of Trace objects) into a
+        ColumnarEventLog.
+
+        Raises
+        ------
+        ValueError
+            if the log contains a ComplexEvent, which cannot be represented in
+            columns
+        """
+        activity_dictionary = {}
+        activity_codes = []
+        trace_offsets = [0]
+        trace_ids = []
+        event_attribute_values = {}
+        trace_attribute_values = {}
+        nr_of_events = 0
+        for trace_index, trace in enumerate(log):
+            trace_ids.append(trace.get_id())
+            for event in trace.events:
+                if isinstance(event, ComplexEvent):
+                    raise ValueError('ComplexEvent is not supported: %r' % event)
+                activity_codes.append(activity_dictionary.setdefault(
+                    event.activity_name, len(activity_dictionary)))
+                for name, value in event.attributes.items():
+                    _append_to_column(event_attribute_values, name, value, nr_of_events)
+                nr_of_events += 1
+            trace_offsets.append(nr_of_events)
+            for name, value in trace.attributes.items():
+                _append_to_column(trace_attribute_values, name, value, trace_index)
+
+        return ColumnarEventLog(
+            list(activity_dictionary.keys()),
+            np.array(activity_codes, dtype=np.int32),
+            np.array(trace_offsets, dtype=np.int64),
+            trace_ids=trace_ids,
+            event_attributes=_create_columns(event_attribute_values, nr_of_events),
+            trace_attributes=_create_columns(trace_attribute_values, len(trace_ids)))
+
+    @staticmethod
+    def create_from_simple_activity_log(activity_log: ActivityLog) -> 'ColumnarEventLog':
+        activity_dictionary = {}
+        activity_codes = []
+        trace_offsets = [0]
+        for trace in activity_log:
+            activity_codes.extend(
+                activity_dictionary.setdefault(activity, len(activity_dictionary))
+                for activity in trace)
+            trace_offsets.append(len(activity_codes))
+        return ColumnarEventLog(
+            list(activity_dictionary.keys()),
+            np.array(activity_codes, dtype=np.int32),
+            np.array(trace_offsets, dtype=np.int64))
+
+def _append_to_column(columns: Dict[str, List], name: str, value, index: int):
+    try:
+        values, present = columns[name]
+    except KeyError:
+        values = []
+        present = []
+        columns[name] = (values, present)
+    if len(values) < index:
+        values.extend([None] * (index - len(values)))
+        present.extend([False] * (index - len(present)))
+    values.append(value)
+    present.append(True)
+
+def _create_columns(columns: Dict[str, List], length: int) -> Dict[str, AttributeColumn]:
+    for values, present in columns.values():
+        if len(values) < length:
+            values.extend([None] * (length - len(values)))
+            present.extend([False] * (length - len(present)))
+    return {
+        name: AttributeColumn.create_from_values(values, present)
+        for name, (values, present) in columns.items()
+    }
@@ -30,6 +30,7 @@ import pandas as pd
 from sklearn.model_selection import KFold
 from prolothar_common.models.eventlog.trace import Trace
 from prolothar_common.models.eventlog.event import Event
+from prolothar_common.models.eventlog.variant_log import VariantLog
 
 ActivityLog = List[List[str]]
 
@@ -288,14 +289,15 @@ class EventLog():
         """
         counter = Counter()
 
-        for trace in self.traces:
+        variant_log = self.compute_variant_log()
+        for variant in variant_log:
             seen_activities = set()
-            for event in trace.events:
+            for activity_name in variant.activities:
                 for activity in seen_activities:
-                    counter[(activity,event.activity_name)] += 1
-                seen_activities.add(event.activity_name)
+                    counter[(activity,activity_name)] += variant.count
+                seen_activities.add(activity_name)
 
-        activity_set = self.compute_activity_set()
+        activity_set = variant_log.compute_activity_set()
         for a in activity_set:
             for b in activity_set:
                 if (a,b) not in counter:
@@ -303,6 +305,11 @@ class EventLog():
 
         return dict(counter)
 
+    def compute_variant_log(self) -> VariantLog:
+        """groups the traces of this log by their sequence of activities. the
+        returned VariantLog is not updated if this log is changed later on."""
+        return VariantLog.create_from_event_log(self.traces)
+
     def add_start_activity_to_every_trace(self, activity: str):
         """adds the given activity to all traces as a new start activity"""
         for trace in self.traces:
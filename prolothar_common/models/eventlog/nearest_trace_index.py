@@ -0,0 +1,266 @@
+'''
+    This file is part of Prolothar-Common (More Info: https://github.com/shs-it/prolothar-common).
+
+    Prolothar-Common is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Prolothar-Common is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
+'''
+
+from typing import List, Dict, Tuple, Iterable, Hashable
+from collections import Counter
+import heapq
+import math
+
+import numpy as np
+
+from prolothar_common.levenshtein import levenshtein_distance_of_codes
+from prolothar_common.models.eventlog.trace import Trace
+from prolothar_common.models.eventlog.variant_log import Variant
+
+class NearestTraceIndex():
+    """
+    metric index (BK-tree) over the variants of an event log for the
+    levenshtein distance of their activity sequences. supports k-nearest-
+    neighbor and radius queries and incremental insertion of traces.
+
+    every node of the tree stores a variant. all variants in the subtree of
+    the child with label d have the distance d to the node, i.e. by the
+    triangle inequality a subtree can be skipped if |d(query, node) - d| is
+    larger than the search radius. additionally, a node is skipped without
+    computing its distance if a lower bound from the difference of the
+    activity multisets is too large.
+    """
+
+    def __init__(self, insertion_cost: int = 1, deletion_cost: int = 1,
+                 substitution_cost: int = 1):
+        """
+        creates an empty index
+
+        Parameters
+        ----------
+        insertion_cost : int, optional
+            cost of inserting an activity, by default 1
+        deletion_cost : int, optional
+            cost of deleting an activity, by default 1. must be equal to
+            insertion_cost, because the distance must be symmetric
+        substitution_cost : int, optional
+            cost of substituting an activity, by default 1
+
+        Raises
+        ------
+        ValueError
+            if insertion_cost and deletion_cost are different or a cost is
+            negative
+        """
+        if insertion_cost != deletion_cost:
+            raise ValueError('insertion_cost and deletion_cost must be equal')
+        if insertion_cost < 0 or substitution_cost < 0:
+            raise ValueError('costs must not be negative')
+        self.__insertion_cost = insertion_cost
+        self.__substitution_cost = substitution_cost
+        self.__root: _Node = None
+        self.__nodes: Dict[Tuple[str], _Node] = {}
+        self.__activity_codes: Dict[str, int] = {}
+
+    def add_trace(self, trace: Trace):
+        """adds a trace to its variant or inserts a new variant for it"""
+        self.add_activity_sequence(trace.get_id(), trace.to_activity_list())
+
+    def add_activity_sequence(self, trace_id: Hashable, activities: Iterable[str]):
+        """adds the trace with the given id and activities to its variant or
+        inserts a new variant for it"""
+        activities = tuple(activities)
+        try:
+            self.__nodes[activities].variant.trace_ids.append(trace_id)
+        except KeyError:
+            self.add_variant(Variant(activities, [trace_id]))
+
+    def add_variant(self, variant: Variant):
+        """inserts a variant into the tree. if there is already a variant with
+        the same activities, the trace ids are appended to it"""
+        try:
+            self.__nodes[variant.activities].variant.trace_ids.extend(variant.trace_ids)
+            return
+        except KeyError:
+            pass
+        new_node = _Node(variant, self.__encode(variant.activities, True),
+                         len(self.__nodes))
+        self.__nodes[variant.activities] = new_node
+        if self.__root is None:
+            self.__root = new_node
+            return
+        node = self.__root
+        while True:
+            distance = self.__compute_distance(new_node.codes, node.codes)
+            try:
+                node = node.children[distance]
+            except KeyError:
+                node.children[distance] = new_node
+                node.max_child_distance = max(node.max_child_distance, distance)
+                return
+
+    def __len__(self) -> int:
+        """number of variants in the index"""
+        return len(self.__nodes)
+
+    def get_nearest_variants(self, activities: Iterable[str],
+                             k: int = 1) -> List[Tuple[int, Variant]]:
+        """
+        returns the k variants with the smallest distance to the given
+        sequence of activities as list of (distance, variant), sorted by
+        the distance. ties are broken by the insertion order of the variants.
+        returns less than k variants if the index is smaller.
+
+        Raises
+        ------
+        ValueError
+            if k < 1
+        """
+        if k < 1:
+            raise ValueError('k must be at least 1')
+        query = _Query(self.__encode(activities, False))
+        #max-heap with the best k candidates: (-distance, -insertion order, node)
+        best_candidates = []
+        def get_radius():
+            return -best_candidates[0][0] if len(best_candidates) == k else math.inf
+        def add_candidate(node: _Node, distance: int):
+            candidate = (-distance, -node.insertion_order, node)
+            if len(best_candidates) < k:
+                heapq.heappush(best_candidates, candidate)
+            elif candidate[:2] > best_candidates[0][:2]:
+                heapq.heapreplace(best_candidates, candidate)
+        self.__search(query, get_radius, add_candidate)
+        return [(-distance, node.variant) for distance, _, node in
+                sorted(best_candidates, reverse=True)]
+
+    def get_variants_within_distance(
+            self, activities: Iterable[str],
+            max_distance: int) -> List[Tuple[int, Variant]]:
+        """
+        returns all variants with a distance <= max_distance to the given
+        sequence of activities as list of (distance, variant), sorted by the
+        distance and the insertion order of the variants
+
+        Raises
+        ------
+        ValueError
+            if max_distance is negative
+        """
+        if max_distance < 0:
+            raise ValueError('max_distance must not be negative')
+        query = _Query(self.__encode(activities, False))
+        result = []
+        self.__search(query, lambda: max_distance,
+                      lambda node, distance: result.append((distance, node)))
+        result.sort(key=lambda candidate: (candidate[0], candidate[1].insertion_order))
+        return [(distance, node.variant) for distance, node in result]
+
+    def __search(self, query: '_Query', get_radius, add_candidate):
+        """best-first search: subtrees are visited in ascending order of the
+        lower bound of their distances to the query"""
+        if self.__root is None:
+            return
+        queue = [(0, 0, self.__root)]
+        while queue:
+            lower_bound, _, node = heapq.heappop(queue)
+            radius = get_radius()
+            if lower_bound > radius:
+                break
+            #all children have a distance of at most max_child_distance to
+            #the node, i.e. the node and its subtree can be skipped if
+            #d(query, node) > radius + max_child_distance
+            cutoff = radius + node.max_child_distance
+            if self.__compute_lower_bound(query, node) > cutoff:
+                continue
+            distance = self.__compute_distance(
+                query.codes, node.codes,
+                None if math.isinf(cutoff) else cutoff)
+            if distance <= radius:
+                add_candidate(node, distance)
+                radius = get_radius()
+            for child_distance, child in node.children.items():
+                child_lower_bound = abs(distance - child_distance)
+                if child_lower_bound <= radius:
+                    heapq.heappush(queue, (
+                        max(lower_bound, child_lower_bound),
+                        child.insertion_order, child))
+
+    def __compute_distance(self, codes1: np.ndarray, codes2: np.ndarray,
+                           max_distance: int = None) -> int:
+        return levenshtein_distance_of_codes(
+            codes1, codes2, self.__insertion_cost, self.__insertion_cost,
+            self.__substitution_cost, max_distance=max_distance)
+
+    def __compute_lower_bound(self, query: '_Query', node: '_Node') -> int:
+        """every activity that occurs more often in one sequence than in the
+        other needs an insertion, deletion or substitution. the multiset
+        difference is only computed for long sequences. otherwise, the
+        (bit-parallel) distance is cheaper and only the length difference
+        is used"""
+        length_difference = abs(len(query.codes) - len(node.codes))
+        if min(len(query.codes), len(node.codes)) < _MIN_LENGTH_FOR_MULTISET_BOUND:
+            return self.__insertion_cost * length_difference
+        surplus_of_query = 0
+        for code, count in query.activity_counts.items():
+            surplus_of_query += max(0, count - node.activity_counts.get(code, 0))
+        surplus_of_node = surplus_of_query + len(node.codes) - len(query.codes)
+        nr_of_substitutions = min(surplus_of_query, surplus_of_node)
+        return (min(self.__substitution_cost, 2 * self.__insertion_cost)
+                * nr_of_substitutions
+                + self.__insertion_cost * length_difference)
+
+    def __encode(self, activities: Iterable[str], add_new_activities: bool) -> np.ndarray:
+        if add_new_activities:
+            codes = self.__activity_codes
+        else:
+            #activities that are only in the query must not be stored
+            codes = dict(self.__activity_codes)
+        return np.array([codes.setdefault(a, len(codes)) for a in activities],
+                        dtype=np.intc)
+
+    @staticmethod
+    def create_from_event_log(
+            log: Iterable[Trace], insertion_cost: int = 1,
+            deletion_cost: int = 1, substitution_cost: int = 1) -> 'NearestTraceIndex':
+        """builds an index over the variants of an EventLog. the variants are
+        inserted in the order of their first trace"""
+        index = NearestTraceIndex(insertion_cost=insertion_cost,
+                                  deletion_cost=deletion_cost,
+                                  substitution_cost=substitution_cost)
+        if hasattr(log, 'compute_variant_log'):
+            for variant in log.compute_variant_log():
+                index.add_variant(variant)
+        else:
+            for trace in log:
+                index.add_trace(trace)
+        return index
+
+_MIN_LENGTH_FOR_MULTISET_BOUND = 256
+
+class _Node():
+    __slots__ = ('variant', 'codes', 'activity_counts', 'children',
+                 'max_child_distance', 'insertion_order')
+
+    def __init__(self, variant: Variant, codes: np.ndarray, insertion_order: int):
+        self.variant = variant
+        self.codes = codes
+        self.activity_counts = Counter(codes.tolist())
+        self.children: Dict[int, _Node] = {}
+        self.max_child_distance = 0
+        self.insertion_order = insertion_order
+
+class _Query():
+    __slots__ = ('codes', 'activity_counts')
+
+    def __init__(self, codes: np.ndarray):
+        self.codes = codes
+        self.activity_counts = Counter(codes.tolist())
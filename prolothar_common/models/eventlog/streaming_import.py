@@ -0,0 +1,310 @@
+'''
+    This file is part of Prolothar-Common (More Info: https://github.com/shs-it/prolothar-common).
+
+    Prolothar-Common is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Prolothar-Common is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
+'''
+
+"""
+streaming import of event logs from CSV and XES files. in contrast to
+EventLog.create_from_pandas_df, the file is never loaded completely into memory.
+events are grouped into traces on the fly and traces are emitted as soon as they
+are complete, i.e. consumers that iterate over the traces (e.g.
+DirectlyFollowsGraph.read_counts_from_log) run in bounded memory.
+"""
+
+from typing import List, Iterator, Tuple, Dict
+from datetime import datetime
+import gzip
+import os
+import pickle
+import tempfile
+import xml.etree.ElementTree as ElementTree
+
+import pandas as pd
+
+from prolothar_common.models.eventlog.eventlog import EventLog
+from prolothar_common.models.eventlog.columnar_eventlog import ColumnarEventLog
+from prolothar_common.models.eventlog.trace import Trace
+from prolothar_common.models.eventlog.event import Event
+
+def iter_traces_from_csv(
+        filepath: str, case_id_column: str, activity_column: str,
+        event_attribute_columns: List[str] = None,
+        trace_attribute_columns: List[str] = None,
+        sorted_by_case: bool = False, add_none_attributes: bool = False,
+        separator: str = ',', chunksize: int = 100_000,
+        nr_of_spill_files: int = 64, spill_directory: str = None) -> Iterator[Trace]:
+    """
+    reads a CSV file with one event per line chunk by chunk and yields its traces.
+    the created traces are the same as in EventLog.create_from_pandas_df,
+    except that missing values are None instead of NaN.
+
+    Parameters
+    ----------
+    filepath : str
+        path to the CSV file
+    case_id_column : str
+        name of the column with the case id. the case id becomes the trace id.
+    activity_column : str
+        name of the column with the activity
+    event_attribute_columns : List[str], optional
+        columns that are stored as event attributes, by default None
+    trace_attribute_columns : List[str], optional
+        columns that are stored as trace attributes. the value of the first
+        event of a trace is used. by default None
+    sorted_by_case : bool, optional
+        set this to True if all events of a case are stored in consecutive lines.
+        then the file is read in one pass and only the current trace is kept
+        in memory. by default False, i.e. the events are first distributed by
+        their case id on temporary spill files, which are then read one by one.
+    add_none_attributes : bool, optional
+        if True, missing attribute values are stored as None, otherwise the
+        attribute is omitted. by default False
+    separator : str, optional
+        separator of the CSV file, by default ','
+    chunksize : int, optional
+        number of lines that are read at once, by default 100_000
+    nr_of_spill_files : int, optional
+        number of temporary files for unsorted input. the memory consumption
+        is bounded by the size of the largest spill file. by default 64
+    spill_directory : str, optional
+        directory for the temporary files, by default None, i.e. the default
+        temporary directory of the system
+
+    Yields
+    ------
+    Trace
+        the traces in order of their appearance if sorted_by_case is True,
+        otherwise in an arbitrary order
+    """
+    if event_attribute_columns is None:
+        event_attribute_columns = []
+    if trace_attribute_columns is None:
+        trace_attribute_columns = []
+    row_builder = _RowToEventConverter(
+        case_id_column, event_attribute_columns, trace_attribute_columns,
+        add_none_attributes)
+    columns = [case_id_column, activity_column] + \
+        list(event_attribute_columns) + list(trace_attribute_columns)
+    rows = _iter_csv_rows(filepath, columns, separator, chunksize)
+    if sorted_by_case:
+        yield from row_builder.iter_traces_of_sorted_rows(rows)
+    else:
+        yield from row_builder.iter_traces_of_unsorted_rows(
+            rows, nr_of_spill_files, spill_directory)
+
+def read_event_log_from_csv(
+        filepath: str, case_id_column: str, activity_column: str,
+        columnar: bool = False, **kwargs) -> EventLog:
+    """
+    reads an EventLog from a CSV file without loading the complete table into
+    memory. see "iter_traces_from_csv" for the optional arguments.
+
+    Parameters
+    ----------
+    columnar : bool, optional
+        if True, a ColumnarEventLog is returned, which needs considerably
+        less memory than an EventLog. by default False
+    """
+    return _collect_traces(iter_traces_from_csv(
+        filepath, case_id_column, activity_column, **kwargs), columnar)
+
+def iter_traces_from_xes(filepath: str, activity_key: str = 'concept:name',
+                         case_id_key: str = 'concept:name') -> Iterator[Trace]:
+    """
+    parses a XES file (optionally gzip compressed) incrementally and yields
+    its traces. a trace is released from memory as soon as it has been yielded.
+    nested attributes (lists or attributes of attributes) are ignored.
+
+    Parameters
+    ----------
+    filepath : str
+        path to the XES file. if the name ends with ".gz", the file is
+        decompressed on the fly
+    activity_key : str, optional
+        event attribute with the activity, by default 'concept:name'.
+        this attribute is not added to the attributes of the Event.
+    case_id_key : str, optional
+        trace attribute with the id of the trace, by default 'concept:name'.
+        if a trace does not have this attribute, the index of the trace is used
+
+    Raises
+    ------
+    ValueError
+        if an event has no activity
+    """
+    open_function = gzip.open if filepath.endswith('.gz') else open
+    with open_function(filepath, 'rb') as f:
+        root = None
+        element_stack = []
+        attribute_stack = []
+        events = []
+        trace_index = 0
+        for action, element in ElementTree.iterparse(f, events=('start', 'end')):
+            tag = _remove_namespace(element.tag)
+            if action == 'start':
+                if root is None:
+                    root = element
+                element_stack.append(tag)
+                if tag in ('trace', 'event'):
+                    attribute_stack.append({})
+            elif tag == 'event':
+                element_stack.pop()
+                attributes = attribute_stack.pop()
+                if element_stack[-1] == 'trace':
+                    try:
+                        activity = attributes.pop(activity_key)
+                    except KeyError:
+                        raise ValueError('event without %s in trace %d' % (
+                            activity_key, trace_index))
+                    events.append(Event(activity, attributes))
+                element.clear()
+            elif tag == 'trace':
+                element_stack.pop()
+                attributes = attribute_stack.pop()
+                if events:
+                    yield Trace(attributes.get(case_id_key, trace_index), events, attributes)
+                events = []
+                trace_index += 1
+                root.clear()
+            else:
+                element_stack.pop()
+                if element_stack and element_stack[-1] in ('trace', 'event') \
+                and tag in _XES_ATTRIBUTE_PARSERS and 'key' in element.attrib:
+                    attribute_stack[-1][element.attrib['key']] = \
+                        _XES_ATTRIBUTE_PARSERS[tag](element.attrib.get('value'))
+
+def read_event_log_from_xes(filepath: str, columnar: bool = False, **kwargs) -> EventLog:
+    """
+    reads an EventLog from a XES file. see "iter_traces_from_xes" for the
+    optional arguments.
+
+    Parameters
+    ----------
+    columnar : bool, optional
+        if True, a ColumnarEventLog is returned, which needs considerably
+        less memory than an EventLog. by default False
+    """
+    return _collect_traces(iter_traces_from_xes(filepath, **kwargs), columnar)
+
+def _collect_traces(traces: Iterator[Trace], columnar: bool) -> EventLog:
+    if columnar:
+        return ColumnarEventLog.create_from_event_log(traces)
+    log = EventLog()
+    log.traces = list(traces)
+    return log
+
+def _iter_csv_rows(filepath: str, columns: List[str], separator: str,
+                   chunksize: int) -> Iterator[Tuple]:
+    for chunk in pd.read_csv(filepath, sep=separator, usecols=list(dict.fromkeys(columns)),
+                             chunksize=chunksize):
+        chunk = chunk[columns].astype(object)
+        yield from chunk.where(pd.notna(chunk), None).itertuples(index=False, name=None)
+
+class _RowToEventConverter():
+    """groups rows of the form (case id, activity, event attributes,
+    trace attributes) to traces"""
+
+    def __init__(self, case_id_column: str, event_attribute_columns: List[str],
+                 trace_attribute_columns: List[str], add_none_attributes: bool):
+        self.case_id_column = case_id_column
+        self.event_attribute_columns = event_attribute_columns
+        self.trace_attribute_columns = trace_attribute_columns
+        self.add_none_attributes = add_none_attributes
+        self.first_trace_attribute_index = 2 + len(event_attribute_columns)
+
+    def create_event(self, row: Tuple) -> Event:
+        attributes = {}
+        for i, attribute in enumerate(self.event_attribute_columns, start=2):
+            if self.add_none_attributes or row[i] is not None:
+                attributes[attribute] = row[i]
+        return Event(row[1], attributes)
+
+    def create_trace(self, first_row: Tuple, events: List[Event]) -> Trace:
+        attributes = {self.case_id_column: first_row[0]}
+        for i, attribute in enumerate(self.trace_attribute_columns,
+                                      start=self.first_trace_attribute_index):
+            attributes[attribute] = first_row[i]
+        return Trace(first_row[0], events, attributes)
+
+    def iter_traces_of_sorted_rows(self, rows: Iterator[Tuple]) -> Iterator[Trace]:
+        first_row = None
+        events = []
+        for row in rows:
+            if first_row is not None and row[0] != first_row[0]:
+                yield self.create_trace(first_row, events)
+                events = []
+                first_row = row
+            elif first_row is None:
+                first_row = row
+            events.append(self.create_event(row))
+        if first_row is not None:
+            yield self.create_trace(first_row, events)
+
+    def iter_traces_of_unsorted_rows(
+            self, rows: Iterator[Tuple], nr_of_spill_files: int,
+            spill_directory: str) -> Iterator[Trace]:
+        if nr_of_spill_files < 1:
+            raise ValueError('nr_of_spill_files must be at least 1')
+        with tempfile.TemporaryDirectory(dir=spill_directory) as directory:
+            spill_files = [
+                open(os.path.join(directory, '%d.pickle' % i), 'wb')
+                for i in range(nr_of_spill_files)
+            ]
+            try:
+                buffers = [[] for _ in range(nr_of_spill_files)]
+                for row in rows:
+                    i = hash(row[0]) % nr_of_spill_files
+                    buffers[i].append(row)
+                    if len(buffers[i]) >= _SPILL_BUFFER_SIZE:
+                        pickle.dump(buffers[i], spill_files[i])
+                        buffers[i] = []
+                for spill_file, buffer in zip(spill_files, buffers):
+                    if buffer:
+                        pickle.dump(buffer, spill_file)
+            finally:
+                for spill_file in spill_files:
+                    spill_file.close()
+            for spill_file in spill_files:
+                yield from self.__iter_traces_of_spill_file(spill_file.name)
+
+    def __iter_traces_of_spill_file(self, filepath: str) -> Iterator[Trace]:
+        rows_per_case: Dict[object, List[Tuple]] = {}
+        with open(filepath, 'rb') as f:
+            while True:
+                try:
+                    rows = pickle.load(f)
+                except EOFError:
+                    break
+                for row in rows:
+                    rows_per_case.setdefault(row[0], []).append(row)
+        for rows in rows_per_case.values():
+            yield self.create_trace(rows[0], [self.create_event(row) for row in rows])
+
+_SPILL_BUFFER_SIZE = 10_000
+
+def _remove_namespace(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+def _parse_xes_boolean(value: str) -> bool:
+    return value.lower() == 'true'
+
+_XES_ATTRIBUTE_PARSERS = {
+    'string': str,
+    'id': str,
+    'int': int,
+    'float': float,
+    'boolean': _parse_xes_boolean,
+    'date': datetime.fromisoformat
+}
@@ -0,0 +1,175 @@
+'''
+    This file is part of Prolothar-Common (More Info: https://github.com/shs-it/prolothar-common).
+
+    Prolothar-Common is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Prolothar-Common is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
+'''
+
+from typing import List, Dict, Set, Tuple, Iterable, Iterator, Hashable
+from collections import Counter
+
+from prolothar_common.models.eventlog.trace import Trace
+
+class Variant():
+    """
+    a unique sequence of activities (= variant) of an event log together with
+    the ids of all traces that follow this sequence
+    """
+
+    def __init__(self, activities: Tuple[str], trace_ids: List[Hashable] = None):
+        """
+        creates a new variant
+
+        Parameters
+        ----------
+        activities : Tuple[str]
+            the sequence of activities of this variant
+        trace_ids : List[Hashable], optional
+            ids of the traces with this variant, by default None, i.e. an
+            empty list
+        """
+        self.activities = activities
+        self.trace_ids = trace_ids if trace_ids is not None else []
+
+    @property
+    def count(self) -> int:
+        """number of traces with this variant"""
+        return len(self.trace_ids)
+
+    def __len__(self):
+        return len(self.activities)
+
+    def __repr__(self):
+        return 'Variant(count=%d)%r' % (self.count, list(self.activities))
+
+    def __eq__(self, other):
+        return (isinstance(other, Variant)
+                and self.activities == other.activities
+                and self.trace_ids == other.trace_ids)
+
+class VariantLog():
+    """
+    variant-indexed view on an event log: all traces with the same sequence of
+    activities are grouped into one Variant. counting algorithms that only need
+    the activity sequences (and not the event attributes) can iterate over the
+    variants and weight their results by Variant.count, i.e. their runtime
+    depends on the number of variants instead of the number of traces.
+    the variants are ordered by the first occurence of their first trace.
+    """
+
+    def __init__(self):
+        self.variants: List[Variant] = []
+        self.__variant_index: Dict[Tuple[str], Variant] = {}
+        self.__nr_of_traces = 0
+
+    def add_trace(self, trace: Trace):
+        """adds a trace to its variant or creates a new variant for it"""
+        self.add_activity_sequence(trace.get_id(), tuple(trace.to_activity_list()))
+
+    def add_activity_sequence(self, trace_id: Hashable, activities: Tuple[str]):
+        """adds the trace with the given id and sequence of activities to its
+        variant or creates a new variant for it"""
+        try:
+            variant = self.__variant_index[activities]
+        except KeyError:
+            variant = Variant(activities)
+            self.__variant_index[activities] = variant
+            self.variants.append(variant)
+        variant.trace_ids.append(trace_id)
+        self.__nr_of_traces += 1
+
+    def add_variant(self, variant: Variant):
+        """adds a variant to this log. if there is already a variant with the
+        same activities, the trace ids are appended to the existing variant"""
+        try:
+            self.__variant_index[variant.activities].trace_ids.extend(variant.trace_ids)
+        except KeyError:
+            self.__variant_index[variant.activities] = variant
+            self.variants.append(variant)
+        self.__nr_of_traces += variant.count
+
+    def get_variant(self, activities: Tuple[str]) -> Variant:
+        """returns the variant with the given sequence of activities
+
+        Raises
+        ------
+        KeyError
+            if there is no such variant
+        """
+        return self.__variant_index[tuple(activities)]
+
+    def get_nr_of_variants(self) -> int:
+        return len(self.variants)
+
+    def get_nr_of_traces(self) -> int:
+        return self.__nr_of_traces
+
+    def __len__(self):
+        return len(self.variants)
+
+    def __iter__(self) -> Iterator[Variant]:
+        return iter(self.variants)
+
+    def __repr__(self):
+        return 'VariantLog with %d traces and %d variants%r' % (
+            self.__nr_of_traces, len(self.variants), self.variants)
+
+    def count_nr_of_events(self) -> int:
+        return sum(len(variant) * variant.count for variant in self.variants)
+
+    def compute_activity_set(self) -> Set[str]:
+        return set(activity for variant in self.variants
+                   for activity in variant.activities)
+
+    def compute_activity_supports(self) -> Dict[str, int]:
+        """counts the number of events per activity"""
+        supports = Counter()
+        for variant in self.variants:
+            for activity in variant.activities:
+                supports[activity] += variant.count
+        return supports
+
+    def compute_start_activity_counts(self) -> Dict[str, int]:
+        """counts the number of traces that start with a given activity"""
+        counter = Counter()
+        for variant in self.variants:
+            if variant.activities:
+                counter[variant.activities[0]] += variant.count
+        return counter
+
+    def compute_end_activity_counts(self) -> Dict[str, int]:
+        """counts the number of traces that end with a given activity"""
+        counter = Counter()
+        for variant in self.variants:
+            if variant.activities:
+                counter[variant.activities[-1]] += variant.count
+        return counter
+
+    def to_simple_activity_log(self) -> List[List[str]]:
+        """returns the activity sequence of every trace, i.e. each variant is
+        repeated according to its count. the traces of a variant are
+        consecutive in the returned list."""
+        return [list(variant.activities) for variant in self.variants
+                for _ in range(variant.count)]
+
+    @staticmethod
+    def create_from_event_log(log: Iterable[Trace]) -> 'VariantLog':
+        """
+        groups the traces of an EventLog (or any iterable of traces) by their
+        sequence of activities. prefer EventLog.compute_variant_log, which
+        uses the integer encoding if the log is a ColumnarEventLog.
+        """
+        variant_log = VariantLog()
+        for trace in log:
+            variant_log.add_trace(trace)
+        return variant_log
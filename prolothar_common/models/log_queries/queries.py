@@ -68,6 +68,11 @@ class TraceContainsSubsequence(Query):
     in the given sequence without other activities in between"""
     def __init__(self, activities: Iterable[str]):
         self.__activities = list(activities)
+        #the jump tables do not depend on the trace
+        self.__char_table = list_utils.make_boyer_moore_char_table(self.__activities)
+        self.__offset_table = list_utils.make_boyer_moore_offset_table(self.__activities)
     def matches_trace(self, trace: Trace) -> bool:
         return list_utils.is_sublist_bm(trace.to_activity_list(),
-                                        self.__activities)
+                                        self.__activities,
+                                        char_table=self.__char_table,
+                                        offset_table=self.__offset_table)
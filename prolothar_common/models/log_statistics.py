@@ -15,15 +15,14 @@
     along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
 '''
 
+import numpy as np
 import pandas as pd
 
 from prolothar_common.experiments.statistics import Statistics
-from prolothar_common.models.eventlog import EventLog
+from prolothar_common.models.eventlog import EventLog, VariantLog
 
 from typing import Union, Iterable, Dict
 
-from collections import Counter, defaultdict
-
 def _mean(x):
     return x.mean()
 
@@ -38,12 +37,16 @@ class TraceStatistics:
     statistics about traces in an eventlog
     """
 
-    def __init__(self, log: EventLog):
-        self.nr_of_traces = len(log)
-        self.nr_of_variants = len(set(tuple(trace.to_activity_list()) for trace in log))
-        trace_length_statistics = Statistics(len(trace) for trace in log)
+    def __init__(self, log: Union[EventLog, VariantLog]):
+        if not isinstance(log, VariantLog):
+            log = log.compute_variant_log()
+        self.nr_of_traces = log.get_nr_of_traces()
+        self.nr_of_variants = log.get_nr_of_variants()
+        trace_length_statistics = Statistics.from_array(np.fromiter(
+            (len(variant) for variant in log), dtype=np.float64,
+            count=log.get_nr_of_variants()))
         self.min_trace_length = int(trace_length_statistics.minimum())
-        self.average_trace_length = trace_length_statistics.mean()
+        self.average_trace_length = log.count_nr_of_events() / self.nr_of_traces
         self.max_trace_length = int(trace_length_statistics.maximum())
 
 class LogStatistics():
@@ -122,12 +125,9 @@ class LogStatistics():
 
     def __compute_start_end_activity_statistics(
             self, activity_statistics: pd.DataFrame) -> pd.DataFrame:
-        start_counter = Counter()
-        end_counter = Counter()
-
-        for trace in self.log.traces:
-            start_counter[trace.events[0].activity_name] += 1
-            end_counter[trace.events[-1].activity_name] += 1
+        variant_log = self.log.compute_variant_log()
+        start_counter = variant_log.compute_start_activity_counts()
+        end_counter = variant_log.compute_end_activity_counts()
 
         activity_statistics['P(a|start)'] = [
                 start_counter[activity] / self.log.get_nr_of_traces()
@@ -160,11 +160,9 @@ class LogStatistics():
         pd.DataFrame
             a dataframe with two columns: Variant (list of activities) | Count
         """
-        variant_counter = defaultdict(int)
-        for trace in self.log:
-            variant_counter[tuple(trace.to_activity_list())] += 1
         return pd.DataFrame([
-            [', '.join(variant), count] for variant, count in variant_counter.items()
+            [', '.join(variant.activities), variant.count]
+            for variant in self.log.compute_variant_log()
         ], columns=['Variant', 'Count']).set_index('Variant')
 
     def compute_trace_statistics(self) -> TraceStatistics:
@@ -116,22 +116,21 @@ def find_super_maximal_repeats(sequence: Sequence, min_length=1):
 def filter_super_maximal_repeats(maximal_repeats):
     maximal_repeats.sort(key = lambda repeat: len(repeat))
 
-    super_maximal_repeats = []
-
+    #a repeat is not super maximal if it occurs in a repeat that comes later
+    #in the sorted list. the occurences of all repeats in all repeats are
+    #found by scanning each repeat once with a multi pattern search
+    searcher = list_utils.MultiSublistSearcher(maximal_repeats)
+    is_super_maximal_repeat = [True] * len(maximal_repeats)
     for i,maximal_repeat in enumerate(maximal_repeats):
-        is_super_maximal_repeat = True
-        char_table = list_utils.make_boyer_moore_char_table(maximal_repeat)
-        offset_table = list_utils.make_boyer_moore_offset_table(maximal_repeat)
-        for other_maximal_repeat in maximal_repeats[i+1:]:
-            if list_utils.is_sublist_bm(other_maximal_repeat, maximal_repeat,
-                                        char_table=char_table,
-                                        offset_table=offset_table):
-                is_super_maximal_repeat = False
-                break
-        if is_super_maximal_repeat:
-            super_maximal_repeats.append(maximal_repeat)
-
-    return super_maximal_repeats
+        for j,_ in searcher.iter_occurences(maximal_repeat):
+            if j < i:
+                is_super_maximal_repeat[j] = False
+
+    return [
+        maximal_repeat for maximal_repeat, is_super_maximal
+        in zip(maximal_repeats, is_super_maximal_repeat)
+        if is_super_maximal
+    ]
 
 def find_near_super_maximal_repeats(sequence: Sequence, min_length=1,
                                     return_super_maximal_repeats=False):
@@ -143,14 +142,19 @@ def find_near_super_maximal_repeats(sequence: Sequence, min_length=1,
 
     super_maximal_repeats = set(filter_super_maximal_repeats(maximal_repeats))
 
+    occurences = dict(zip(
+        maximal_repeats,
+        list_utils.MultiSublistSearcher(maximal_repeats).search_all_occurences(sequence)))
+
     super_maximal_sequence_mask = _build_super_maximal_sequence_mask(
-            sequence, super_maximal_repeats)
+            sequence, super_maximal_repeats, occurences=occurences)
 
     near_super_maximal_repeats = []
     for maximal_repeat in maximal_repeats:
         if (maximal_repeat not in super_maximal_repeats and
             _does_not_overlap_super_maximal_repeat_at_least_once(
-                    sequence, maximal_repeat, super_maximal_sequence_mask)):
+                    sequence, maximal_repeat, super_maximal_sequence_mask,
+                    occurences=occurences[maximal_repeat])):
                 near_super_maximal_repeats.append(maximal_repeat)
     # all super maximal repeats are also near super maximal repeats
     near_super_maximal_repeats.extend(super_maximal_repeats)
@@ -161,13 +165,22 @@ def find_near_super_maximal_repeats(sequence: Sequence, min_length=1,
     else:
         return near_super_maximal_repeats
 
-def _build_super_maximal_sequence_mask(sequence, super_maximal_repeats):
-    """marks all indices in sequence that are part of a super maximal repeat
+def _build_super_maximal_sequence_mask(sequence, super_maximal_repeats,
+                                       occurences=None):
+    """marks all indices in sequence that are part of a super maximal repeat.
+    occurences can map each super maximal repeat to its precomputed
+    start indices in sequence
     """
+    super_maximal_repeats = list(super_maximal_repeats)
+    if occurences is None:
+        occurences_per_repeat = list_utils.MultiSublistSearcher(
+            super_maximal_repeats).search_all_occurences(sequence)
+    else:
+        occurences_per_repeat = [occurences[repeat] for repeat in super_maximal_repeats]
     super_maximal_sequence_mask = [False] * len(sequence)
-    for super_maximal_repeat in super_maximal_repeats:
-        for occurence in list_utils.search_sublist_all_occurences(
-                        sequence, super_maximal_repeat):
+    for super_maximal_repeat, occurences_of_repeat in zip(
+            super_maximal_repeats, occurences_per_repeat):
+        for occurence in occurences_of_repeat:
             for i in range(occurence,occurence + len(super_maximal_repeat)):
                 super_maximal_sequence_mask[i] = True
     return super_maximal_sequence_mask
@@ -182,9 +195,10 @@ def _no_super_maximal_sequence_in_range(start_index, end_index,
     return result
 
 def _does_not_overlap_super_maximal_repeat_at_least_once(
-        sequence, maximal_repeat, super_maximal_sequence_mask):
-    occurences = list_utils.search_sublist_all_occurences(sequence,
-                                                          maximal_repeat)
+        sequence, maximal_repeat, super_maximal_sequence_mask, occurences=None):
+    if occurences is None:
+        occurences = list_utils.search_sublist_all_occurences(sequence,
+                                                              maximal_repeat)
     for occurence in occurences:
         if _no_super_maximal_sequence_in_range(
                 occurence, occurence + len(maximal_repeat),
@@ -276,10 +290,12 @@ def create_tandem_arrays_from_repeat_types(
     """
     tandem_arrays = []
 
-    for repeat_type in repeat_types:
-        for tandem_array in create_tandem_arrays_from_repeat_type(
-                repeat_type, sequence):
-            tandem_arrays.append(tandem_array)
+    repeat_types = list(repeat_types)
+    occurences_per_repeat_type = list_utils.MultiSublistSearcher(
+        repeat_types).search_all_occurences(sequence)
+    for repeat_type, occurences in zip(repeat_types, occurences_per_repeat_type):
+        tandem_arrays.extend(_create_tandem_arrays_from_occurences(
+            repeat_type, occurences))
 
     tandem_arrays.sort(key = lambda tandem_array: (
             tandem_array[0], len(tandem_array[1])))
@@ -300,10 +316,12 @@ def create_tandem_arrays_from_repeat_type(
         a list of triples = tandem arrays with k >= 1. This definition
         deviates from the usual requirement of k >= 2 !!!
     """
-    tandem_arrays = []
+    return _create_tandem_arrays_from_occurences(
+        repeat_type, list_utils.search_sublist_all_occurences(sequence, repeat_type))
 
-    occurences_of_repeat_type = list_utils.search_sublist_all_occurences(
-            sequence, repeat_type)
+def _create_tandem_arrays_from_occurences(
+        repeat_type: Sequence, occurences_of_repeat_type: List[int]):
+    tandem_arrays = []
 
     length_of_repeat_type = len(repeat_type)
 
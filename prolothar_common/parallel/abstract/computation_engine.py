@@ -29,3 +29,13 @@ class ComputationEngine(ABC):
     def create_partitionable_list(self, l: List) -> PartitionableList:
         """create a list that can be processed with a parallel operation"""
         pass
+
+    def shutdown(self):
+        """releases resources of the engine, e.g. worker processes.
+        does nothing by default"""
+
+    def __enter__(self) -> 'ComputationEngine':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
@@ -19,14 +19,25 @@ from typing import List
 
 from prolothar_common.parallel.abstract.computation_engine import ComputationEngine
 from prolothar_common.parallel.multiprocess.partitionable.multiprocess_partitionable_list import MultiprocessPartitionableList
+from prolothar_common.parallel.multiprocess.worker_pool import WorkerPool
+from prolothar_common.parallel.multiprocess.shared_parameter import DEFAULT_MIN_SHARED_BUFFER_SIZE
 
 import psutil
 
 class MultiprocessComputationEngine(ComputationEngine):
     """computation engine that distributes computations across the local CPU
-    using the multiprocess library"""
+    using the multiprocess library.
 
-    def __init__(self, nr_of_workers: int = max(2,psutil.cpu_count()), show_progressbar: bool = False):
+    the engine owns a pool of long-lived worker processes, which is started
+    by the first operation and reused by all lists created by this engine.
+    the parameter of an operation is only sent to the workers if it is not
+    the same object as in the previous operation. call "shutdown" (or use the
+    engine as context manager) to stop the workers.
+    """
+
+    def __init__(self, nr_of_workers: int = max(2,psutil.cpu_count()), show_progressbar: bool = False,
+                 chunk_size: int = None,
+                 min_shared_buffer_size: int = DEFAULT_MIN_SHARED_BUFFER_SIZE):
         """creates a new MultiprocessComputationEngine
 
         Args:
@@ -38,11 +49,43 @@ class MultiprocessComputationEngine(ComputationEngine):
                 default is False.
                 shows progressbars if available. not all functions of
                 partitionable list have an implemented progress bar.
+            chunk_size:
+                default is None, i.e. the chunk size is adapted to the
+                runtime of the map function. otherwise, the fixed number of
+                elements whose results are sent from a worker to the parent
+                process in one message. small chunks give a fine-grained
+                progressbar, large chunks reduce the communication overhead
+                for cheap map functions. must be greater 0
+            min_shared_buffer_size:
+                default is DEFAULT_MIN_SHARED_BUFFER_SIZE. NumPy arrays (and
+                other out-of-band pickle buffers) of the parameter with at
+                least this number of bytes are stored once in shared memory
+                instead of being copied to every worker. the workers see
+                these arrays as read-only. None disables shared memory.
         """
         if nr_of_workers <= 0:
             raise ValueError('nr_of_workers must not be <= 0')
         self.__nr_of_workers = nr_of_workers
         self.__show_progressbar = show_progressbar
+        self.__chunk_size = chunk_size
+        self.__worker_pool = WorkerPool(
+            nr_of_workers, chunk_size=chunk_size,
+            min_shared_buffer_size=min_shared_buffer_size)
 
     def create_partitionable_list(self, l: List) -> MultiprocessPartitionableList:
-        return MultiprocessPartitionableList(l, self.__nr_of_workers, show_progressbar=self.__show_progressbar)
+        return MultiprocessPartitionableList(
+            l, self.__nr_of_workers, show_progressbar=self.__show_progressbar,
+            worker_pool=self.__worker_pool, chunk_size=self.__chunk_size)
+
+    def invalidate_parameter(self):
+        """
+        forces the engine to send the parameter of the next operation to the
+        workers, even if it is the same object as in the previous operation.
+        call this method if the parameter has been changed in place.
+        """
+        self.__worker_pool.invalidate_parameter()
+
+    def shutdown(self):
+        """stops the worker processes. a subsequent operation starts new
+        workers."""
+        self.__worker_pool.shutdown()
@@ -23,6 +23,9 @@ from tqdm import tqdm
 from prolothar_common.parallel.abstract.partitionable.partitionable_list import PartitionableList
 from prolothar_common.parallel.abstract.partitionable.partitionable_list import P,E,R
 from prolothar_common.collections import list_utils
+from prolothar_common.parallel.multiprocess.worker_pool import WorkerPool
+from prolothar_common.parallel.multiprocess.worker_pool import ResultChunker
+from prolothar_common.parallel.multiprocess.worker_pool import MAP, MAP_FILTER, MAP_REDUCE
 
 from multiprocessing import Process, Queue
 
@@ -31,13 +34,46 @@ from functools import reduce
 class MultiprocessPartitionableList(PartitionableList):
     """partitionable list implementation for the multiprocess module"""
 
-    def __init__(self, l: List, nr_of_workers: int, show_progressbar: bool = False):
+    def __init__(self, l: List, nr_of_workers: int, show_progressbar: bool = False,
+                 worker_pool: WorkerPool = None, chunk_size: int = None):
+        """
+        creates a new list
+
+        Args:
+            l:
+                the elements of the list
+            nr_of_workers:
+                number of processes that are started for each operation if
+                there is no worker_pool
+            show_progressbar:
+                default is False. shows progressbars if available.
+            worker_pool:
+                default is None. if set, operations are executed by the
+                long-lived workers of the pool. operations whose functions or
+                parameter cannot be pickled (e.g. lambda functions) still
+                start new processes.
+            chunk_size:
+                default is None, i.e. adaptive. the number of elements whose
+                results are sent from a new process to the parent in one
+                message. see ResultChunker. the workers of worker_pool use
+                the chunk size of the pool.
+        """
         super().__init__(l)
         self.__nr_of_workers = nr_of_workers
         self.__show_progressbar = show_progressbar
+        self.__worker_pool = worker_pool
+        self.__chunk_size = chunk_size
+
+    def __can_use_worker_pool(self, parameter: P, *functions: Callable) -> bool:
+        return (self.__worker_pool is not None
+                and self.__worker_pool.can_execute(parameter, *functions))
 
     def map(self, parameter: P, map_function: Callable[[P,E],R],
             keep_order: bool = True) -> List[R]:
+        if self.__can_use_worker_pool(parameter, map_function):
+            return self.__worker_pool.execute(
+                MAP, self._list, parameter, map_function,
+                show_progressbar=self.__show_progressbar)
         if keep_order:
             return self.__map_with_order_guarantee(parameter, map_function)
         else:
@@ -50,7 +86,8 @@ class MultiprocessPartitionableList(PartitionableList):
         workers = []
         for partition in list_utils.view_of_n_partitions(
                 self._list, self.__nr_of_workers):
-            worker = MapWorker(partition, parameter, map_function, result_queue)
+            worker = MapWorker(partition, parameter, map_function, result_queue,
+                               chunk_size=self.__chunk_size)
             worker.start()
             workers.append(worker)
 
@@ -61,7 +98,8 @@ class MultiprocessPartitionableList(PartitionableList):
         workers = []
         for partition in list_utils.view_of_n_partitions(
                 self._list, self.__nr_of_workers):
-            worker = MapWorker(partition, parameter, map_function, Queue())
+            worker = MapWorker(partition, parameter, map_function, Queue(),
+                               chunk_size=self.__chunk_size)
             worker.start()
             workers.append(worker)
 
@@ -69,20 +107,29 @@ class MultiprocessPartitionableList(PartitionableList):
 
     def map_filter(self, parameter: P, map_function: Callable[[P,E],R],
                    filter_function: Callable[[P,R],bool]) -> List[R]:
-        result_queue = Queue()
-
+        if self.__can_use_worker_pool(parameter, map_function, filter_function):
+            return self.__worker_pool.execute(
+                MAP_FILTER, self._list, parameter, map_function, filter_function,
+                show_progressbar=self.__show_progressbar)
         workers = []
         for partition in list_utils.view_of_n_partitions(
                 self._list, self.__nr_of_workers):
+            #one queue per worker such that the order of the list is kept
+            #like in the worker pool
             worker = MapFilterWorker(partition, parameter, map_function,
-                                     filter_function, result_queue)
+                                     filter_function, Queue(),
+                                     chunk_size=self.__chunk_size)
             worker.start()
             workers.append(worker)
 
-        return self.__collect_worker_results(workers, result_queue)
+        return self.__collect_worker_results_with_order_guarantee(workers)
 
     def map_reduce(self, parameter: P, map_function: Callable[[P,E],R],
                    reduce_function: Callable[[R,R],R]) -> R:
+        if self.__can_use_worker_pool(parameter, map_function, reduce_function):
+            return reduce(reduce_function, self.__worker_pool.execute(
+                MAP_REDUCE, self._list, parameter, map_function, reduce_function,
+                show_progressbar=self.__show_progressbar))
         result_queue = Queue()
 
         workers = []
@@ -110,8 +157,9 @@ class MultiprocessPartitionableList(PartitionableList):
                     [worker.terminate() for worker in workers]
                     raise result
                 else:
-                    mapped_list.append(result)
-                    progressbar.update(1)
+                    _, nr_of_processed_elements, results = result
+                    mapped_list.extend(results)
+                    progressbar.update(nr_of_processed_elements)
 
         [worker.join() for worker in workers]
         return mapped_list
@@ -129,9 +177,10 @@ class MultiprocessPartitionableList(PartitionableList):
                     if isinstance(result, Exception):
                         [worker.terminate() for worker in workers]
                         raise result
-                    mapped_list_dict[id(current_worker)].append(result)
+                    _, nr_of_processed_elements, results = result
+                    mapped_list_dict[id(current_worker)].extend(results)
                     open_workers.appendleft(current_worker)
-                    progressbar.update(1)
+                    progressbar.update(nr_of_processed_elements)
 
         [worker.join() for worker in workers]
 
@@ -143,40 +192,51 @@ class MultiprocessPartitionableList(PartitionableList):
 class MapWorker(Process):
 
     def __init__(self, l: List, parameter: P, map_function: Callable[[P,E],R],
-                 result_queue: Queue):
+                 result_queue: Queue, chunk_size: int = None):
         super().__init__()
         self.list = l
         self.parameter = parameter
         self.map_function = map_function
         self.result_queue = result_queue
+        self.chunk_size = chunk_size
 
     def run(self):
+        chunker = ResultChunker(self.result_queue.put, chunk_size=self.chunk_size)
         for element in self.list:
             try:
-                self.result_queue.put(self.map_function(self.parameter, element))
+                chunker.add_result(self.map_function(self.parameter, element))
             except Exception as e:
+                chunker.flush()
                 self.result_queue.put(e)
+        chunker.flush()
         self.result_queue.put(StopIteration())
 
 class MapFilterWorker(Process):
 
     def __init__(self, l: List, parameter: P, map_function: Callable[[P,E],R],
-                 filter_function: Callable[[P,R],bool], result_queue: Queue):
+                 filter_function: Callable[[P,R],bool], result_queue: Queue,
+                 chunk_size: int = None):
         super().__init__()
         self.list = l
         self.parameter = parameter
         self.map_function = map_function
         self.filter_function = filter_function
         self.result_queue = result_queue
+        self.chunk_size = chunk_size
 
     def run(self):
+        chunker = ResultChunker(self.result_queue.put, chunk_size=self.chunk_size)
         for element in self.list:
             try:
                 mapped_element = self.map_function(self.parameter, element)
                 if self.filter_function(self.parameter, mapped_element):
-                    self.result_queue.put(mapped_element)
+                    chunker.add_result(mapped_element)
+                else:
+                    chunker.skip_element()
             except Exception as e:
+                chunker.flush()
                 self.result_queue.put(e)
+        chunker.flush()
         self.result_queue.put(StopIteration())
 
 class MapReduceWorker(Process):
@@ -192,10 +252,10 @@ class MapReduceWorker(Process):
 
     def run(self):
         try:
-            self.result_queue.put(reduce(
+            self.result_queue.put((0, len(self.list), [reduce(
                 self.reduce_function,
                 (self.map_function(self.parameter, element)
-                 for element in self.list)))
+                 for element in self.list))]))
         except Exception as e:
             self.result_queue.put(e)
         self.result_queue.put(StopIteration())
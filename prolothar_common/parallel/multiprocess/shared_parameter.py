@@ -0,0 +1,163 @@
+'''
+    This file is part of Prolothar-Common (More Info: https://github.com/shs-it/prolothar-common).
+
+    Prolothar-Common is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Prolothar-Common is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
+'''
+
+from typing import List, Tuple
+from multiprocessing.shared_memory import SharedMemory
+import pickle
+import weakref
+
+#buffers smaller than this number of bytes are copied into the pickle stream
+DEFAULT_MIN_SHARED_BUFFER_SIZE = 1 << 16
+
+#offsets of the buffers in the shared memory are multiples of this alignment
+_BUFFER_ALIGNMENT = 64
+
+#attachments that could not be closed, because views on them are still alive.
+#they are kept until the process exits instead of being closed at garbage
+#collection, which would fail, too.
+_unreleased_shared_memory: List[SharedMemory] = []
+
+class SharedParameter():
+    """
+    the parameter of an operation in a form that can be sent to many worker
+    processes. the parameter is pickled once with protocol 5. large
+    out-of-band buffers, e.g. the data of NumPy arrays, are not part of the
+    pickle stream but are copied once into a single shared memory block.
+    the workers attach to this block and the unpickled arrays are read-only
+    views on it, i.e. all workers share one copy of the data.
+
+    other objects than buffers (e.g. Trace objects of an EventLog) are still
+    part of the pickle stream and each worker unpickles its own copy of them.
+
+    the process that creates a SharedParameter owns the shared memory and
+    must call "unlink" if the parameter is not used anymore. otherwise, the
+    shared memory is unlinked when the SharedParameter is garbage collected.
+    """
+
+    def __init__(self, parameter, min_shared_buffer_size: int = DEFAULT_MIN_SHARED_BUFFER_SIZE):
+        """
+        pickles the parameter and copies its large buffers into shared memory
+
+        Args:
+            parameter:
+                the parameter that is sent to the workers
+            min_shared_buffer_size:
+                default is DEFAULT_MIN_SHARED_BUFFER_SIZE. buffers with fewer
+                bytes are part of the pickle stream. if None, all buffers are
+                part of the pickle stream, i.e. no shared memory is used.
+        """
+        buffers = []
+        def buffer_callback(buffer: pickle.PickleBuffer) -> bool:
+            if min_shared_buffer_size is None or \
+            buffer.raw().nbytes < min_shared_buffer_size:
+                return True
+            buffers.append(buffer)
+            return False
+        self.__pickled_parameter = pickle.dumps(
+            parameter, protocol=5, buffer_callback=buffer_callback)
+        self.__buffer_ranges: List[Tuple[int,int]] = []
+        self.__shared_memory = None
+        self.__shared_memory_name = None
+        self.__finalizer = None
+        if buffers:
+            try:
+                self.__copy_to_shared_memory(buffers)
+            except OSError:
+                #e.g. no shared memory available on this system
+                self.__pickled_parameter = pickle.dumps(parameter, protocol=5)
+                self.__buffer_ranges = []
+
+    def __copy_to_shared_memory(self, buffers: List[pickle.PickleBuffer]):
+        offset = 0
+        for buffer in buffers:
+            nr_of_bytes = buffer.raw().nbytes
+            self.__buffer_ranges.append((offset, nr_of_bytes))
+            offset += -(-nr_of_bytes // _BUFFER_ALIGNMENT) * _BUFFER_ALIGNMENT
+        self.__shared_memory = SharedMemory(create=True, size=offset)
+        self.__shared_memory_name = self.__shared_memory.name
+        self.__finalizer = weakref.finalize(
+            self, _unlink_shared_memory, self.__shared_memory)
+        for buffer, (offset, nr_of_bytes) in zip(buffers, self.__buffer_ranges):
+            self.__shared_memory.buf[offset:offset + nr_of_bytes] = buffer.raw()
+
+    def __getstate__(self):
+        #the receiving process attaches to the shared memory by its name
+        return (self.__pickled_parameter, self.__buffer_ranges,
+                self.__shared_memory_name)
+
+    def __setstate__(self, state):
+        self.__pickled_parameter, self.__buffer_ranges, \
+        self.__shared_memory_name = state
+        self.__shared_memory = None
+        self.__finalizer = None
+
+    def get_nr_of_shared_bytes(self) -> int:
+        """returns the number of bytes of the parameter in shared memory"""
+        return sum(nr_of_bytes for _, nr_of_bytes in self.__buffer_ranges)
+
+    def get_nr_of_pickled_bytes(self) -> int:
+        """returns the number of bytes of the pickle stream, i.e. the data
+        that is copied to each worker"""
+        return len(self.__pickled_parameter)
+
+    def load(self):
+        """
+        unpickles the parameter. if the parameter has buffers in shared
+        memory, this process attaches to the shared memory until "release"
+        is called.
+
+        Raises:
+            FileNotFoundError:
+                if the owner has already unlinked the shared memory
+        """
+        if self.__shared_memory_name is None:
+            return pickle.loads(self.__pickled_parameter)
+        if self.__shared_memory is None:
+            self.__shared_memory = SharedMemory(name=self.__shared_memory_name)
+        return pickle.loads(self.__pickled_parameter, buffers=[
+            self.__shared_memory.buf[offset:offset + nr_of_bytes].toreadonly()
+            for offset, nr_of_bytes in self.__buffer_ranges
+        ])
+
+    def release(self):
+        """
+        detaches this process from the shared memory. all references to the
+        loaded parameter should be dropped before, because its arrays are
+        views on the shared memory.
+        """
+        if self.__shared_memory is None or self.__finalizer is not None:
+            return
+        try:
+            self.__shared_memory.close()
+        except BufferError:
+            _unreleased_shared_memory.append(self.__shared_memory)
+        self.__shared_memory = None
+
+    def unlink(self):
+        """frees the shared memory. must only be called by the process that
+        created this SharedParameter. processes that are attached to the
+        shared memory can still use it, but new processes cannot attach."""
+        if self.__finalizer is not None:
+            self.__finalizer()
+
+def _unlink_shared_memory(shared_memory: SharedMemory):
+    try:
+        shared_memory.close()
+    except BufferError:
+        #the creating process has views on the memory, e.g. by "load"
+        _unreleased_shared_memory.append(shared_memory)
+    shared_memory.unlink()
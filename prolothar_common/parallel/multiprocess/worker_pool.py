@@ -0,0 +1,418 @@
+'''
+    This file is part of Prolothar-Common (More Info: https://github.com/shs-it/prolothar-common).
+
+    Prolothar-Common is free software: you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation, either version 3 of the License, or
+    (at your option) any later version.
+
+    Prolothar-Common is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License
+    along with Prolothar-Common. If not, see <https://www.gnu.org/licenses/>.
+'''
+
+from typing import List, Callable
+from functools import reduce
+from itertools import count
+from multiprocessing import Process, Queue
+from queue import Empty
+import atexit
+import pickle
+import time
+import weakref
+
+from tqdm import tqdm
+
+from prolothar_common.parallel.abstract.partitionable.partitionable_list import P,E,R
+from prolothar_common.collections import list_utils
+from prolothar_common.parallel.multiprocess.shared_parameter import SharedParameter
+from prolothar_common.parallel.multiprocess.shared_parameter import DEFAULT_MIN_SHARED_BUFFER_SIZE
+
+#kinds of jobs
+MAP = 'map'
+MAP_FILTER = 'map_filter'
+MAP_REDUCE = 'map_reduce'
+
+#kinds of messages
+_PARAMETER = 'parameter'
+_JOB = 'job'
+_RESULT = 'result'
+_ERROR = 'error'
+_DONE = 'done'
+
+#seconds between two checks whether all workers are still alive
+_LIVENESS_CHECK_INTERVAL = 1.0
+
+#adaptive chunks are sized such that computing a chunk takes about this
+#many seconds
+TARGET_CHUNK_DURATION = 0.05
+INITIAL_CHUNK_SIZE = 16
+MAX_CHUNK_SIZE = 100_000
+
+class ResultChunker():
+    """
+    collects the results of a worker and sends them in chunks, i.e. one
+    message per chunk instead of one message per element. a chunk is a
+    triple (chunk index, number of processed elements, list of results).
+    the number of processed elements can be larger than the number of
+    results, e.g. if results are filtered.
+    """
+
+    def __init__(self, send_chunk: Callable[[tuple], None], chunk_size: int = None):
+        """
+        Args:
+            send_chunk:
+                sends a chunk to the parent process
+            chunk_size:
+                default is None, i.e. the chunk size is adapted to the measured
+                time per element such that a chunk takes about
+                TARGET_CHUNK_DURATION seconds. otherwise, the fixed number of
+                processed elements per chunk.
+        """
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError('chunk_size must not be <= 0')
+        self.__send_chunk = send_chunk
+        self.__is_adaptive = chunk_size is None
+        self.__chunk_size = INITIAL_CHUNK_SIZE if chunk_size is None else chunk_size
+        self.__chunk_index = 0
+        self.__results = []
+        self.__nr_of_processed_elements = 0
+        self.__start_time = time.perf_counter()
+
+    def add_result(self, result):
+        """adds the result of a processed element"""
+        self.__results.append(result)
+        self.skip_element()
+
+    def skip_element(self):
+        """counts a processed element without result"""
+        self.__nr_of_processed_elements += 1
+        if self.__nr_of_processed_elements >= self.__chunk_size:
+            self.flush()
+
+    def flush(self):
+        """sends the current chunk if it is not empty"""
+        if self.__nr_of_processed_elements == 0:
+            return
+        self.__send_chunk((self.__chunk_index, self.__nr_of_processed_elements,
+                           self.__results))
+        if self.__is_adaptive:
+            time_per_element = (time.perf_counter() - self.__start_time) \
+                / self.__nr_of_processed_elements
+            self.__chunk_size = max(1, min(MAX_CHUNK_SIZE, int(
+                TARGET_CHUNK_DURATION / max(time_per_element, 1e-9))))
+        self.__chunk_index += 1
+        self.__results = []
+        self.__nr_of_processed_elements = 0
+        self.__start_time = time.perf_counter()
+
+class WorkerPool():
+    """
+    long-lived worker processes for MultiprocessPartitionableList. in
+    contrast to starting new processes for every operation, the workers are
+    reused across operations and the parameter of an operation is only sent
+    to the workers if it is not the same object (by identity) as the
+    parameter of the previous operation.
+
+    the parameter is broadcast as SharedParameter, i.e. large NumPy arrays
+    (e.g. the columns of a ColumnarEventLog) are stored once in shared memory
+    instead of once per worker. the workers see these arrays as read-only.
+
+    the workers are started on the first operation and run until "shutdown"
+    is called. afterwards, the next operation starts new workers. the workers
+    are no daemons, i.e. map functions can start processes themselves. they
+    are also stopped if the pool is garbage collected or the interpreter
+    exits.
+    """
+
+    def __init__(self, nr_of_workers: int, chunk_size: int = None,
+                 min_shared_buffer_size: int = DEFAULT_MIN_SHARED_BUFFER_SIZE):
+        """
+        creates a new pool without starting the workers
+
+        Args:
+            nr_of_workers:
+                the number of worker processes. must be greater 0
+            chunk_size:
+                default is None, i.e. adaptive. the number of elements whose
+                results are sent from a worker to the parent in one message.
+                see ResultChunker.
+            min_shared_buffer_size:
+                default is DEFAULT_MIN_SHARED_BUFFER_SIZE. buffers of the
+                parameter with at least this number of bytes are shared
+                between the workers. None disables shared memory.
+                see SharedParameter.
+        """
+        if nr_of_workers <= 0:
+            raise ValueError('nr_of_workers must not be <= 0')
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError('chunk_size must not be <= 0')
+        self.__nr_of_workers = nr_of_workers
+        self.__chunk_size = chunk_size
+        self.__min_shared_buffer_size = min_shared_buffer_size
+        self.__workers: List[Process] = []
+        self.__task_queues: List[Queue] = []
+        self.__result_queue = None
+        self.__job_ids = count()
+        self.__parameter_versions = count()
+        self.__parameter_version = None
+        #a strong reference prevents that the id of the parameter is reused
+        self.__parameter = None
+        #the SharedParameter that the workers currently use
+        self.__shared_parameter: SharedParameter = None
+        #(parameter, SharedParameter) computed by can_execute
+        self.__prepared_parameter = None
+        #stops the workers without a reference to the pool
+        self.__finalizer: weakref.finalize = None
+
+    def get_nr_of_workers(self) -> int:
+        return self.__nr_of_workers
+
+    def is_running(self) -> bool:
+        return bool(self.__workers)
+
+    def start(self):
+        """starts the workers if they are not running"""
+        if self.is_running():
+            return
+        self.__result_queue = Queue()
+        for worker_index in range(self.__nr_of_workers):
+            task_queue = Queue()
+            worker = Process(target=_run_worker,
+                             args=(worker_index, task_queue, self.__result_queue))
+            worker.start()
+            self.__task_queues.append(task_queue)
+            self.__workers.append(worker)
+        self.__finalizer = weakref.finalize(
+            self, _stop_workers, self.__workers, self.__task_queues,
+            self.__result_queue)
+        _running_pool_finalizers.add(self.__finalizer)
+
+    def shutdown(self):
+        """stops all workers and waits until they have finished their
+        current operation"""
+        if self.__finalizer is not None:
+            _running_pool_finalizers.discard(self.__finalizer)
+            self.__finalizer()
+            self.__finalizer = None
+        self.__workers = []
+        self.__task_queues = []
+        self.__result_queue = None
+        self.invalidate_parameter()
+        self.__unlink_shared_parameters()
+
+    def invalidate_parameter(self):
+        """
+        forces the pool to send the parameter of the next operation to the
+        workers, even if it is the same object as in the previous operation.
+        call this method if the parameter has been changed in place.
+        """
+        self.__parameter_version = None
+        self.__parameter = None
+
+    def can_execute(self, parameter: P, *functions: Callable) -> bool:
+        """
+        returns True iff the functions and the parameter can be sent to the
+        workers. otherwise, e.g. for lambda functions, the operation must be
+        executed by processes that inherit the functions by forking.
+        """
+        try:
+            pickle.dumps(functions)
+            if not self.__is_parameter_cached(parameter):
+                #keep the result for the broadcast of the parameter
+                self.__prepare_parameter(parameter)
+            return True
+        except Exception:
+            return False
+
+    def execute(self, kind: str, l: List[E], parameter: P,
+                map_function: Callable[[P,E],R], second_function: Callable = None,
+                show_progressbar: bool = False) -> List:
+        """
+        executes an operation on the workers. the list is split into one
+        partition per worker.
+
+        Args:
+            kind:
+                MAP, MAP_FILTER or MAP_REDUCE
+            l:
+                the list whose elements are mapped
+            parameter:
+                the parameter of map_function (and second_function)
+            map_function:
+                maps a parameter and an element of the list to a result
+            second_function:
+                the filter function (MAP_FILTER) or the reduce function
+                (MAP_REDUCE)
+            show_progressbar:
+                whether to show a progressbar of the processed elements
+
+        Returns:
+            the mapped (and filtered) elements in the order of l.
+            for MAP_REDUCE, the reduced result of each non-empty partition.
+        """
+        if not l:
+            return []
+        self.start()
+        self.__broadcast_parameter(parameter)
+        job_id = next(self.__job_ids)
+        partitions = list_utils.view_of_n_partitions(l, self.__nr_of_workers)
+        for worker_index, partition in enumerate(partitions):
+            self.__task_queues[worker_index].put((
+                _JOB, job_id, kind, map_function, second_function, partition,
+                self.__chunk_size))
+        return self.__collect_results(job_id, len(partitions), len(l), show_progressbar)
+
+    def __is_parameter_cached(self, parameter: P) -> bool:
+        return parameter is self.__parameter and self.__parameter_version is not None
+
+    def __prepare_parameter(self, parameter: P) -> SharedParameter:
+        if self.__prepared_parameter is not None:
+            if self.__prepared_parameter[0] is parameter:
+                return self.__prepared_parameter[1]
+            self.__prepared_parameter[1].unlink()
+        shared_parameter = SharedParameter(parameter, self.__min_shared_buffer_size)
+        self.__prepared_parameter = (parameter, shared_parameter)
+        return shared_parameter
+
+    def __broadcast_parameter(self, parameter: P):
+        if self.__is_parameter_cached(parameter):
+            return
+        #pickle only once instead of once per worker
+        shared_parameter = self.__prepare_parameter(parameter)
+        self.__prepared_parameter = None
+        #a worker loads the previous parameter before it runs the previous
+        #job, i.e. no worker attaches to the old shared memory anymore
+        #(except after errors, see _run_worker)
+        if self.__shared_parameter is not None:
+            self.__shared_parameter.unlink()
+        self.__shared_parameter = shared_parameter
+        self.__parameter_version = next(self.__parameter_versions)
+        self.__parameter = parameter
+        for task_queue in self.__task_queues:
+            task_queue.put((_PARAMETER, self.__parameter_version, shared_parameter))
+
+    def __unlink_shared_parameters(self):
+        if self.__shared_parameter is not None:
+            self.__shared_parameter.unlink()
+            self.__shared_parameter = None
+        if self.__prepared_parameter is not None:
+            self.__prepared_parameter[1].unlink()
+            self.__prepared_parameter = None
+
+    def __collect_results(self, job_id: int, nr_of_partitions: int,
+                          nr_of_elements: int, show_progressbar: bool) -> List:
+        #partition => chunk index => results
+        chunks_per_partition = [{} for _ in range(nr_of_partitions)]
+        nr_of_finished_partitions = 0
+        with tqdm(total=nr_of_elements, disable=not show_progressbar) as progressbar:
+            while nr_of_finished_partitions < nr_of_partitions:
+                message = self.__get_next_message()
+                #messages of an operation that has been aborted by an exception
+                if message[1] != job_id:
+                    continue
+                message_type, _, worker_index, payload = message
+                if message_type == _RESULT:
+                    chunk_index, nr_of_processed_elements, results = payload
+                    chunks_per_partition[worker_index][chunk_index] = results
+                    progressbar.update(nr_of_processed_elements)
+                elif message_type == _ERROR:
+                    raise payload
+                else:
+                    nr_of_finished_partitions += 1
+        return [
+            result for chunks in chunks_per_partition
+            for chunk_index in range(len(chunks)) for result in chunks[chunk_index]
+        ]
+
+    def __get_next_message(self):
+        while True:
+            try:
+                return self.__result_queue.get(timeout=_LIVENESS_CHECK_INTERVAL)
+            except Empty:
+                if not all(worker.is_alive() for worker in self.__workers):
+                    self.__terminate()
+                    raise RuntimeError('a worker process died unexpectedly')
+
+    def __terminate(self):
+        if self.__finalizer is not None:
+            _running_pool_finalizers.discard(self.__finalizer)
+            self.__finalizer.detach()
+            self.__finalizer = None
+        for worker in self.__workers:
+            worker.terminate()
+        self.__workers = []
+        self.__task_queues = []
+        self.__result_queue = None
+        self.invalidate_parameter()
+        self.__unlink_shared_parameters()
+
+def _stop_workers(workers: List[Process], task_queues: List[Queue], result_queue: Queue):
+    for task_queue in task_queues:
+        task_queue.put(None)
+    for worker in workers:
+        worker.join()
+    for queue in task_queues + [result_queue]:
+        queue.close()
+
+#finalizers of pools whose workers are running. registered after the exit
+#handler of multiprocessing, so it runs before multiprocessing joins the
+#(non-daemonic) workers
+_running_pool_finalizers = set()
+
+@atexit.register
+def _stop_all_workers():
+    for finalizer in list(_running_pool_finalizers):
+        finalizer()
+    _running_pool_finalizers.clear()
+
+def _run_worker(worker_index: int, task_queue: Queue, result_queue: Queue):
+    parameter = None
+    shared_parameter = None
+    while True:
+        task = task_queue.get()
+        if task is None or task[0] == _PARAMETER:
+            #the arrays of the old parameter are views on its shared memory
+            parameter = None
+            if shared_parameter is not None:
+                shared_parameter.release()
+        if task is None:
+            #results of an aborted operation may never be read by the parent
+            result_queue.cancel_join_thread()
+            break
+        if task[0] == _PARAMETER:
+            shared_parameter = task[2]
+            try:
+                parameter = shared_parameter.load()
+            except FileNotFoundError:
+                #the parent has already replaced this parameter after an
+                #error, i.e. the results of the following job are ignored
+                pass
+            continue
+        _, job_id, kind, map_function, second_function, partition, chunk_size = task
+        chunker = ResultChunker(
+            lambda chunk: result_queue.put((_RESULT, job_id, worker_index, chunk)),
+            chunk_size=chunk_size)
+        try:
+            if kind == MAP:
+                for element in partition:
+                    chunker.add_result(map_function(parameter, element))
+            elif kind == MAP_FILTER:
+                for element in partition:
+                    mapped_element = map_function(parameter, element)
+                    if second_function(parameter, mapped_element):
+                        chunker.add_result(mapped_element)
+                    else:
+                        chunker.skip_element()
+            else:
+                result_queue.put((_RESULT, job_id, worker_index, (0, len(partition), [reduce(
+                    second_function,
+                    (map_function(parameter, element) for element in partition))])))
+            chunker.flush()
+        except Exception as e:
+            result_queue.put((_ERROR, job_id, worker_index, e))
+        result_queue.put((_DONE, job_id, worker_index, None))
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+import numpy as np
+
+from prolothar_common.clustering.traces.distance_matrix import compute_distance_matrix
+from prolothar_common.clustering.traces.distance_matrix import _compute_row_block
+from prolothar_common.clustering.k_medoid import KMedoid
+from prolothar_common.clustering.fuzzy_k_medoid import FuzzyKMedoid
+from prolothar_common.levenshtein import levenshtein_distance
+from prolothar_common.longest_common_subsequence import length_of_common_subsequence
+from prolothar_common.models.eventlog import EventLog, ColumnarEventLog
+
+class TestDistanceMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self.activity_log = [
+            ['A', 'B', 'C', 'D'], ['A', 'C', 'B', 'D'], ['A', 'B', 'C', 'D'],
+            ['X', 'Y'], ['A', 'B', 'C', 'D', 'D'], ['X', 'Y', 'Y']
+        ]
+
+    def assert_matrix_equal(self, similarity_function, metric: str):
+        expected_matrix = np.array([[similarity_function(a, b) for b in self.activity_log]
+                                    for a in self.activity_log])
+        matrix = compute_distance_matrix(self.activity_log, metric, condensed=False)
+        np.testing.assert_allclose(expected_matrix, matrix)
+        upper_triangle = expected_matrix[np.triu_indices(len(self.activity_log), 1)]
+        for log in [self.activity_log,
+                    EventLog.create_from_simple_activity_log(self.activity_log),
+                    ColumnarEventLog.create_from_simple_activity_log(self.activity_log)]:
+            np.testing.assert_allclose(
+                upper_triangle, compute_distance_matrix(log, metric))
+        np.testing.assert_allclose(upper_triangle, compute_distance_matrix(
+            self.activity_log, metric, nr_of_workers=2))
+
+    def test_levenshtein(self):
+        self.assert_matrix_equal(levenshtein_distance, 'levenshtein')
+
+    def test_lcs_length(self):
+        self.assert_matrix_equal(length_of_common_subsequence, 'lcs_length')
+
+    def test_jaccard(self):
+        self.assert_matrix_equal(
+            lambda a, b: len(set(a) & set(b)) / len(set(a) | set(b)), 'jaccard')
+
+    def test_small_logs(self):
+        self.assertEqual(0, len(compute_distance_matrix([])))
+        self.assertEqual(0, len(compute_distance_matrix([['A']])))
+        np.testing.assert_array_equal(
+            [[0]], compute_distance_matrix([['A']], condensed=False))
+
+    def test_row_block_beyond_int_range(self):
+        #end * (end + 1) - start * (start + 1) does not fit into a C int
+        nr_of_variants = 2_000_000
+        offsets = np.zeros(nr_of_variants + 1, dtype=np.int64)
+        codes = np.empty(0, dtype=np.intc)
+        block = _compute_row_block(
+            codes, offsets, 'levenshtein', nr_of_variants - 600, nr_of_variants)
+        self.assertEqual(600 * 599 // 2, len(block))
+        self.assertEqual(0, block.max())
+
+    def test_unknown_metric(self):
+        with self.assertRaises(ValueError):
+            compute_distance_matrix(self.activity_log, metric='hamming')
+
+    def test_k_medoid_with_precomputed_matrix(self):
+        matrix = compute_distance_matrix(self.activity_log)
+        memberships, medoids = KMedoid(None, random_seed=42).cluster(
+            self.activity_log, number_of_clusters=2, dissimilarity_matrix=matrix)
+        self.assertEqual(memberships[0], memberships[1])
+        self.assertEqual(memberships[3], memberships[5])
+        self.assertNotEqual(memberships[0], memberships[3])
+        with self.assertRaises(ValueError):
+            KMedoid(None).cluster(self.activity_log, number_of_clusters=2)
+        with self.assertRaises(ValueError):
+            KMedoid(None).cluster(self.activity_log[:3], number_of_clusters=2,
+                                  dissimilarity_matrix=matrix)
+
+    def test_fuzzy_k_medoid_with_precomputed_matrix(self):
+        matrix = compute_distance_matrix(self.activity_log)
+        membership_matrix, medoids = FuzzyKMedoid(None, random_seed=42).cluster(
+            self.activity_log, number_of_clusters=2, dissimilarity_matrix=matrix)
+        self.assertEqual(2, len(medoids))
+        np.testing.assert_allclose(np.ones(len(self.activity_log)),
+                                   np.sum(membership_matrix, axis=1))
+
+if __name__ == '__main__':
+    unittest.main()
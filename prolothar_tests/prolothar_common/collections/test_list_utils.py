@@ -3,7 +3,7 @@
 import unittest
 import prolothar_common.collections.list_utils as list_utils
 from hypothesis import given
-from hypothesis.strategies import composite, integers
+from hypothesis.strategies import composite, integers, lists
 
 @composite
 def same_len_lists(draw, min_nr_of_lists, max_nr_of_lists, min_nr_of_elements, max_nr_of_elements):
@@ -66,6 +66,36 @@ class TestListUtils(unittest.TestCase):
         self.assertListEqual([1,3], list_utils.search_sublist_all_occurences(
                 [1,2,3,2], [2]))
 
+    def test_search_sublist_bm_with_start(self):
+        self.assertEqual(3, list_utils.search_sublist_bm([1,2,3,1,2], [1,2], start=1))
+        self.assertEqual(-1, list_utils.search_sublist_bm([1,2,3,1,2], [1,2], start=4))
+        self.assertEqual(2, list_utils.search_sublist_bm([1,2,3], [], start=2))
+        self.assertEqual(-1, list_utils.search_sublist_bm([1,2,3], [], start=4))
+
+    def test_multi_sublist_searcher(self):
+        searcher = list_utils.MultiSublistSearcher([
+            ['a', 'b'], ['b'], ['b', 'c', 'a'], ['x'], ['a', 'b']])
+        self.assertEqual(5, searcher.get_nr_of_sublists())
+        self.assertListEqual(
+            [[0, 3], [1, 4], [1], [], [0, 3]],
+            searcher.search_all_occurences(list('abcab')))
+        self.assertListEqual(
+            [(0, 0), (4, 0), (1, 1), (2, 1), (0, 3), (4, 3), (1, 4)],
+            list(searcher.iter_occurences(list('abcab'))))
+        self.assertTrue(searcher.contains_any(list('zzx')))
+        self.assertFalse(searcher.contains_any(list('zzz')))
+
+    @given(lists(integers(0, 2), max_size=30),
+           lists(lists(integers(0, 2), max_size=4), max_size=5))
+    def test_multi_sublist_searcher_equals_single_search(self, l, sublists):
+        self.assertListEqual(
+            [list_utils.search_sublist_all_occurences(l, sublist) for sublist in sublists],
+            list_utils.MultiSublistSearcher(sublists).search_all_occurences(l))
+        occurences = list(list_utils.MultiSublistSearcher(sublists).iter_occurences(l))
+        self.assertListEqual(sorted(occurences, key=lambda occurence: (
+            occurence[1] + len(sublists[occurence[0]]), occurence[1], occurence[0])),
+            occurences)
+
     def test_view_of_n_partitions(self):
         self.assertListEqual(
             [[1,2,3],[4,5,6],[7,8]],
@@ -140,6 +170,36 @@ class TestListUtils(unittest.TestCase):
         self.assertEqual(2, length)
         self.assertCountEqual([(0,0), (2,4), (4,2)], indices)
 
+    def test_longest_common_sublist_of_long_lists(self):
+        #disjoint alphabets except for the shared block 'xyz'
+        list_a = [i % 7 for i in range(50_000)] + list('xyz')
+        list_b = list('xyz') + [10 + i % 5 for i in range(50_000)]
+        length, indices = list_utils.longest_common_sublists(list_a, list_b)
+        self.assertEqual(3, length)
+        self.assertListEqual([(50_000, 0)], indices)
+
+    def test_longest_common_sublist_with_unhashable_elements(self):
+        original_threshold = list_utils.MAX_NR_OF_CELLS_FOR_DYNAMIC_PROGRAMMING
+        list_utils.MAX_NR_OF_CELLS_FOR_DYNAMIC_PROGRAMMING = 0
+        try:
+            length, indices = list_utils.longest_common_sublists(
+                [[1], [2], [3]], [[0], [2], [3]])
+        finally:
+            list_utils.MAX_NR_OF_CELLS_FOR_DYNAMIC_PROGRAMMING = original_threshold
+        self.assertEqual(2, length)
+        self.assertListEqual([(1,1)], indices)
+
+    @given(lists(integers(0, 3), max_size=40), lists(integers(0, 4), max_size=40))
+    def test_longest_common_sublist_suffix_automaton_equals_dp(self, list_a, list_b):
+        expected = list_utils.longest_common_sublists(list_a, list_b)
+        original_threshold = list_utils.MAX_NR_OF_CELLS_FOR_DYNAMIC_PROGRAMMING
+        list_utils.MAX_NR_OF_CELLS_FOR_DYNAMIC_PROGRAMMING = 0
+        try:
+            actual = list_utils.longest_common_sublists(list_a, list_b)
+        finally:
+            list_utils.MAX_NR_OF_CELLS_FOR_DYNAMIC_PROGRAMMING = original_threshold
+        self.assertEqual(expected, actual)
+
     @given(same_len_lists(0,3,0,10))
     def test_shuffle_together(self, list_of_lists):
         shuffled_list_of_lists = list_utils.shuffle_together(*list_of_lists)
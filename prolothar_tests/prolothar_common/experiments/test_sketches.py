@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+import unittest
+from hypothesis import given
+from hypothesis.strategies import floats
+from hypothesis.strategies import lists
+import numpy as np
+
+from prolothar_common.experiments.sketches import QuantileSketch
+from prolothar_common.experiments.sketches import Histogram
+
+class TestQuantileSketch(unittest.TestCase):
+
+    def assert_rank_error_below(self, sorted_values, sketch, max_error):
+        for q in [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]:
+            rank = np.searchsorted(sorted_values, sketch.quantile(q)) / len(sorted_values)
+            self.assertLess(abs(rank - q), max_error, msg=f'q={q}')
+
+    def test_empty_sketch(self):
+        sketch = QuantileSketch()
+        self.assertEqual(0, len(sketch))
+        self.assertTrue(np.isnan(sketch.quantile(0.5)))
+        self.assertTrue(np.isnan(sketch.minimum()))
+        self.assertTrue(np.isnan(sketch.rank(1)))
+
+    def test_exact_for_few_values(self):
+        sketch = QuantileSketch([5, 1, 4, 2, 3])
+        self.assertEqual(5, len(sketch))
+        self.assertEqual(1, sketch.quantile(0))
+        self.assertEqual(3, sketch.quantile(0.5))
+        self.assertEqual(5, sketch.quantile(1))
+        self.assertEqual(0.4, sketch.rank(2))
+        self.assertEqual(0, sketch.rank(0))
+        with self.assertRaises(ValueError):
+            sketch.quantile(1.5)
+
+    def test_push_array(self):
+        values = np.random.default_rng(0).normal(size=200_000)
+        sketch = QuantileSketch(random_seed=0)
+        sketch.push_array(values)
+        self.assertEqual(len(values), len(sketch))
+        self.assertEqual(values.min(), sketch.minimum())
+        self.assertEqual(values.max(), sketch.maximum())
+        self.assert_rank_error_below(np.sort(values), sketch, 0.02)
+
+    def test_merge(self):
+        values = np.random.default_rng(1).exponential(size=100_000)
+        merged_sketch = QuantileSketch(random_seed=0)
+        for i in range(7):
+            sketch = QuantileSketch(values[i::7], random_seed=i)
+            merged_sketch.merge(sketch)
+        merged_sketch.merge(QuantileSketch())
+        self.assertEqual(len(values), len(merged_sketch))
+        self.assertEqual(values.max(), merged_sketch.maximum())
+        self.assert_rank_error_below(np.sort(values), merged_sketch, 0.02)
+
+    @given(lists(floats(allow_nan=False, allow_infinity=False), max_size=500))
+    def test_quantiles_are_bounded_by_min_and_max(self, values):
+        sketch = QuantileSketch(values, k=8)
+        self.assertEqual(len(values), len(sketch))
+        if values:
+            self.assertEqual(min(values), sketch.minimum())
+            for quantile in sketch.quantiles([0, 0.3, 0.5, 0.8, 1]):
+                self.assertLessEqual(min(values), quantile)
+                self.assertGreaterEqual(max(values), quantile)
+
+class TestHistogram(unittest.TestCase):
+
+    def test_push_and_quantile(self):
+        histogram = Histogram(0, 10, 5, [-1, 0, 1.9, 2, 5, 10, 11, 12])
+        self.assertEqual(8, len(histogram))
+        np.testing.assert_array_equal([2, 1, 1, 0, 1], histogram.get_counts())
+        np.testing.assert_array_equal([0, 2, 4, 6, 8, 10], histogram.get_bin_edges())
+        self.assertEqual(1, histogram.get_nr_of_values_below())
+        self.assertEqual(2, histogram.get_nr_of_values_above())
+        self.assertEqual(0, histogram.quantile(0.1))
+        self.assertEqual(1, histogram.quantile(0.25))
+        self.assertEqual(10, histogram.quantile(0.9))
+        self.assertTrue(np.isnan(Histogram(0, 1, 2).quantile(0.5)))
+
+    def test_push_array_and_merge(self):
+        values = np.random.default_rng(0).uniform(-1, 11, size=10_000)
+        expected_histogram = Histogram(0, 10, 20, values)
+        histogram = Histogram(0, 10, 20)
+        histogram.push_array(values[:5000])
+        other_histogram = Histogram(0, 10, 20)
+        other_histogram.push_array(values[5000:])
+        histogram.merge(other_histogram)
+        np.testing.assert_array_equal(expected_histogram.get_counts(), histogram.get_counts())
+        self.assertEqual(len(values), len(histogram))
+        self.assertEqual(expected_histogram.get_nr_of_values_above(),
+                         histogram.get_nr_of_values_above())
+        self.assertAlmostEqual(5, histogram.quantile(0.5), delta=0.3)
+        with self.assertRaises(ValueError):
+            histogram.merge(Histogram(0, 10, 10))
+
+    def test_invalid_bins(self):
+        with self.assertRaises(ValueError):
+            Histogram(1, 1, 10)
+        with self.assertRaises(ValueError):
+            Histogram(0, 1, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,7 @@ from statistics import mean
 from statistics import stdev
 
 from prolothar_common.experiments.statistics import Statistics
+from prolothar_common.experiments.statistics import compute_grouped_statistics
 
 class TestResultCollector(unittest.TestCase):
 
@@ -68,5 +69,49 @@ class TestResultCollector(unittest.TestCase):
         if len(list_1) + len(list_2) > 1:
             self.assertAlmostEqual(expected_complete_statistics.stddev(), actual_complete_statistics.stddev())
 
+    @given(lists(
+        floats(
+            allow_nan=False, allow_infinity=False,
+            min_value=-1_000_000, max_value=1_000_000
+        ),
+        min_size=0, max_size=1000
+    ))
+    def test_from_array(self, list_of_numbers):
+        expected_statistics = Statistics(list_of_numbers)
+        actual_statistics = Statistics.from_array(np.array(list_of_numbers))
+        self.assertEqual(len(expected_statistics), len(actual_statistics))
+        self.assertEqual(expected_statistics.mean(), actual_statistics.mean())
+        np.testing.assert_equal(expected_statistics.minimum(), actual_statistics.minimum())
+        np.testing.assert_equal(expected_statistics.maximum(), actual_statistics.maximum())
+        np.testing.assert_equal(expected_statistics.stddev(), actual_statistics.stddev())
+
+    def test_push_array(self):
+        statistics = Statistics([1.0])
+        statistics.push_array(np.array([[2, 3], [4, 5]]))
+        self.assertEqual(5, len(statistics))
+        self.assertEqual(3, statistics.mean())
+        self.assertEqual(1, statistics.minimum())
+        self.assertEqual(5, statistics.maximum())
+
+    def test_compute_grouped_statistics(self):
+        key_codes = np.array([0, 2, 0, 2, 2, 0])
+        values = np.array([1.0, 10.0, 3.0, 20.0, 30.0, 5.0])
+        statistics_list = compute_grouped_statistics(key_codes, values)
+        self.assertEqual(3, len(statistics_list))
+        for key_code, statistics in enumerate(statistics_list):
+            expected_statistics = Statistics(values[key_codes == key_code])
+            self.assertEqual(len(expected_statistics), len(statistics))
+            np.testing.assert_equal(expected_statistics.mean(), statistics.mean())
+            np.testing.assert_equal(expected_statistics.minimum(), statistics.minimum())
+            np.testing.assert_equal(expected_statistics.stddev(), statistics.stddev())
+        self.assertEqual(4, len(compute_grouped_statistics(key_codes, values, nr_of_keys=4)))
+        self.assertListEqual([], compute_grouped_statistics([], []))
+        with self.assertRaises(ValueError):
+            compute_grouped_statistics(key_codes, values[:-1])
+        with self.assertRaises(ValueError):
+            compute_grouped_statistics(key_codes, values, nr_of_keys=2)
+        with self.assertRaises(ValueError):
+            compute_grouped_statistics([-1], [1.0])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -2,7 +2,8 @@
 
 import unittest
 
-from prolothar_common.models.dfg.node import Node
+from prolothar_common.models.dfg.node import Node, EdgeList
+from prolothar_common.models.dfg.edge import Edge
 
 class TestNode(unittest.TestCase):
 
@@ -11,5 +12,37 @@ class TestNode(unittest.TestCase):
         node.pattern = 'abc*'
         self.assertEqual(node.activity, 'Test')
 
+    def test_edge_list(self):
+        a = Node('A')
+        b = Node('B')
+        c = Node('C')
+        edge_ab = Edge(a, b, 1)
+        edge_ac = Edge(a, c, 2)
+        edge_aa = Edge(a, a, 3)
+        edges = EdgeList(True, [edge_ac, edge_ab])
+        edges.append(edge_aa)
+        self.assertEqual(3, len(edges))
+        self.assertListEqual([edge_ac, edge_ab, edge_aa], list(edges))
+        self.assertIs(edge_ab, edges.get('B'))
+        self.assertIsNone(edges.get('D'))
+        self.assertIn(edge_aa, edges)
+        edges.remove(edge_ab)
+        self.assertListEqual([edge_ac, edge_aa], list(edges))
+        self.assertNotIn(edge_ab, edges)
+        with self.assertRaises(ValueError):
+            edges.remove(edge_ab)
+        c.activity = 'D'
+        edges.rename_activity('C', 'D')
+        self.assertIs(edge_ac, edges.get('D'))
+        self.assertListEqual([edge_ac, edge_aa], list(edges))
+
+    def test_is_followed_by(self):
+        a = Node('A')
+        b = Node('B')
+        a.edges.append(Edge(a, b))
+        self.assertTrue(a.is_followed_by('B'))
+        self.assertFalse(a.is_followed_by('A'))
+        self.assertFalse(b.is_followed_by('A'))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
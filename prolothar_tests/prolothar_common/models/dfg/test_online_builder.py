@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from datetime import datetime, timedelta
+
+from prolothar_common.models.eventlog import EventLog
+from prolothar_common.models.directly_follows_graph import DirectlyFollowsGraph
+from prolothar_common.models.dfg.online_builder import OnlineDirectlyFollowsGraphBuilder
+
+class TestOnlineDirectlyFollowsGraphBuilder(unittest.TestCase):
+
+    def test_add_interleaved_events(self):
+        builder = OnlineDirectlyFollowsGraphBuilder()
+        for case_id, activity in [(1, 'A'), (2, 'A'), (1, 'B'), (3, 'C'),
+                                  (2, 'C'), (1, 'C'), (2, 'D')]:
+            builder.add_event(case_id, activity)
+        builder.close_case(1)
+        self.assertEqual(2, builder.get_nr_of_open_cases())
+        expected_dfg = DirectlyFollowsGraph.create_from_event_log(
+            EventLog.create_from_simple_activity_log([
+                ['A', 'B', 'C'], ['A', 'C', 'D'], ['C']
+            ]))
+        self.assertEqual(expected_dfg, builder.dfg)
+        snapshot = builder.get_snapshot()
+        builder.add_event(3, 'D')
+        self.assertEqual(expected_dfg, snapshot)
+        self.assertEqual(1, builder.dfg.get_count('C', 'D') - snapshot.get_count('C', 'D'))
+
+    def test_window_expiry(self):
+        builder = OnlineDirectlyFollowsGraphBuilder(window_size=10, bucket_size=5)
+        builder.add_event(1, 'A', 0)
+        builder.add_event(1, 'B', 1)
+        builder.add_event(2, 'A', 6)
+        builder.add_event(2, 'C', 7)
+        self.assertEqual(1, builder.dfg.get_count('A', 'B'))
+        self.assertEqual(3, builder.dfg.get_nr_of_nodes())
+        builder.add_event(2, 'B', 11)
+        self.assertEqual(0, builder.dfg.get_count('A', 'B'))
+        self.assertEqual(1, builder.dfg.get_count('C', 'B'))
+        self.assertEqual(1, builder.dfg.get_count('A', 'C'))
+        self.assertSetEqual({'A', 'B', 'C'}, set(builder.dfg.nodes))
+        #case 1 has left the window
+        self.assertEqual(1, builder.get_nr_of_open_cases())
+        builder.advance_time(100)
+        self.assertEqual(0, builder.dfg.get_nr_of_nodes())
+        self.assertEqual(0, builder.dfg.get_nr_of_edges())
+
+    def test_window_with_datetime(self):
+        builder = OnlineDirectlyFollowsGraphBuilder(window_size=timedelta(hours=1))
+        start = datetime(2021, 1, 1)
+        builder.add_event('x', 'A', start)
+        builder.add_event('x', 'B', start + timedelta(minutes=30))
+        self.assertEqual(1, builder.dfg.get_count('A', 'B'))
+        builder.add_event('y', 'C', start + timedelta(minutes=95))
+        self.assertEqual(0, builder.dfg.get_count('A', 'B'))
+        self.assertSetEqual({'C'}, set(builder.dfg.nodes))
+        with self.assertRaises(ValueError):
+            builder.add_event('y', 'C')
+
+    def test_merge(self):
+        builder_a = OnlineDirectlyFollowsGraphBuilder()
+        builder_b = OnlineDirectlyFollowsGraphBuilder()
+        for activity in ['A', 'B', 'C']:
+            builder_a.add_event(1, activity)
+        for activity in ['A', 'B', 'D']:
+            builder_b.add_event(2, activity)
+        builder_a.merge(builder_b)
+        self.assertEqual(2, builder_a.dfg.get_count('A', 'B'))
+        self.assertEqual(1, builder_a.dfg.get_count('B', 'D'))
+        self.assertEqual(1, builder_b.dfg.get_count('A', 'B'))
+        self.assertEqual(4, builder_a.dfg.get_nr_of_nodes())
+        with self.assertRaises(ValueError):
+            builder_a.merge(OnlineDirectlyFollowsGraphBuilder(window_size=10))
+
+if __name__ == '__main__':
+    unittest.main()
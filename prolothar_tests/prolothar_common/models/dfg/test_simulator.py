@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from prolothar_common.models.directly_follows_graph import DirectlyFollowsGraph
+from prolothar_common.models.dfg.simulator import DirectlyFollowsGraphSimulator
+from prolothar_common.models.eventlog import ColumnarEventLog
+
+class TestDirectlyFollowsGraphSimulator(unittest.TestCase):
+
+    def setUp(self):
+        self.dfg = DirectlyFollowsGraph()
+        self.dfg.add_count('A', 'B', count=9)
+        self.dfg.add_count('A', 'C', count=1)
+        self.dfg.add_count('B', 'B', count=1)
+        self.dfg.add_count('B', 'D')
+        self.dfg.add_count('C', 'D')
+
+    def test_generate_log(self):
+        log = DirectlyFollowsGraphSimulator(self.dfg).generate_log(100, random_seed=1)
+        self.assertIsInstance(log, ColumnarEventLog)
+        self.assertEqual(100, log.get_nr_of_traces())
+        self.assertListEqual(list(range(100)), [trace.get_id() for trace in log])
+        self.assertSetEqual({'A'}, log.compute_set_of_start_activities())
+        self.assertSetEqual({'D'}, log.compute_set_of_end_activities())
+        for trace in log.to_simple_activity_log():
+            for a, b in zip(trace, trace[1:]):
+                self.assertIn((a, b), self.dfg.edges)
+
+    def test_random_seed(self):
+        simulator = DirectlyFollowsGraphSimulator(self.dfg)
+        log = simulator.generate_log(50, random_seed=7, batch_size=8)
+        self.assertEqual(log, simulator.generate_log(50, random_seed=7, batch_size=8))
+        self.assertEqual(log, simulator.generate_log(
+            50, random_seed=7, batch_size=8, nr_of_workers=2))
+
+    def test_weighted(self):
+        log = DirectlyFollowsGraphSimulator(self.dfg, weighted=True).generate_log(
+            10_000, random_seed=3)
+        second_activities = [trace[1] for trace in log.to_simple_activity_log()]
+        self.assertAlmostEqual(0.9, second_activities.count('B') / 10_000, delta=0.02)
+        log = DirectlyFollowsGraphSimulator(self.dfg).generate_log(
+            10_000, random_seed=3)
+        self.assertAlmostEqual(0.5, log.compute_activity_supports()['C'] / 10_000,
+                               delta=0.02)
+
+    def test_max_trace_length_and_custom_activities(self):
+        simulator = DirectlyFollowsGraphSimulator(
+            self.dfg, start_activities=['B'], end_activities=['D'])
+        log = simulator.generate_log(200, random_seed=0, max_trace_length=2)
+        for trace in log.to_simple_activity_log():
+            self.assertIn(trace, [['B', 'B'], ['B', 'D']])
+        simulator = DirectlyFollowsGraphSimulator(
+            self.dfg, start_activities=['A'], end_activities=['A'])
+        self.assertListEqual([['A']] * 3, simulator.generate_log(3).to_simple_activity_log())
+
+    def test_empty_log(self):
+        log = DirectlyFollowsGraphSimulator(self.dfg).generate_log(0)
+        self.assertEqual(0, log.get_nr_of_traces())
+
+    def test_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            DirectlyFollowsGraphSimulator(self.dfg, start_activities=[])
+        with self.assertRaises(ValueError):
+            DirectlyFollowsGraphSimulator(self.dfg, end_activities=['X'])
+        with self.assertRaises(ValueError):
+            DirectlyFollowsGraphSimulator(self.dfg).generate_log(1, max_trace_length=0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import os
+import pickle
+import tempfile
+from unittest import mock
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from prolothar_common.models.eventlog import EventLog, Trace, Event
+from prolothar_common.models.eventlog import ColumnarEventLog
+from prolothar_common.models.eventlog.binary_format import write_binary_event_log
+from prolothar_common.models.eventlog.binary_format import open_binary_event_log
+
+class TestBinaryFormat(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.tempdir.name, 'log.bin')
+        self.event_log = EventLog()
+        self.event_log.add_trace(Trace('case-1', [
+            Event('A', {'duration': 1, 'resource': 'Jürgen',
+                        'start': datetime(2020, 1, 1, 12, 30)}),
+            Event('B', {'duration': 2, 'wait': timedelta(seconds=3)}),
+            Event('C', {'duration': 3, 'resource': 'Ann'})
+        ], {'customer': 'c1', 'priority': 0.5}))
+        self.event_log.add_trace(Trace('case-2', [
+            Event('A', {'duration': 4, 'flag': True}),
+            Event('C', {'duration': 5, 'resource': 'Bob'}),
+        ], {'priority': 1.5}))
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_write_and_open(self):
+        write_binary_event_log(self.event_log, self.filepath)
+        log = open_binary_event_log(self.filepath)
+        self.assertIsInstance(log, ColumnarEventLog)
+        self.assertEqual(self.event_log, log)
+        self.assertListEqual(['case-1', 'case-2'], [t.get_id() for t in log])
+        self.assertFalse(log.activity_codes.flags.writeable)
+        self.assertDictEqual(self.event_log.compute_activity_supports(),
+                             log.compute_activity_supports())
+
+    def test_write_and_open_with_int_trace_ids(self):
+        activity_log = [['A', 'B'], ['B', 'C', 'A'], ['D']]
+        ColumnarEventLog.create_from_simple_activity_log(
+            activity_log).write_to_binary_file(self.filepath)
+        log = ColumnarEventLog.open_binary_file(self.filepath)
+        self.assertListEqual(activity_log, log.to_simple_activity_log())
+        self.assertListEqual([0, 1, 2], [t.get_id() for t in log])
+
+    def test_pickle_only_stores_filepath(self):
+        write_binary_event_log(self.event_log, self.filepath)
+        log = open_binary_event_log(self.filepath)
+        pickled_log = pickle.dumps(log)
+        self.assertLess(len(pickled_log), os.path.getsize(self.filepath))
+        unpickled_log = pickle.loads(pickled_log)
+        self.assertEqual(self.event_log, unpickled_log)
+        np.testing.assert_array_equal(log.trace_offsets, unpickled_log.trace_offsets)
+
+    def test_open_does_not_scan_columns(self):
+        write_binary_event_log(self.event_log, self.filepath)
+        with mock.patch.object(np, 'diff', side_effect=AssertionError), \
+             mock.patch.object(ColumnarEventLog, '__init__', side_effect=AssertionError):
+            pickle.loads(pickle.dumps(open_binary_event_log(self.filepath)))
+
+    def test_unsupported_attribute_value(self):
+        self.event_log.traces[0].events[0].attributes['object'] = object()
+        with self.assertRaises(ValueError):
+            write_binary_event_log(self.event_log, self.filepath)
+
+    def test_open_invalid_file(self):
+        with open(self.filepath, 'wb') as f:
+            f.write(b'no event log')
+        with self.assertRaises(ValueError):
+            open_binary_event_log(self.filepath)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+import numpy as np
+
+from prolothar_common.models.eventlog import EventLog, Trace, Event, ComplexEvent
+from prolothar_common.models.eventlog import ColumnarEventLog
+
+class TestColumnarEventLog(unittest.TestCase):
+
+    def setUp(self):
+        self.event_log = EventLog()
+        self.event_log.add_trace(Trace('a', [
+            Event('A', {'duration': 1, 'resource': 'x'}),
+            Event('B', {'duration': 2.5}),
+            Event('C', {'duration': 3, 'resource': 'y'})
+        ], {'customer': 'c1'}))
+        self.event_log.add_trace(Trace('b', [
+            Event('A', {'duration': 4}),
+            Event('C', {'duration': 5, 'resource': 'x'}),
+        ]))
+        self.event_log.add_trace(Trace('c', [
+            Event('B', {'duration': 6, 'flag': True}),
+        ], {'customer': 'c2'}))
+        self.columnar_log = ColumnarEventLog.create_from_event_log(self.event_log)
+
+    def test_create_from_event_log(self):
+        self.assertListEqual(['A', 'B', 'C'], self.columnar_log.activities)
+        np.testing.assert_array_equal(
+            [0, 1, 2, 0, 2, 1], self.columnar_log.activity_codes)
+        np.testing.assert_array_equal(
+            [0, 3, 5, 6], self.columnar_log.trace_offsets)
+        self.assertEqual(np.float64, self.columnar_log.event_attributes['duration'].values.dtype)
+        self.assertEqual(object, self.columnar_log.event_attributes['resource'].values.dtype)
+        self.assertEqual(np.bool_, self.columnar_log.event_attributes['flag'].values.dtype)
+        self.assertFalse(self.columnar_log.is_materialized())
+
+    def test_traces_are_created_lazily(self):
+        self.assertEqual(3, len(self.columnar_log))
+        self.assertListEqual(list(self.event_log), list(self.columnar_log))
+        self.assertEqual('b', self.columnar_log.get_trace(1).get_id())
+        self.assertDictEqual({'customer': 'c1'}, self.columnar_log.get_trace(0).attributes)
+        self.assertDictEqual({'duration': 2.5}, self.columnar_log.get_trace(0).events[1].attributes)
+        self.assertFalse(self.columnar_log.is_materialized())
+        self.assertEqual(self.event_log, self.columnar_log)
+        self.assertEqual(repr(self.event_log), repr(self.columnar_log))
+
+    def test_counting_methods(self):
+        self.assertEqual(self.event_log.count_nr_of_events(),
+                         self.columnar_log.count_nr_of_events())
+        self.assertDictEqual(self.event_log.compute_activity_supports(),
+                             self.columnar_log.compute_activity_supports())
+        self.assertSetEqual(self.event_log.compute_activity_set(),
+                            self.columnar_log.compute_activity_set())
+        self.assertSetEqual(self.event_log.compute_set_of_start_activities(),
+                            self.columnar_log.compute_set_of_start_activities())
+        self.assertSetEqual(self.event_log.compute_set_of_end_activities(),
+                            self.columnar_log.compute_set_of_end_activities())
+        self.assertListEqual(self.event_log.to_simple_activity_log(),
+                             self.columnar_log.to_simple_activity_log())
+        self.assertFalse(self.columnar_log.is_materialized())
+
+    def test_modification_materializes_log(self):
+        self.columnar_log.filter_activities({'A', 'B'})
+        self.assertTrue(self.columnar_log.is_materialized())
+        self.assertListEqual([['A', 'B'], ['A'], ['B']],
+                             self.columnar_log.to_simple_activity_log())
+        self.assertDictEqual({'A': 2, 'B': 2},
+                             self.columnar_log.compute_activity_supports())
+
+    def test_copy_and_to_event_log(self):
+        copy = self.columnar_log.copy()
+        self.assertIsInstance(copy, ColumnarEventLog)
+        self.assertEqual(self.event_log, copy)
+        self.assertEqual(self.event_log, self.columnar_log.to_event_log())
+
+    def test_create_from_simple_activity_log(self):
+        activity_log = [['A', 'B', 'C'], ['A', 'C'], ['D']]
+        log = ColumnarEventLog.create_from_simple_activity_log(activity_log)
+        self.assertListEqual(activity_log, log.to_simple_activity_log())
+        self.assertEqual(EventLog.create_from_simple_activity_log(activity_log), log)
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            ColumnarEventLog(['A'], [0, 0], [0, 0, 2])
+        with self.assertRaises(ValueError):
+            ColumnarEventLog(['A'], [0, 1], [0, 2])
+        with self.assertRaises(ValueError):
+            ColumnarEventLog.create_from_event_log([
+                Trace(0, [ComplexEvent('A', [Event('B')])])])
+
+if __name__ == '__main__':
+    unittest.main()
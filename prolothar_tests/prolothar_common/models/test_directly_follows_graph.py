@@ -2,8 +2,11 @@
 
 import unittest
 
+import numpy as np
+
+from prolothar_common.models import directly_follows_graph
 from prolothar_common.models.directly_follows_graph import DirectlyFollowsGraph
-from prolothar_common.models.eventlog import EventLog
+from prolothar_common.models.eventlog import EventLog, ColumnarEventLog
 
 class TestDirectlyFollowsGraph(unittest.TestCase):
 
@@ -134,6 +137,23 @@ class TestDirectlyFollowsGraph(unittest.TestCase):
             self.dfg.compute_shortest_path(
                 'A', 'D', forbidden_edges=[('B', 'D')]))
 
+    def test_get_shortest_path_after_changes(self):
+        self.dfg.add_count('A', 'B')
+        self.dfg.add_count('B', 'C')
+        self.dfg.add_count('C', 'D')
+        expected_edges = dict(self.dfg.edges)
+        self.assertEqual(['A', 'B', 'C', 'D'], self.dfg.compute_shortest_path('A', 'D'))
+        self.assertEqual([], self.dfg.compute_shortest_path(
+            'A', 'D', forbidden_edges=[('B', 'C'), ('X', 'Y')]))
+        #forbidden edges do not change the graph
+        self.assertDictEqual(expected_edges, self.dfg.edges)
+        self.dfg.add_count('A', 'D')
+        self.assertEqual(['A', 'D'], self.dfg.compute_shortest_path('A', 'D'))
+        self.assertEqual(['A', 'B'], self.dfg.compute_shortest_path_to_one_of('A', {'B', 'C'}))
+        self.dfg.remove_node('B')
+        self.assertEqual([], self.dfg.compute_shortest_path('A', 'C'))
+        self.assertEqual(['A', 'D'], self.dfg.compute_shortest_path_to_one_of('A', {'C', 'D'}))
+
     def test_get_shortest_path_to_one_of(self):
         self.dfg.add_count('A', 'B')
         self.dfg.add_count('A', 'C')
@@ -189,6 +209,91 @@ class TestDirectlyFollowsGraph(unittest.TestCase):
 
         self.assertEqual(expected_dfg, actual_dfg)
 
+    def test_create_from_variant_log(self):
+        log = EventLog.create_from_simple_activity_log([
+            ['0','1','2','4','5','4','5','1','2','6'],
+            ['0','7','8','6'],
+            ['0','1','2','4','5','4','5','1','2','6'],
+            ['0','1','2','6']
+        ])
+        expected_dfg = DirectlyFollowsGraph()
+        expected_dfg.read_counts_from_log(log)
+        variant_dfg = DirectlyFollowsGraph()
+        variant_dfg.read_counts_from_variant_log(log.compute_variant_log())
+        self.assertEqual(expected_dfg, variant_dfg)
+        self.assertListEqual(list(expected_dfg.nodes), list(variant_dfg.nodes))
+        self.assertListEqual(list(expected_dfg.edges), list(variant_dfg.edges))
+        self.assertEqual(5, variant_dfg.get_count('1', '2'))
+        self.assertEqual(expected_dfg, DirectlyFollowsGraph.create_from_event_log(
+            ColumnarEventLog.create_from_event_log(log)))
+
+    def test_build_eventually_follows_on_first_occurence_graph(self):
+        log = EventLog.create_from_simple_activity_log([
+            ['A','B','C','B','C','D'],
+            ['A','B','C','D'],
+            ['B','A']
+        ])
+        dfg = DirectlyFollowsGraph.build_eventually_follows_on_first_occurence_graph(log)
+        self.assertEqual(2, dfg.get_count('A', 'D'))
+        self.assertEqual(2, dfg.get_count('B', 'C'))
+        self.assertEqual(0, dfg.get_count('C', 'B'))
+        self.assertEqual(1, dfg.get_count('B', 'A'))
+        self.assertEqual(7, dfg.get_nr_of_edges())
+
+    def test_read_counts_from_log_in_batches(self):
+        log = EventLog.create_from_simple_activity_log([
+            ['A','B','C','B'], ['C'], ['B','B','D'], ['A','B']
+        ])
+        expected_dfg = DirectlyFollowsGraph.create_from_event_log(log)
+        encoding_batch_size = directly_follows_graph._ENCODING_BATCH_SIZE
+        max_nr_of_pairs_per_batch = directly_follows_graph._MAX_NR_OF_PAIRS_PER_BATCH
+        try:
+            directly_follows_graph._ENCODING_BATCH_SIZE = 2
+            directly_follows_graph._MAX_NR_OF_PAIRS_PER_BATCH = 1
+            dfg = DirectlyFollowsGraph()
+            dfg.read_counts_from_log(iter(log.traces))
+            self.assertEqual(expected_dfg, dfg)
+            self.assertListEqual(['A', 'B', 'C', 'D'], list(dfg.nodes))
+            self.assertEqual(
+                DirectlyFollowsGraph.build_eventually_follows_on_first_occurence_graph(
+                    ColumnarEventLog.create_from_event_log(log)),
+                DirectlyFollowsGraph.build_eventually_follows_on_first_occurence_graph(log))
+        finally:
+            directly_follows_graph._ENCODING_BATCH_SIZE = encoding_batch_size
+            directly_follows_graph._MAX_NR_OF_PAIRS_PER_BATCH = max_nr_of_pairs_per_batch
+
+    def test_merge(self):
+        self.dfg.add_count('A', 'B', count=2)
+        self.dfg.add_count('B', 'C')
+        other_dfg = DirectlyFollowsGraph()
+        other_dfg.add_count('A', 'B', count=3)
+        other_dfg.add_count('C', 'D')
+        other_dfg.add_node('E')
+        self.dfg.merge(other_dfg)
+        self.assertEqual(5, self.dfg.get_count('A', 'B'))
+        self.assertEqual(1, self.dfg.get_count('B', 'C'))
+        self.assertEqual(1, self.dfg.get_count('C', 'D'))
+        self.assertEqual(3, other_dfg.get_count('A', 'B'))
+        self.assertListEqual(['A', 'B', 'C', 'D', 'E'], list(self.dfg.nodes))
+        self.assertListEqual(['D'], self.dfg.get_following_activities('C'))
+        self.assertListEqual(['B'], self.dfg.get_preceeding_activities('C'))
+
+    def test_rename_activity(self):
+        self.dfg.add_count('A', 'B')
+        self.dfg.add_count('B', 'B', count=2)
+        self.dfg.add_count('B', 'C', count=3)
+        self.dfg.rename_activity('B', 'X')
+        self.assertEqual(1, self.dfg.get_count('A', 'X'))
+        self.assertEqual(2, self.dfg.get_count('X', 'X'))
+        self.assertEqual(3, self.dfg.get_count('X', 'C'))
+        self.assertTrue(self.dfg.nodes['A'].is_followed_by('X'))
+        self.assertTrue(self.dfg.nodes['X'].is_followed_by('X'))
+        self.dfg.remove_edge(('X', 'X'))
+        self.dfg.remove_edge(('X', 'C'))
+        self.assertListEqual(['A'], self.dfg.get_preceeding_activities('X'))
+        self.assertListEqual([], self.dfg.get_following_activities('X'))
+        self.assertListEqual([], self.dfg.get_preceeding_activities('C'))
+
     def test_get_largest_weakly_connected_component(self):
         self.dfg.add_count('A', 'B')
         self.dfg.add_count('A', 'C')
@@ -351,6 +456,69 @@ class TestDirectlyFollowsGraph(unittest.TestCase):
 
         self.assertSetEqual({'F'}, self.dfg.get_reachable_activities('E'))
 
+    def test_reachability_with_cycles(self):
+        self.dfg.add_count('A', 'B')
+        self.dfg.add_count('B', 'C')
+        self.dfg.add_count('C', 'B')
+        self.dfg.add_count('C', 'D')
+        self.dfg.add_count('E', 'E')
+        self.assertSetEqual({'B', 'C', 'D'}, self.dfg.get_reachable_activities('A'))
+        self.assertSetEqual({'B', 'C', 'D'}, self.dfg.get_reachable_activities('B'))
+        self.assertSetEqual({'E'}, self.dfg.get_reachable_activities('E'))
+        self.assertSetEqual({'A', 'B', 'C'}, self.dfg.get_activities_that_reach('C'))
+        self.assertSetEqual(set(), self.dfg.get_activities_that_reach('A'))
+
+        index = self.dfg.get_activity_index()
+        reachability = self.dfg.compute_reachability_matrix()
+        self.assertTrue(reachability[index['A'], index['D']])
+        self.assertFalse(reachability[index['A'], index['A']])
+        self.assertTrue(reachability[index['C'], index['C']])
+        self.assertTrue(reachability[index['E'], index['E']])
+        self.assertFalse(reachability[index['D'], index['B']])
+
+        #the cached matrices must be updated after changes
+        self.dfg.remove_edge(('C', 'B'))
+        self.assertSetEqual({'C', 'D'}, self.dfg.get_reachable_activities('B'))
+        self.assertFalse(self.dfg.compute_reachability_matrix()[index['C'], index['C']])
+        self.dfg.add_count('D', 'A')
+        self.assertSetEqual({'A', 'B', 'C', 'D'}, self.dfg.get_reachable_activities('A'))
+
+    def test_reachability_without_initialized_cache(self):
+        class UninitializedDirectlyFollowsGraph(DirectlyFollowsGraph):
+            def __init__(self):
+                #does not call DirectlyFollowsGraph.__init__, i.e. no cache
+                self.edges = {}
+                self.nodes = {}
+        dfg = UninitializedDirectlyFollowsGraph()
+        self.assertTupleEqual((0, 0), dfg.compute_reachability_matrix().shape)
+
+    def test_adjacency_matrix(self):
+        self.dfg.add_count('A', 'B', count=3)
+        self.dfg.add_count('B', 'B', count=2)
+        self.dfg.add_node('C')
+        np.testing.assert_array_equal(
+            [[0, 3, 0], [0, 2, 0], [0, 0, 0]], self.dfg.get_adjacency_matrix())
+        np.testing.assert_array_equal(
+            [[0, 3, 0], [0, 2, 0], [0, 0, 0]],
+            self.dfg.get_adjacency_matrix(sparse=True).toarray())
+        np.testing.assert_array_equal([1, 1, 0], self.dfg.compute_outdegrees())
+        np.testing.assert_array_equal([0, 2, 0], self.dfg.compute_indegrees())
+        self.dfg.add_count('A', 'B')
+        self.dfg.rename_activity('C', 'D')
+        self.assertDictEqual({'A': 0, 'B': 1, 'D': 2}, self.dfg.get_activity_index())
+        self.assertEqual(4, self.dfg.get_adjacency_matrix()[0, 1])
+        self.dfg.remove_node('B')
+        np.testing.assert_array_equal([[0, 0], [0, 0]], self.dfg.get_adjacency_matrix())
+
+    def test_get_weakly_connected_components(self):
+        self.dfg.add_count('A', 'B')
+        self.dfg.add_count('C', 'D')
+        self.dfg.add_count('E', 'B')
+        self.dfg.add_node('F')
+        self.assertListEqual([['A', 'B', 'E'], ['C', 'D'], ['F']],
+                             self.dfg.get_weakly_connected_components())
+        self.assertListEqual([], DirectlyFollowsGraph().get_weakly_connected_components())
+
     def test_plot_with_random_walks(self):
         self.dfg.add_count('0', '0', count=3)
         self.dfg.add_count('0', '1', count=5)
@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+from random import Random
+
+from prolothar_common.models.eventlog import EventLog, ColumnarEventLog
+from prolothar_common.models.eventlog.nearest_trace_index import NearestTraceIndex
+from prolothar_common.levenshtein import levenshtein_distance
+
+class TestNearestTraceIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.activity_log = [
+            ['A', 'B', 'C', 'D'], ['A', 'C', 'B', 'D'], ['A', 'B', 'C', 'D'],
+            ['X', 'Y'], ['A', 'B', 'C', 'D', 'D'], ['X', 'Y', 'Y'], ['A', 'D']
+        ]
+
+    def test_create_from_event_log(self):
+        for log in [EventLog.create_from_simple_activity_log(self.activity_log),
+                    ColumnarEventLog.create_from_simple_activity_log(self.activity_log)]:
+            index = NearestTraceIndex.create_from_event_log(log)
+            self.assertEqual(6, len(index))
+            distance, variant = index.get_nearest_variants(['A', 'B', 'C', 'D'])[0]
+            self.assertEqual(0, distance)
+            self.assertEqual(('A', 'B', 'C', 'D'), variant.activities)
+            self.assertListEqual([0, 2], variant.trace_ids)
+
+    def test_get_nearest_variants(self):
+        index = NearestTraceIndex()
+        for trace_id, activities in enumerate(self.activity_log):
+            index.add_activity_sequence(trace_id, activities)
+        result = index.get_nearest_variants(['A', 'B', 'D'], k=3)
+        self.assertListEqual([1, 1, 1], [distance for distance, _ in result])
+        self.assertListEqual([('A', 'B', 'C', 'D'), ('A', 'C', 'B', 'D'), ('A', 'D')],
+                             [variant.activities for _, variant in result])
+        self.assertEqual(6, len(index.get_nearest_variants(['Z'], k=10)))
+        self.assertListEqual([], NearestTraceIndex().get_nearest_variants(['A']))
+        with self.assertRaises(ValueError):
+            index.get_nearest_variants(['A'], k=0)
+
+    def test_get_variants_within_distance(self):
+        index = NearestTraceIndex(substitution_cost=2)
+        for trace_id, activities in enumerate(self.activity_log):
+            index.add_activity_sequence(trace_id, activities)
+        result = index.get_variants_within_distance(['X', 'Z'], 3)
+        self.assertListEqual([(2, ('X', 'Y')), (3, ('X', 'Y', 'Y'))],
+                             [(d, variant.activities) for d, variant in result])
+        with self.assertRaises(ValueError):
+            index.get_variants_within_distance(['X'], -1)
+
+    def test_against_brute_force(self):
+        random = Random(42)
+        sequences = [
+            [random.choice('ABCDE') for _ in range(random.randint(0, 300))]
+            for _ in range(100)
+        ]
+        index = NearestTraceIndex()
+        for trace_id, activities in enumerate(sequences):
+            index.add_activity_sequence(trace_id, activities)
+        for _ in range(10):
+            query = [random.choice('ABCDEF') for _ in range(random.randint(0, 300))]
+            expected_distances = sorted(
+                levenshtein_distance(query, activities) for activities in sequences)
+            self.assertListEqual(
+                expected_distances[:5],
+                [distance for distance, _ in index.get_nearest_variants(query, k=5)])
+            self.assertListEqual(
+                [d for d in expected_distances if d <= 120],
+                [d for d, _ in index.get_variants_within_distance(query, 120)])
+
+    def test_asymmetric_costs(self):
+        with self.assertRaises(ValueError):
+            NearestTraceIndex(insertion_cost=1, deletion_cost=2)
+
+if __name__ == '__main__':
+    unittest.main()
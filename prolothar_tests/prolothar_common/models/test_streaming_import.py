@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import os
+import tempfile
+from datetime import datetime
+
+import pandas as pd
+
+from prolothar_common.models.eventlog import EventLog, Trace, Event
+from prolothar_common.models.eventlog import ColumnarEventLog
+from prolothar_common.models.eventlog.streaming_import import iter_traces_from_csv
+from prolothar_common.models.eventlog.streaming_import import read_event_log_from_csv
+from prolothar_common.models.eventlog.streaming_import import iter_traces_from_xes
+from prolothar_common.models.eventlog.streaming_import import read_event_log_from_xes
+from prolothar_common.models.directly_follows_graph import DirectlyFollowsGraph
+
+XES_CONTENT = '''<?xml version="1.0" encoding="UTF-8" ?>
+<log xes.version="1.0" xmlns="http://www.xes-standard.org/">
+    <global scope="event">
+        <string key="concept:name" value="__INVALID__"/>
+    </global>
+    <string key="concept:name" value="example log"/>
+    <trace>
+        <string key="concept:name" value="case-1"/>
+        <event>
+            <string key="concept:name" value="A"/>
+            <date key="time:timestamp" value="2020-01-01T10:00:00.000+01:00"/>
+            <int key="cost" value="5"/>
+        </event>
+        <event>
+            <string key="concept:name" value="B"/>
+            <boolean key="ok" value="true"/>
+            <list key="ignored"><string key="x" value="y"/></list>
+        </event>
+    </trace>
+    <trace>
+        <string key="concept:name" value="case-2"/>
+        <float key="priority" value="0.5"/>
+        <event>
+            <string key="concept:name" value="B"/>
+        </event>
+    </trace>
+</log>
+'''
+
+class TestStreamingImport(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.csv_filepath = os.path.join(self.tempdir.name, 'log.csv')
+        self.df = pd.DataFrame([
+                        [0, 'Receive Order', 'Germany', 3],
+                        [0, 'Accept Order', 'Germany', 1],
+                        [1, 'Receive Order', 'France', 2],
+                        [0, 'Produce', 'Germany', None],
+                        [2, 'Receive Order', 'Spain', 2],
+                        [0, 'Test', 'Germany', 4],
+                        [0, 'Deliver', 'Germany', 5],
+                        [1, 'Reject Order', 'France', 1],
+                     ],
+                     columns=['CaseId', 'Activity', 'Location', 'Duration'])
+        self.df.to_csv(self.csv_filepath, index=False)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_read_unsorted_csv(self):
+        expected_log = EventLog.create_from_pandas_df(
+            self.df, 'CaseId', 'Activity', trace_attribute_columns=['Location'])
+        for nr_of_spill_files in [1, 2, 5]:
+            log = read_event_log_from_csv(
+                self.csv_filepath, 'CaseId', 'Activity',
+                trace_attribute_columns=['Location'], chunksize=3,
+                nr_of_spill_files=nr_of_spill_files)
+            self.assertEqual(expected_log, log)
+
+    def test_read_sorted_csv_with_event_attributes(self):
+        self.df.sort_values('CaseId', kind='stable').to_csv(self.csv_filepath, index=False)
+        traces = list(iter_traces_from_csv(
+            self.csv_filepath, 'CaseId', 'Activity',
+            event_attribute_columns=['Duration'], sorted_by_case=True, chunksize=2))
+        self.assertListEqual([0, 1, 2], [trace.get_id() for trace in traces])
+        self.assertListEqual(
+            ['Receive Order', 'Accept Order', 'Produce', 'Test', 'Deliver'],
+            traces[0].to_activity_list())
+        self.assertDictEqual({}, traces[0].events[2].attributes)
+        self.assertDictEqual({'Duration': 3.0}, traces[0].events[0].attributes)
+        self.assertDictEqual({'CaseId': 1}, traces[1].attributes)
+
+    def test_read_csv_columnar(self):
+        log = read_event_log_from_csv(
+            self.csv_filepath, 'CaseId', 'Activity', columnar=True,
+            event_attribute_columns=['Location'])
+        self.assertIsInstance(log, ColumnarEventLog)
+        self.assertEqual(8, log.count_nr_of_events())
+
+    def test_read_xes(self):
+        xes_filepath = os.path.join(self.tempdir.name, 'log.xes')
+        with open(xes_filepath, 'w') as f:
+            f.write(XES_CONTENT)
+        log = read_event_log_from_xes(xes_filepath)
+        expected_log = EventLog()
+        expected_log.add_trace(Trace('case-1', [
+            Event('A', {'time:timestamp': datetime.fromisoformat(
+                '2020-01-01T10:00:00.000+01:00'), 'cost': 5}),
+            Event('B', {'ok': True})
+        ], {'concept:name': 'case-1'}))
+        expected_log.add_trace(Trace('case-2', [Event('B')], {
+            'concept:name': 'case-2', 'priority': 0.5}))
+        self.assertEqual(expected_log, log)
+
+    def test_read_counts_from_trace_iterator(self):
+        xes_filepath = os.path.join(self.tempdir.name, 'log.xes')
+        with open(xes_filepath, 'w') as f:
+            f.write(XES_CONTENT)
+        dfg = DirectlyFollowsGraph()
+        dfg.read_counts_from_log(iter_traces_from_xes(xes_filepath))
+        self.assertEqual(1, dfg.get_count('A', 'B'))
+        self.assertEqual(2, dfg.get_nr_of_nodes())
+
+if __name__ == '__main__':
+    unittest.main()
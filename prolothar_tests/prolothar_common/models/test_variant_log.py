@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from prolothar_common.models.eventlog import EventLog, Trace, Event
+from prolothar_common.models.eventlog import ColumnarEventLog
+from prolothar_common.models.eventlog import VariantLog, Variant
+
+class TestVariantLog(unittest.TestCase):
+
+    def setUp(self):
+        self.event_log = EventLog()
+        self.event_log.add_trace(Trace('a', [Event('A'), Event('B'), Event('C')]))
+        self.event_log.add_trace(Trace('b', [Event('A'), Event('C')]))
+        self.event_log.add_trace(Trace('c', [Event('A'), Event('B'), Event('C')]))
+        self.event_log.add_trace(Trace('d', [Event('B')]))
+        self.event_log.add_trace(Trace('e', [Event('A'), Event('C')]))
+        self.event_log.add_trace(Trace('f', [Event('A'), Event('B'), Event('C')]))
+
+    def test_compute_variant_log(self):
+        variant_log = self.event_log.compute_variant_log()
+        self.assertEqual(3, len(variant_log))
+        self.assertEqual(6, variant_log.get_nr_of_traces())
+        self.assertListEqual([
+            Variant(('A', 'B', 'C'), ['a', 'c', 'f']),
+            Variant(('A', 'C'), ['b', 'e']),
+            Variant(('B',), ['d'])
+        ], variant_log.variants)
+        self.assertEqual(2, variant_log.get_variant(['A', 'C']).count)
+        self.assertEqual(self.event_log.count_nr_of_events(),
+                         variant_log.count_nr_of_events())
+        self.assertDictEqual(self.event_log.compute_activity_supports(),
+                             variant_log.compute_activity_supports())
+        self.assertDictEqual({'A': 5, 'B': 1}, variant_log.compute_start_activity_counts())
+        self.assertDictEqual({'C': 5, 'B': 1}, variant_log.compute_end_activity_counts())
+        self.assertCountEqual(self.event_log.to_simple_activity_log(),
+                              variant_log.to_simple_activity_log())
+
+    def test_compute_variant_log_of_columnar_log(self):
+        columnar_log = ColumnarEventLog.create_from_event_log(self.event_log)
+        self.assertListEqual(
+            self.event_log.compute_variant_log().variants,
+            columnar_log.compute_variant_log().variants)
+        self.assertFalse(columnar_log.is_materialized())
+
+    def test_add_variant(self):
+        variant_log = VariantLog()
+        variant_log.add_variant(Variant(('A', 'B'), [1, 2]))
+        variant_log.add_variant(Variant(('B',), [3]))
+        variant_log.add_variant(Variant(('A', 'B'), [4]))
+        self.assertEqual(2, variant_log.get_nr_of_variants())
+        self.assertEqual(4, variant_log.get_nr_of_traces())
+        self.assertListEqual([1, 2, 4], variant_log.get_variant(('A', 'B')).trace_ids)
+
+    def test_count_follows_directly_or_indirectly(self):
+        counts = self.event_log.count_follows_directly_or_indirectly()
+        self.assertEqual(5, counts[('A', 'C')])
+        self.assertEqual(3, counts[('B', 'C')])
+        self.assertEqual(0, counts[('C', 'A')])
+        self.assertEqual(counts, ColumnarEventLog.create_from_event_log(
+            self.event_log).count_follows_directly_or_indirectly())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,15 +1,107 @@
 # -*- coding: utf-8 -*-
 
 import unittest
+import os
+
+import numpy as np
 
 from prolothar_tests.prolothar_common.parallel.test_engine import TestEngine
+from prolothar_tests.prolothar_common.parallel.test_engine import add
 
 from prolothar_common.parallel.abstract.computation_engine import ComputationEngine
 from prolothar_common.parallel.multiprocess.multiprocess import MultiprocessComputationEngine
 
+def get_pid(parameter, element) -> int:
+    return os.getpid()
+
+def get_parameter_value(parameter, element):
+    return parameter['value']
+
+def is_even(parameter, element) -> bool:
+    return element % 2 == 0
+
+def square(parameter, element: int) -> int:
+    return element * element
+
+def sum_of_squares_by_nested_engine(parameter, element: int) -> int:
+    with MultiprocessComputationEngine(nr_of_workers=2) as engine:
+        return engine.create_partitionable_list(
+            list(range(element + 1))).map_reduce(None, square, add)
+
+def get_array_element(parameter, element):
+    return (int(parameter['values'][element]), parameter['values'].flags.writeable)
+
 class TestMultiprocessEngine(TestEngine, unittest.TestCase):
     def create_engine(self) -> ComputationEngine:
         return MultiprocessComputationEngine(nr_of_workers=8)
 
+    def tearDown(self):
+        self.engine.shutdown()
+
+    def test_workers_are_reused(self):
+        partitionable_list = self.engine.create_partitionable_list(list(range(100)))
+        pids = set(partitionable_list.map(None, get_pid))
+        self.assertEqual(8, len(pids))
+        self.assertNotIn(os.getpid(), pids)
+        self.assertSetEqual(pids, set(self.engine.create_partitionable_list(
+            list(range(50))).map(None, get_pid)))
+
+        self.engine.shutdown()
+        self.assertTrue(pids.isdisjoint(partitionable_list.map(None, get_pid)))
+
+    def test_parameter_is_cached_by_identity(self):
+        parameter = {'value': 1}
+        partitionable_list = self.engine.create_partitionable_list(list(range(20)))
+        self.assertListEqual([1] * 20, partitionable_list.map(parameter, get_parameter_value))
+        parameter['value'] = 2
+        #the workers still use their copy of the parameter object
+        self.assertListEqual([1] * 20, partitionable_list.map(parameter, get_parameter_value))
+        self.engine.invalidate_parameter()
+        self.assertListEqual([2] * 20, partitionable_list.map(parameter, get_parameter_value))
+        self.assertListEqual([3] * 20, partitionable_list.map(
+            {'value': 3}, get_parameter_value))
+
+    def test_lambda_functions(self):
+        partitionable_list = self.engine.create_partitionable_list(list(range(10)))
+        self.assertListEqual(list(range(1, 11)), partitionable_list.map(
+            1, lambda parameter, element: parameter + element))
+        self.assertEqual(55, partitionable_list.map_reduce(1, add, lambda a, b: a + b))
+
+    def test_chunk_sizes(self):
+        l = list(range(1000))
+        for chunk_size in [1, 3, None]:
+            with MultiprocessComputationEngine(nr_of_workers=3, chunk_size=chunk_size) as engine:
+                partitionable_list = engine.create_partitionable_list(l)
+                self.assertListEqual([x + 1 for x in l], partitionable_list.map(1, add))
+                self.assertListEqual(l[::2], partitionable_list.map_filter(0, add, is_even))
+                self.assertEqual(sum(l) + len(l), partitionable_list.map_reduce(1, add, add))
+                #new processes for lambda functions also send chunks
+                self.assertListEqual(l[1::2], partitionable_list.map_filter(
+                    0, add, lambda parameter, element: element % 2 == 1))
+        with self.assertRaises(ValueError):
+            MultiprocessComputationEngine(nr_of_workers=2, chunk_size=0)
+
+    def test_large_arrays_are_shared_read_only(self):
+        parameter = {'values': np.arange(100_000) * 2}
+        partitionable_list = self.engine.create_partitionable_list([0, 1, 99_999])
+        self.assertListEqual([(0, False), (2, False), (199_998, False)],
+                             partitionable_list.map(parameter, get_array_element))
+        self.assertListEqual([(0, False), (2, False), (199_998, False)],
+                             partitionable_list.map(parameter, get_array_element))
+        self.assertListEqual([(3, True)], self.engine.create_partitionable_list([0]).map(
+            {'values': np.arange(3, 5)}, get_array_element))
+        with MultiprocessComputationEngine(
+                nr_of_workers=2, min_shared_buffer_size=None) as engine:
+            self.assertListEqual([(2, True)], engine.create_partitionable_list([1]).map(
+                parameter, get_array_element))
+
+    def test_map_function_starts_processes(self):
+        self.assertListEqual([5, 14], self.engine.create_partitionable_list(
+            [2, 3]).map(None, sum_of_squares_by_nested_engine))
+
+    def test_context_manager(self):
+        with MultiprocessComputationEngine(nr_of_workers=2) as engine:
+            self.assertListEqual([2, 3], engine.create_partitionable_list([1, 2]).map(1, add))
+
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+import pickle
+from multiprocessing import Process, Queue
+
+import numpy as np
+
+from prolothar_common.parallel.multiprocess.shared_parameter import SharedParameter
+
+def sum_in_other_process(shared_parameter: SharedParameter, result_queue: Queue):
+    parameter = shared_parameter.load()
+    result_queue.put((parameter['name'], int(parameter['values'].sum()),
+                      parameter['values'].flags.writeable))
+    parameter = None
+    shared_parameter.release()
+
+class TestSharedParameter(unittest.TestCase):
+
+    def test_large_arrays_are_shared(self):
+        parameter = {
+            'name': 'test',
+            'values': np.arange(100_000, dtype=np.int64),
+            'small_values': np.arange(10, dtype=np.int32),
+            'fortran_values': np.asfortranarray(np.arange(20_000.0).reshape(100, 200))
+        }
+        shared_parameter = SharedParameter(parameter)
+        try:
+            self.assertEqual(100_000 * 8 + 20_000 * 8, shared_parameter.get_nr_of_shared_bytes())
+            self.assertLess(shared_parameter.get_nr_of_pickled_bytes(), 1000)
+
+            received_parameter = pickle.loads(pickle.dumps(shared_parameter))
+            loaded_parameter = received_parameter.load()
+            self.assertEqual('test', loaded_parameter['name'])
+            for key in ['values', 'small_values', 'fortran_values']:
+                np.testing.assert_array_equal(parameter[key], loaded_parameter[key])
+            self.assertFalse(loaded_parameter['values'].flags.writeable)
+            self.assertTrue(loaded_parameter['fortran_values'].flags.f_contiguous)
+            loaded_parameter = None
+            received_parameter.release()
+
+            result_queue = Queue()
+            process = Process(target=sum_in_other_process,
+                              args=(shared_parameter, result_queue))
+            process.start()
+            self.assertTupleEqual(('test', int(parameter['values'].sum()), False),
+                                  result_queue.get())
+            process.join()
+        finally:
+            shared_parameter.unlink()
+
+        with self.assertRaises(FileNotFoundError):
+            pickle.loads(pickle.dumps(shared_parameter)).load()
+
+    def test_without_shared_memory(self):
+        parameter = np.arange(100_000)
+        shared_parameter = SharedParameter(parameter, min_shared_buffer_size=None)
+        self.assertEqual(0, shared_parameter.get_nr_of_shared_bytes())
+        loaded_parameter = pickle.loads(pickle.dumps(shared_parameter)).load()
+        np.testing.assert_array_equal(parameter, loaded_parameter)
+        self.assertTrue(loaded_parameter.flags.writeable)
+        shared_parameter.unlink()
+
+    def test_parameter_without_buffers(self):
+        shared_parameter = SharedParameter({'a': [1, 2, 3]})
+        self.assertEqual(0, shared_parameter.get_nr_of_shared_bytes())
+        self.assertDictEqual({'a': [1, 2, 3]}, pickle.loads(
+            pickle.dumps(shared_parameter)).load())
+
+if __name__ == '__main__':
+    unittest.main()
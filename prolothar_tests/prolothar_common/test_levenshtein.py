@@ -1,8 +1,14 @@
 # -*- coding: utf-8 -*-
 
 import unittest
+from hypothesis import given
+import hypothesis.strategies as st
 from prolothar_common.levenshtein import levenshtein_with_backtrace
 from prolothar_common.levenshtein import EditOperation, EditOperationType
+from prolothar_common.levenshtein import levenshtein_distance
+from prolothar_common.levenshtein import levenshtein_with_linear_memory_backtrace
+from prolothar_common.levenshtein import levenshtein_with_cost_table, EditCostTable
+import prolothar_common.levenshtein as levenshtein
 
 
 class TestLevenshtein(unittest.TestCase):
@@ -64,5 +70,139 @@ class TestLevenshtein(unittest.TestCase):
             EditOperation(1, 2, EditOperationType.DELETE),
         ], edits)
 
+    def test_levenshtein_distance(self):
+        self.assertEqual(0, levenshtein_distance('', ''))
+        self.assertEqual(3, levenshtein_distance('abc', ''))
+        self.assertEqual(3, levenshtein_distance('abc', 'ca'))
+        self.assertEqual(1, levenshtein_distance(['A', 'B', 'C'], ('A', 'C')))
+        self.assertEqual(2, levenshtein_distance(
+            ['B', 'E'], ['A', 'B'], substitution_cost=2))
+        self.assertEqual(4, levenshtein_distance(
+            'ab', 'ba', insertion_cost=3, deletion_cost=1, substitution_cost=2))
+
+    def test_levenshtein_distance_of_long_sequences(self):
+        #more than 64 elements need several bit vectors per column
+        s1 = 'abcdefghij' * 20
+        s2 = s1[:70] + 'x' + s1[75:150] + 'yz' + s1[150:]
+        self.assertEqual(
+            levenshtein_with_backtrace(s1, s2)[0], levenshtein_distance(s1, s2))
+        self.assertEqual(
+            levenshtein_with_backtrace(s1, s2, substitution_cost=2)[0],
+            levenshtein_distance(s1, s2, substitution_cost=2))
+
+    @given(
+        s1=st.lists(st.integers(0, 300), max_size=300),
+        s2=st.lists(st.integers(0, 300), max_size=300)
+    )
+    def test_levenshtein_distance_with_large_alphabet(self, s1, s2):
+        #most codes only occur in a few of the bit vectors of the pattern
+        self.assertEqual(
+            levenshtein_with_backtrace(s1, s2)[0], levenshtein_distance(s1, s2))
+
+    def test_levenshtein_distance_of_disjoint_sequences(self):
+        self.assertEqual(30_000, levenshtein_distance(
+            list(range(30_000)), list(range(30_000, 60_000))))
+
+    def test_levenshtein_distance_with_max_distance(self):
+        self.assertEqual(3, levenshtein_distance('abc', 'def', max_distance=3))
+        self.assertEqual(3, levenshtein_distance('abc', 'def', max_distance=2))
+        self.assertEqual(1, levenshtein_distance('abc', 'abcdef', max_distance=0))
+        self.assertEqual(5, levenshtein_distance(
+            'abc', 'def', substitution_cost=2, max_distance=4))
+        with self.assertRaises(ValueError):
+            levenshtein_distance('abc', 'def', max_distance=-1)
+
+    @given(
+        s1=st.text(alphabet='abcd', min_size = 0, max_size = 200),
+        s2=st.text(alphabet='abcd', min_size = 0, max_size = 200),
+        costs=st.tuples(st.integers(1, 3), st.integers(1, 3), st.integers(1, 5))
+    )
+    def test_levenshtein_with_linear_memory_backtrace(self, s1, s2, costs):
+        distance, edits = levenshtein_with_linear_memory_backtrace(s1, s2, *costs)
+        self.assertEqual(levenshtein_distance(s1, s2, *costs), distance)
+        self.assertListEqual(sorted(edits, key=lambda e: (e.i, e.j)), edits)
+        #applying the edits must transform s1 into s2
+        edits_by_position = {(e.i, e.j): e.operation_type for e in edits}
+        result = []
+        i = j = 0
+        while i < len(s1) or j < len(s2):
+            operation_type = edits_by_position.pop((i, j), None)
+            if operation_type == EditOperationType.INSERT:
+                result.append(s2[j])
+                j += 1
+            elif operation_type == EditOperationType.DELETE:
+                i += 1
+            else:
+                result.append(s2[j] if operation_type is not None else s1[i])
+                i += 1
+                j += 1
+        self.assertEqual(s2, ''.join(result))
+        self.assertDictEqual({}, edits_by_position)
+
+    def test_switch_to_linear_memory_above_threshold(self):
+        max_nr_of_cells = levenshtein.MAX_NR_OF_CELLS_FOR_FULL_BACKTRACE
+        levenshtein.MAX_NR_OF_CELLS_FOR_FULL_BACKTRACE = 10
+        try:
+            distance, edits = levenshtein_with_backtrace(
+                ['B', 'E'], ['A', 'B'], substitution_cost = 2)
+            self.assertEqual(2, distance)
+            self.assertCountEqual([
+                EditOperation(0, 0, EditOperationType.INSERT),
+                EditOperation(1, 2, EditOperationType.DELETE),
+            ], edits)
+            self.assertEqual(3, levenshtein_with_backtrace('abc', 'ca')[0])
+        finally:
+            levenshtein.MAX_NR_OF_CELLS_FOR_FULL_BACKTRACE = max_nr_of_cells
+
+    def test_unhashable_elements_above_threshold(self):
+        max_nr_of_cells = levenshtein.MAX_NR_OF_CELLS_FOR_FULL_BACKTRACE
+        levenshtein.MAX_NR_OF_CELLS_FOR_FULL_BACKTRACE = 10
+        try:
+            distance, edits = levenshtein_with_backtrace(
+                [['B'], ['E']], [['A'], ['B']], substitution_cost = 2)
+            self.assertEqual(2, distance)
+            self.assertEqual(2, len(edits))
+        finally:
+            levenshtein.MAX_NR_OF_CELLS_FOR_FULL_BACKTRACE = max_nr_of_cells
+
+    def test_levenshtein_with_backtrace_order(self):
+        _, edits = levenshtein_with_backtrace('abcdef', 'xbcdyfz')
+        self.assertListEqual([
+            EditOperation(0, 0, EditOperationType.SUBSTITUTE),
+            EditOperation(4, 4, EditOperationType.SUBSTITUTE),
+            EditOperation(6, 6, EditOperationType.INSERT)
+        ], edits)
+
+    def test_levenshtein_with_cost_table(self):
+        cost_table = EditCostTable(
+            insertion_costs={'A': 0.5}, deletion_costs={'B': 5},
+            substitution_costs={('B', 'A'): 0.25})
+        distance, edits = levenshtein_with_cost_table(['B', 'C'], ['A', 'C', 'A'], cost_table)
+        self.assertEqual(0.75, distance)
+        self.assertListEqual([
+            EditOperation(0, 0, EditOperationType.SUBSTITUTE),
+            EditOperation(2, 2, EditOperationType.INSERT)
+        ], edits)
+        #the substitution cost is not symmetric
+        distance, edits = levenshtein_with_cost_table(['A', 'C'], ['B', 'C'], cost_table)
+        self.assertEqual(1, distance)
+        self.assertEqual(
+            (2.5, None), levenshtein_with_cost_table('xyz', '', EditCostTable(
+                default_deletion_cost=2.5, deletion_costs={'y': 0, 'z': 0}),
+                with_backtrace=False))
+
+    def test_levenshtein_with_default_cost_table(self):
+        for s1, s2 in [('', ''), ('abc', ''), ('', 'abc'), ('abc', 'ca'),
+                       ('kitten', 'sitting')]:
+            distance, edits = levenshtein_with_cost_table(s1, s2, EditCostTable())
+            self.assertEqual(levenshtein_distance(s1, s2), distance)
+            self.assertEqual(distance, len(edits))
+
+    def test_negative_costs(self):
+        with self.assertRaises(ValueError):
+            EditCostTable(insertion_costs={'A': -1})
+        with self.assertRaises(ValueError):
+            EditCostTable(default_substitution_cost=-1)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -5,6 +5,10 @@ from hypothesis import given, example
 import hypothesis.strategies as st
 
 from prolothar_common.longest_common_subsequence import lcs_with_backtrace
+from prolothar_common.longest_common_subsequence import lcs_with_linear_memory_backtrace
+from prolothar_common.longest_common_subsequence import length_of_common_subsequence
+from prolothar_common.longest_common_subsequence import lengths_of_common_subsequences
+import prolothar_common.longest_common_subsequence as longest_common_subsequence
 
 class TestLongestCommonSubsequence(unittest.TestCase):
 
@@ -34,5 +38,81 @@ class TestLongestCommonSubsequence(unittest.TestCase):
         for i,j in backtrace:
             self.assertEqual(x[i], y[j])
 
+    @given(
+        x=st.text(alphabet='abcd', min_size = 0, max_size = 200),
+        y=st.text(alphabet='abcd', min_size = 0, max_size = 200)
+    )
+    def test_lcs_with_linear_memory_backtrace(self, x, y):
+        lcs, backtrace = lcs_with_linear_memory_backtrace(x, y)
+        self.assertEqual(lcs_with_backtrace(x, y)[0], lcs)
+        self.assertEqual(lcs, len(backtrace))
+        self.assertListEqual(sorted(set(backtrace)), backtrace)
+        self.assertEqual(lcs, len(set(j for _,j in backtrace)))
+        for i,j in backtrace:
+            self.assertEqual(x[i], y[j])
+
+    def test_switch_to_linear_memory_above_threshold(self):
+        x = ['this', 'is', 'some', 'text', 'that', 'will', 'be', 'changed']
+        y = ['this', 'is', 'the', 'changed', 'text']
+        max_nr_of_cells = longest_common_subsequence.MAX_NR_OF_CELLS_FOR_FULL_MATRIX
+        longest_common_subsequence.MAX_NR_OF_CELLS_FOR_FULL_MATRIX = 10
+        try:
+            self.assertEqual(3, length_of_common_subsequence(x, y))
+            lcs, backtrace = lcs_with_backtrace(x, y)
+            self.assertEqual(3, lcs)
+            self.assertListEqual([(0,0), (1,1)], backtrace[:2])
+        finally:
+            longest_common_subsequence.MAX_NR_OF_CELLS_FOR_FULL_MATRIX = max_nr_of_cells
+
+    def test_unhashable_elements(self):
+        x = [['this'], ['is'], ['some'], ['text'], ['that'], ['will'], ['be'], ['changed']]
+        y = [['this'], ['is'], ['the'], ['changed'], ['text']]
+        self.assertEqual(3, length_of_common_subsequence(x, y))
+        self.assertEqual(3, lcs_with_backtrace(x, y)[0])
+        max_nr_of_cells = longest_common_subsequence.MAX_NR_OF_CELLS_FOR_FULL_MATRIX
+        longest_common_subsequence.MAX_NR_OF_CELLS_FOR_FULL_MATRIX = 10
+        try:
+            lcs, backtrace = lcs_with_backtrace(x, y)
+            self.assertEqual(3, lcs)
+            self.assertListEqual([(0,0), (1,1)], backtrace[:2])
+        finally:
+            longest_common_subsequence.MAX_NR_OF_CELLS_FOR_FULL_MATRIX = max_nr_of_cells
+
+    @given(
+        x=st.text(alphabet='abcd', min_size = 0, max_size = 200),
+        y=st.text(alphabet='abcde', min_size = 0, max_size = 200)
+    )
+    def test_length_of_common_subsequence(self, x, y):
+        #more than 64 elements need several bit vectors
+        self.assertEqual(lcs_with_backtrace(x, y)[0], length_of_common_subsequence(x, y))
+
+    @given(
+        x=st.lists(st.integers(min_value=0, max_value=300), max_size = 300),
+        y=st.lists(st.integers(min_value=0, max_value=300), max_size = 300)
+    )
+    def test_length_of_common_subsequence_with_large_alphabet(self, x, y):
+        self.assertEqual(lcs_with_backtrace(x, y)[0], length_of_common_subsequence(x, y))
+        self.assertListEqual(
+            [lcs_with_backtrace(x, y)[0]],
+            lengths_of_common_subsequences(x, [y]).tolist())
+
+    def test_length_of_common_subsequence_of_disjoint_sequences(self):
+        #the match vectors must not scale with the largest element code
+        x = list(range(30000))
+        y = list(range(30000, 60000))
+        self.assertEqual(0, length_of_common_subsequence(x, y))
+        self.assertListEqual([0, 30000], lengths_of_common_subsequences(x, [y, x]).tolist())
+
+    def test_lengths_of_common_subsequences(self):
+        query = ['this', 'is', 'some', 'text', 'that', 'will', 'be', 'changed']
+        sequences = [
+            ['this', 'is', 'the', 'changed', 'text'], [], ['unknown'],
+            query, query[::-1], ['text'] * 100 + ['will'] * 100
+        ]
+        lengths = lengths_of_common_subsequences(query, sequences)
+        self.assertListEqual([3, 0, 0, 8, 1, 2], lengths.tolist())
+        self.assertListEqual([], lengths_of_common_subsequences(query, []).tolist())
+        self.assertListEqual([0], lengths_of_common_subsequences([], [query]).tolist())
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
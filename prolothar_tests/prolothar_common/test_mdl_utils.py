@@ -5,6 +5,9 @@ import unittest
 import prolothar_common.mdl_utils as mdl_utils
 from math import log2
 
+import numpy as np
+from scipy.special import gammaln
+
 class TestMdlUtils(unittest.TestCase):
 
     def test_L_N(self):
@@ -116,5 +119,91 @@ class TestMdlUtils(unittest.TestCase):
         self.assertGreater(mdl_utils.L_R(-1.2), mdl_utils.L_R(1.1))
         self.assertTrue(mdl_utils.L_R(8.612639221334548e-16) > 0)
 
+    def test_L_N_array(self):
+        n = np.array([[1, 2, 3], [100, 101, 123456]])
+        np.testing.assert_allclose(
+            [[mdl_utils.L_N(int(x)) for x in row] for row in n],
+            mdl_utils.L_N_array(n))
+        with self.assertRaises(ValueError):
+            mdl_utils.L_N_array([1, 0])
+
+    def test_precompute_L_N(self):
+        original_table = mdl_utils.get_L_N_table()
+        try:
+            expected = mdl_utils.L_N(500)
+            mdl_utils.precompute_L_N(1000)
+            self.assertEqual(1000, len(mdl_utils.get_L_N_table()))
+            self.assertEqual(expected, mdl_utils.L_N(500))
+            mdl_utils.precompute_L_N(10)
+            self.assertEqual(1000, len(mdl_utils.get_L_N_table()))
+            mdl_utils.set_L_N_table(np.full(3, 7.0))
+            self.assertEqual(7.0, mdl_utils.L_N(3))
+            self.assertAlmostEqual(expected, mdl_utils.L_N(500))
+            with self.assertRaises(ValueError):
+                mdl_utils.set_L_N_table(np.ones(3, dtype=int))
+        finally:
+            mdl_utils.set_L_N_table(original_table)
+
+    def test_log2binom_array_and_L_U_array(self):
+        np.testing.assert_allclose(
+            [mdl_utils.log2binom(5, 0), mdl_utils.log2binom(20, 1),
+             mdl_utils.log2binom(5000, 20)],
+            mdl_utils.log2binom_array([5, 20, 5000], [0, 1, 20]))
+        np.testing.assert_allclose(
+            [[mdl_utils.L_U(0, 0), mdl_utils.L_U(5001, 21)]],
+            mdl_utils.L_U_array([[0, 5001]], [0, 21]))
+        read_only_array = np.array([5, 20, 5000])
+        read_only_array.flags.writeable = False
+        np.testing.assert_allclose(
+            mdl_utils.log2binom_array([5, 20, 5000], [5, 20, 5000]),
+            mdl_utils.log2binom_array(read_only_array, read_only_array))
+        np.testing.assert_allclose(
+            mdl_utils.L_U_array([5, 20, 5000], [5, 20, 5000]),
+            mdl_utils.L_U_array(read_only_array, read_only_array))
+
+    def test_L_R_array(self):
+        real_numbers = np.array([0, 1, -1, 1.1, -1.2, 8.612639221334548e-16, 1e9])
+        np.testing.assert_allclose(
+            [mdl_utils.L_R(x) for x in real_numbers],
+            mdl_utils.L_R_array(real_numbers))
+        np.testing.assert_allclose(
+            [mdl_utils.L_R(x, precision=2) for x in real_numbers],
+            mdl_utils.L_R_array(real_numbers, precision=2))
+
+    def test_prequential_coding_length_array(self):
+        counts = {'A': 10, 'B': 30, 'C': 80, 'D': 0}
+        self.assertAlmostEqual(
+            mdl_utils.prequential_coding_length(counts),
+            mdl_utils.prequential_coding_length_array(list(counts.values())))
+        self.assertAlmostEqual(
+            mdl_utils.prequential_coding_length(counts, epsilon=1),
+            mdl_utils.prequential_coding_length_array(
+                list(counts.values()), epsilon=1))
+        np.testing.assert_allclose(
+            [mdl_utils.prequential_coding_length(counts), 0,
+             mdl_utils.prequential_coding_length({'A': 50, 'B': 0, 'C': 0, 'D': 0})],
+            mdl_utils.prequential_coding_length_array(
+                [[10, 30, 80, 0], [0, 0, 0, 0], [50, 0, 0, 0]]))
+        self.assertEqual(0, mdl_utils.prequential_coding_length_array([50]))
+        self.assertEqual(0, mdl_utils.prequential_coding_length_array([]))
+
+    def test_cached_lgamma(self):
+        for x in [0.5, 1, 1.5, 7, 1000.5, 4096, 123456.5, 0.3, 17.25, 2e6, 2e6 + 0.5]:
+            self.assertAlmostEqual(gammaln(x), mdl_utils.cached_lgamma(x))
+        self.assertEqual(float('inf'), mdl_utils.cached_lgamma(0))
+
+    def test_set_lgamma_table_bound(self):
+        try:
+            mdl_utils.set_lgamma_table_bound(10)
+            self.assertAlmostEqual(gammaln(10.5), mdl_utils.cached_lgamma(10.5))
+            self.assertAlmostEqual(gammaln(9.5), mdl_utils.cached_lgamma(9.5))
+            self.assertAlmostEqual(
+                mdl_utils.prequential_coding_length({'A': 100, 'B': 7}),
+                mdl_utils.prequential_coding_length_array([100, 7]))
+            with self.assertRaises(ValueError):
+                mdl_utils.set_lgamma_table_bound(-1)
+        finally:
+            mdl_utils.set_lgamma_table_bound(1_000_000)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
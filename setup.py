@@ -45,6 +45,7 @@ if os.path.exists('prolothar_common/levenshtein.pyx'):
         make_extension_from_pyx("prolothar_common/experiments/statistics.pyx"),
         make_extension_from_pyx("prolothar_common/collections/list_utils.pyx"),
         make_extension_from_pyx("prolothar_common/collections/tuple_utils.pyx"),
+        make_extension_from_pyx("prolothar_common/clustering/traces/distance_matrix.pyx"),
     ]
 else:
     extensions = []